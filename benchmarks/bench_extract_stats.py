@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Micro-benchmark comparing the single-pass OutputParser against the old
+# extractor, which ran one regex search per statistic, either over the whole
+# buffered output or over each line as it streamed in.
+#
+# Usage: PYTHONPATH=./src python3 benchmarks/bench_extract_stats.py [MB]...
+import re
+import sys
+import random
+from timeit import repeat
+
+from runner.runner        import Runner
+from runner.output_parser import OutputParser
+
+# The regexes used by the old extractor (formerly const.STAT_REGEXPS)
+LEGACY_STAT_REGEXPS = {
+    'totalcash'      : re.compile(r"TOTAL CASH], ([0-9]+)"),
+    'countcash'      : re.compile(r"COUNTED CASH], ([0-9]+)"),
+    'opcount'        : re.compile(r"ACTUAL OPERATIONS], ([0-9]+)"),
+    'runtime'        : re.compile(r"OVERALL], RunTime.+?, ([0-9.]+)"),
+    'throughput'     : re.compile(r"OVERALL], Throughput.+?, ([0-9.]+)"),
+    'latency_tx_rmw' : re.compile(r"TX-READMODIFYWRITE], AverageLatency.+?, ([0-9.]+)"),
+}
+
+OPS = ["READ", "UPDATE", "INSERT", "SCAN", "TX-READMODIFYWRITE"]
+
+def legacy_extract(stdout):
+    stats = {}
+    for k, regex in LEGACY_STAT_REGEXPS.items():
+        m = regex.search(stdout)
+        if m is not None:
+            stats[k] = float(m.group(1))
+    return stats
+
+def legacy_stream_extract(stdout):
+    # The regex loop applied to each line as it arrives, as the streaming
+    # pipeline did before OutputParser became a single-pass parser
+    stats = {}
+    for line in stdout.splitlines():
+        for k, regex in LEGACY_STAT_REGEXPS.items():
+            if k in stats:
+                continue
+            m = regex.search(line)
+            if m is not None:
+                stats[k] = float(m.group(1))
+    return stats
+
+def parser_extract(stdout):
+    parser = OutputParser()
+    for line in stdout.splitlines():
+        parser.feed(line)
+    return parser.stats()
+
+def make_output(megabytes):
+    """make_output
+    Generates YCSB-like output of roughly the given size: verbose histogram
+    buckets for each operation, followed by the summary lines.
+    """
+    rand = random.Random(42)
+    lines = ["YCSB Client 0.1", "Command line: -db foo -P workload -s"]
+    size = 0
+    bucket = 0
+    while size < megabytes * 1024 * 1024:
+        for op in OPS:
+            line = "[%s], %i, %i" % (op, bucket, rand.randint(0, 100000))
+            lines.append(line)
+            size += len(line) + 1
+        bucket += 1
+    lines += [
+        "[TOTAL CASH], 10000000",
+        "[COUNTED CASH], 10000000",
+        "[ACTUAL OPERATIONS], 100000",
+        "[OVERALL], RunTime(ms), 12345.0",
+        "[OVERALL], Throughput(ops/sec), 8100.4",
+    ]
+    for op in OPS:
+        lines.append("[%s], Operations, 20000" % op)
+        lines.append("[%s], AverageLatency(us), 401.5" % op)
+    return "\n".join(lines)
+
+def bench(name, f, stdout, number=3):
+    best = min(repeat(lambda: f(stdout), number=number, repeat=3)) / number
+    print("  %-30s %8.2f ms" % (name, best * 1000))
+    return best
+
+if __name__ == '__main__':
+    sizes = [float(s) for s in sys.argv[1:]] or [1, 4, 16]
+    for mb in sizes:
+        stdout = make_output(mb)
+        print("%.1f MB of output (%i lines):" % (len(stdout) / 1024 / 1024,
+            stdout.count("\n") + 1))
+        bench("legacy, buffered (regex/stat)", legacy_extract, stdout)
+        legacy = bench("legacy, streamed (regex/stat)", legacy_stream_extract, stdout)
+        single = bench("OutputParser (single pass)", parser_extract, stdout)
+        bench("Runner.extract_stats", Runner.extract_stats, stdout)
+        print("  speedup over streamed regex loop: %.2fx" % (legacy / single))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Benchmark of the cost of each ResourceSampler sample, and the resulting
+# overhead at the default sample_interval, with N idle processes in the
+# sampled client tree (the rest of the host's processes are listed too). The
+# "rescan" case reads every process's parent from /proc on each sample, as
+# parent_pids() does without its cache of known processes.
+#
+# Usage: PYTHONPATH=./src python3 benchmarks/bench_sampler.py [N]...
+import os
+import sys
+import time
+import subprocess
+
+from runner import constants as const
+from runner import resources
+from runner.resources import ResourceSampler
+
+SAMPLES = 200
+
+def bench(nprocs, rescan):
+    procs = [subprocess.Popen([sys.executable, '-c',
+        'import time; time.sleep(600)']) for _ in range(nprocs)]
+    try:
+        # The sampling thread never wakes; samples are taken directly
+        sampler = ResourceSampler(1e9)
+        for proc in procs:
+            sampler.add(proc.pid)
+        sampler.start()
+        if rescan:
+            parent_pids = resources.parent_pids
+            resources.parent_pids = lambda known=None: parent_pids()
+        try:
+            start = time.perf_counter()
+            for _ in range(SAMPLES):
+                sampler.sample()
+            elapsed = (time.perf_counter() - start) / SAMPLES
+        finally:
+            sampler.stop()
+            if rescan:
+                resources.parent_pids = parent_pids
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+    return elapsed
+
+def main():
+    if not resources.supported():
+        sys.exit("Sampling requires /proc")
+    sizes = [int(n) for n in sys.argv[1:]] or [1, 10, 100]
+    interval = float(const.OPTION_DEFAULTS['sample_interval'])
+    print("%d processes on this host" % len([p for p in os.listdir('/proc') if p.isdigit()]))
+    print("%8s %10s %12s %12s" % ("procs", "mode", "ms/sample", "overhead"))
+    for n in sizes:
+        for rescan in (True, False):
+            elapsed = bench(n, rescan)
+            print("%8d %10s %12.3f %11.3f%%" % (n, "rescan" if rescan else "cached",
+                elapsed * 1000, 100 * elapsed / interval))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Benchmark of runner start-up cost: the time and peak RSS taken to import
+# the runner package and to construct a Runner from a config file, each
+# measured in a fresh interpreter. The "eager" case also imports the CSV
+# exporter and matplotlib, as importing runner used to.
+#
+# Usage: PYTHONPATH=./src python3 benchmarks/bench_startup.py [REPEATS]
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+CONFIG = """
+[DEFAULT]
+workload = workload
+output_plots = false
+
+[redis,jdbc-postgres,cassandra-10]
+[mongodb]
+"""
+
+WORKLOAD = """
+recordcount=10000
+operationcount=100000
+workload=com.yahoo.ycsb.workloads.ClosedEconomyWorkload
+"""
+
+# Code run in each fresh interpreter; prints the time taken and peak RSS
+TEMPLATE = """
+import io, sys, json, time, resource, contextlib
+t = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    {code}
+t = time.perf_counter() - t
+print(json.dumps({{
+    'time': t,
+    'maxrss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'heavy': sorted(m for m in ('pandas', 'matplotlib', 'numpy') if m in sys.modules),
+}}))
+"""
+
+CASES = [
+    ("import runner", "import runner"),
+    ("import runner (eager, as before)",
+        "import runner, runner.csv_exporter, matplotlib.pyplot"),
+    ("Runner(config)", "import runner; runner.Runner('runner.ini')"),
+]
+
+def measure(code, cwd):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(sys.path)
+    out = subprocess.check_output([sys.executable, "-c",
+        TEMPLATE.format(code=code)], cwd=cwd, env=env)
+    return json.loads(out.decode("utf-8").strip().splitlines()[-1])
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, 'runner.ini'), 'w') as f:
+            f.write(CONFIG)
+        with open(os.path.join(tmpdir, 'workload'), 'w') as f:
+            f.write(WORKLOAD)
+        for name, code in CASES:
+            results = [measure(code, tmpdir) for _ in range(repeats)]
+            best = min(results, key=lambda r: r['time'])
+            print("%-34s %8.1f ms %8.1f MB max RSS  loaded: %s" % (name,
+                best['time'] * 1000, best['maxrss'] / 1024.,
+                ','.join(best['heavy']) or '-'))
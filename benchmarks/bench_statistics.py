@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Benchmark of the memory use and construction time of Statistics rows,
+# comparing the slotted Statistics class against the previous dict-backed
+# implementation (reproduced below as LegacyStatistics).
+#
+# Usage: PYTHONPATH=./src python3 benchmarks/bench_statistics.py [ROWS]
+import sys
+import tracemalloc
+from timeit import repeat
+
+import runner.constants as const
+from runner.stats import Statistics, stat_type
+
+class LegacyStatistics:
+    """The dict-backed Statistics class, as it was before __slots__"""
+    def __init__(self, **kwargs):
+        self.__stats = {}
+        for k, v in kwargs.items():
+            if stat_type(k) is None:
+                raise AttributeError("Unexpected keyword argument: '%s'" % k)
+            setattr(self, k, v)
+        for k, v in const.TRACKED_STATS.items():
+            if k not in kwargs:
+                setattr(self, k, v())
+
+    def __getattr__(self, name):
+        if name in self.__stats:
+            return self.__stats[name]
+        if const.RE_OP_STAT.match(name):
+            return const.OP_STAT_TYPE()
+        raise AttributeError("'%s' does not exist" % name)
+
+    def __setattr__(self, name, value):
+        t = stat_type(name)
+        if t is not None:
+            if type(value) != type(t()):
+                raise TypeError("Type mismatch")
+            self.__stats[name] = value
+        else:
+            object.__setattr__(self, name, value)
+
+# A typical row: the values set by the runner after each YCSB run
+ROW = {
+    'runtime'   : 12345.,
+    'throughput': 8100.4,
+    'opcount'   : 100000.,
+    'totalcash' : 10000000.,
+    'countcash' : 10000000.,
+    'mpl'       : 16,
+    'trial'     : 3,
+}
+
+# The same row with per-operation stats, as parsed from full YCSB output
+OP_ROW = dict(ROW, read_operations=90000., read_avg_latency=401.5,
+        read_p95_latency=600., read_p99_latency=900.,
+        tx_readmodifywrite_operations=10000.,
+        tx_readmodifywrite_avg_latency=812.25)
+
+def measure(cls, row, n):
+    # Construction time per row
+    best = min(repeat(lambda: cls(**row), number=n // 10, repeat=3)) / (n // 10)
+    # Memory held by n rows
+    tracemalloc.start()
+    rows = [cls(**row) for _ in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return best, size / n
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for label, row in (("tracked stats only", ROW), ("with per-op stats", OP_ROW)):
+        print("%i rows, %s:" % (n, label))
+        results = {}
+        for cls in (LegacyStatistics, Statistics):
+            t, mem = measure(cls, row, n)
+            results[cls] = (t, mem)
+            print("  %-18s %7.2f us/row %8.1f bytes/row" % (cls.__name__,
+                t * 1e6, mem))
+        (lt, lm), (st, sm) = results[LegacyStatistics], results[Statistics]
+        print("  construction %.2fx faster, %.2fx less memory" % (lt / st, lm / sm))
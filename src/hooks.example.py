@@ -1,6 +1,10 @@
 # This file contains example/dummy hooks for each possible hook location
 # For documentation, see https://github.com/benjaminbrent/YCSB-runner/wiki/Custom-Hooks
 
+# Hooks can show their own work in the campaign's timeline (ycsb_runner.py
+# --trace) with trace.span; it does nothing when tracing is off
+from runner import trace
+
 def pre_run():
     print("hook pre_run: Starting run")
 
@@ -21,9 +25,14 @@ def post_trial(trial, db):
 
 def pre_mpl(mpl, trial, db):
     print("hook pre_mpl: Starting MPL", mpl, "of trial", trial, "on", db.labelname)
+    with trace.span("drop caches", mpl=mpl):
+        pass # e.g. subprocess.call(["sync"])
 
 def post_mpl(mpl, trial, db):
     print("hook post_mpl: Finishing MPL", mpl, "of trial", trial, "on", db.labelname)
+    # YCSB's periodic status reports for the run are in db.series
+    series = db.series[(trial, mpl)]
+    print("hook post_mpl: Throughput over time:", series.ops_per_sec)
 
 # This dictionary must be defined
 # All hooks are run in the order listed for each hook location
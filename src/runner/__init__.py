@@ -5,10 +5,30 @@ from .runner import Runner
 # If the user *wants* to import everything, then we'll let them
 # This may also be necessary for testing purposes
 __all__ = [
+    'clients',
+    'compare',
     'constants',
+    'coordinator',
     'csv_exporter',
     'dbsystem',
     'exporter',
+    'host_metrics',
+    'journal',
+    'loader',
+    'mpl_strategy',
+    'output_parser',
+    'phases',
+    'plot_renderer',
+    'reset',
+    'resources',
+    'results_db',
     'runner',
+    'statmath',
     'stats',
+    'status',
+    'steady_state',
+    'trace',
+    'transport',
+    'worker',
+    'ycsb_process',
 ]
@@ -0,0 +1,286 @@
+import threading
+
+from .              import constants as const
+from .coordinator   import Coordinator
+from .output_parser import OutputParser
+from .              import trace
+from .phases        import FirstOutput
+from .stats         import Statistics
+from .status        import StatusSeries
+from .ycsb_process  import YcsbProcess, Watchdog
+
+def split_evenly(total, n):
+    """split_evenly
+    Splits total into at most n positive integer shares which differ by at
+    most 1, largest first
+
+    :param total: Integer to split
+    :param n: Maximum number of shares
+    """
+    size, extra = divmod(total, max(1, n))
+    shares = [size + 1] * extra + [size] * (max(1, n) - extra)
+    return [share for share in shares if share > 0]
+
+def split_range(start, count, n):
+    """split_range
+    Splits the range of count integers starting at start into at most n
+    disjoint, contiguous ranges
+
+    Returns a list of (start, count) tuples
+
+    :param start: First integer in the range
+    :param count: Number of integers in the range
+    :param n: Maximum number of ranges
+    """
+    ranges = []
+    for share in split_evenly(count, n):
+        ranges.append((start, share))
+        start += share
+    return ranges
+
+class YcsbClients:
+    """YcsbClients: Runs an MPL as clients_per_run concurrent 'ycsb run'
+    processes, so that the benchmark isn't limited by a single client JVM.
+
+    Each client gets an even share of the MPL's threads, of the workload's
+    operationcount, and of the workload's key range (using the insertstart
+    and insertcount properties). If workers are configured, there is at
+    least one client per worker, and the clients are run on the workers by a
+    Coordinator.
+    """
+    def __init__(self, db):
+        """__init__
+
+        :param db: DbSystem instance to run
+        """
+        self.db = db
+        # Serializes logging of lines from the concurrent processes
+        self.__lock = threading.Lock()
+
+    def commands(self, mpl):
+        """commands
+        Returns a list of the 'ycsb run' commands for each client of the given
+        MPL. There are never more clients than threads, operations or keys.
+
+        :param mpl: MPL (total number of threads) to run
+        """
+        n = len(split_evenly(mpl, max(self.db.clients_per_run,
+            len(self.db.workers))))
+        config = self.db.workload_config
+        # Every client needs some operations (YCSB treats operationcount=0 as
+        # unlimited) and a key range of its own, so there may be fewer
+        # clients than requested
+        if 'operationcount' in config:
+            n = min(n, int(config['operationcount']))
+        if 'recordcount' in config:
+            start = int(config.get('insertstart', 0))
+            count = int(config.get('insertcount', int(config['recordcount']) - start))
+            n = min(n, count)
+        if n <= 1:
+            return [self.db.cmd_ycsb_run(mpl)]
+        operations = ([None] * n if 'operationcount' not in config else
+                split_evenly(int(config['operationcount']), n))
+        keys = ([(None, None)] * n if 'recordcount' not in config else
+                split_range(start, count, n))
+        return [self.db.cmd_ycsb_run(t, ops, *key)
+                for t, ops, key in zip(split_evenly(mpl, n), operations, keys)]
+
+    def run(self, mpl, sampler=None):
+        """run
+        Runs every client of the given MPL to completion
+
+        Returns a tuple of two lists, with one entry per client: the
+        Statistics row, and the StatusSeries of status reports. Raises a
+        ProcessTimeout if the clients were killed for exceeding timeout_run
+        or stall_timeout, a RuntimeError if any client exited with an error
+        (or its worker failed), or the first exception raised while running
+        any client. The time until the last client's first output is
+        added to the DbSystem's startup phase, and the rest of the run to its
+        run phase. Each client's throughput is recorded as a counter in the
+        trace, if tracing is enabled.
+
+        :param mpl: MPL (total number of threads) to run
+        :param sampler: ResourceSampler which should sample the clients, or
+            None (clients on workers aren't sampled)
+        """
+        commands = self.commands(mpl)
+        parsers = [OutputParser() for _ in commands]
+        series = [StatusSeries() for _ in commands]
+        first = [FirstOutput() for _ in commands]
+        start = trace.now()
+        try:
+            self.__run(mpl, commands, parsers, series, first, sampler)
+        finally:
+            end = trace.now()
+            # Clients which never wrote anything spent the whole run starting
+            startup = max((f.time or end) - start for f in first)
+            self.db.phases.add('startup', startup, start)
+            self.db.phases.add('run', end - start - startup, start + startup)
+        for i, (s, f) in enumerate(zip(series, first)):
+            name = "throughput" if len(series) == 1 else "throughput client %i" % (i + 1)
+            # Status reports are timed from YCSB's start, after JVM startup
+            for elapsed, rate in zip(s.elapsed, s.ops_per_sec):
+                if rate is not None:
+                    trace.counter(name, f.time + elapsed, ops_per_sec=rate)
+        rows = [parser.stats() for parser in parsers]
+        for i, row in enumerate(rows):
+            row.client = i + 1 if len(rows) > 1 else 0
+        return rows, series
+
+    def __run(self, mpl, commands, parsers, series, first, sampler):
+        """__run
+        Runs the given client commands, feeding each client's output to its
+        parser, StatusSeries and FirstOutput, and raises a RuntimeError if
+        any of them exited with an error
+        """
+        log = self.db.raw_log if len(commands) == 1 else self.__log
+        # Kills every client if the run hangs, raising a ProcessTimeout
+        with Watchdog("ycsb run at MPL %i" % mpl, self.db.timeout_run,
+                self.db.stall_timeout) as watchdog:
+            if self.db.workers:
+                codes = Coordinator(self.db.workers, self.db.worker_command).run(
+                        commands, [self.db.workload_path], log,
+                        list(zip(parsers, series, first)), watchdog)
+            else:
+                processes = [YcsbProcess(cmd, log, p, s, f, watchdog=watchdog,
+                    sampler=sampler) for cmd, p, s, f in
+                    zip(commands, parsers, series, first)]
+                if len(processes) == 1:
+                    processes[0].run()
+                else:
+                    errors = []
+                    threads = [threading.Thread(target=self.__run_client,
+                        args=(process, errors)) for process in processes]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                    if errors:
+                        raise errors[0]
+                codes = [process.returncode for process in processes]
+        for i, code in enumerate(codes):
+            if code:
+                raise RuntimeError("Error: ycsb run at MPL %i exited with code %i" %
+                        (mpl, code) + ("" if len(codes) == 1 else
+                            " (client %i)" % (i + 1)))
+
+    def __run_client(self, process, errors):
+        """__run_client
+        Runs one of the clients, storing any exception it raises in errors so
+        that run() can raise it
+        """
+        try:
+            process.run()
+        except BaseException as e:
+            errors.append(e)
+
+    def __log(self, line):
+        """__log
+        Logs a line of output from one of the clients
+        """
+        with self.__lock:
+            self.db.raw_log(line)
+
+def client_aggregate(name):
+    """client_aggregate
+    Returns how the given statistic is combined across the clients of a run:
+    a tuple of the aggregation (see const.CLIENT_AGGREGATES) and, for
+    weighted means, the name of the statistic to weight by
+
+    :param name: Name of the statistic
+    """
+    if name in const.CLIENT_AGGREGATES:
+        return const.CLIENT_AGGREGATES[name]
+    m = const.RE_OP_STAT.match(name)
+    if m is None:
+        return ('first', None)
+    metric = m.group(1)
+    op = name[:m.start(1) - 1]
+    if metric == 'operations' or metric.startswith('return_'):
+        return ('sum', None)
+    if metric in ('avg_latency', 'steady_latency'):
+        return ('wmean', op + '_operations')
+    if metric == 'min_latency':
+        return ('min', None)
+    # Percentiles can't be combined exactly, so take the worst client's
+    return ('max', None)
+
+def combine_stats(rows):
+    """combine_stats
+    Combines the Statistics rows reported by each client of a run into a
+    single row: counts and throughputs are summed, runtimes and maximum
+    latencies take the maximum, and average latencies are weighted by each
+    client's operation count (see client_aggregate)
+
+    :param rows: List of Statistics, one per client
+    """
+    if len(rows) == 1:
+        return rows[0]
+    fields = []
+    for row in rows:
+        fields += [f for f in row.fields() if f not in fields]
+    combined = Statistics()
+    for field in fields:
+        how, weight = client_aggregate(field)
+        values = [getattr(row, field) for row in rows]
+        if how == 'sum':
+            value = sum(values)
+        elif how == 'max':
+            value = max(values)
+        elif how == 'min':
+            value = min(values)
+        elif how == 'wmean':
+            weights = [getattr(row, weight) for row in rows]
+            total = sum(weights)
+            value = (sum(v * w for v, w in zip(values, weights)) / total
+                    if total > 0 else sum(values) / len(values))
+        else:
+            value = values[0]
+        setattr(combined, field, type(values[0])(value))
+    combined.client = 0
+    return combined
+
+def combine_series(series):
+    """combine_series
+    Combines the status report series of each client of a run into a single
+    series, matching up the clients' reports by their position in the series
+    (the clients start together, and report at the same interval). Operation
+    counts (in total and per operation type) and throughputs are summed,
+    elapsed time takes the maximum, and latencies are weighted by each
+    client's current throughput.
+
+    :param series: List of StatusSeries, one per client
+    """
+    if len(series) == 1:
+        return series[0]
+    combined = StatusSeries()
+    n = min(len(s) for s in series)
+    ops = set()
+    for s in series:
+        ops.update(s.latencies.keys())
+    combined.latencies = {op: [] for op in ops}
+    counted = set()
+    for s in series:
+        counted.update(s.counts.keys())
+    combined.counts = {op: [] for op in counted}
+    for i in range(n):
+        rates = [s.ops_per_sec[i] for s in series]
+        combined.elapsed.append(max(s.elapsed[i] for s in series))
+        combined.operations.append(sum(s.operations[i] for s in series))
+        combined.ops_per_sec.append(None if None in rates else sum(rates))
+        for op in ops:
+            values = [(s.latencies[op][i], s.ops_per_sec[i] or 0.)
+                    for s in series if op in s.latencies and
+                    s.latencies[op][i] is not None]
+            total = sum(w for _, w in values)
+            if not values:
+                combined.latencies[op].append(None)
+            elif total > 0:
+                combined.latencies[op].append(sum(v * w for v, w in values) / total)
+            else:
+                combined.latencies[op].append(sum(v for v, _ in values) / len(values))
+        for op in counted:
+            counts = [s.counts[op][i] for s in series
+                    if op in s.counts and s.counts[op][i] is not None]
+            combined.counts[op].append(sum(counts) if counts else None)
+    return combined
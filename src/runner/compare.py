@@ -0,0 +1,239 @@
+import os
+import re
+import csv
+import json
+
+from .        import constants as const
+from .        import statmath
+from .journal import Journal
+from .stats   import Statistics, StatisticsSet, stat_type
+
+# Matches DBMS output directory names, e.g. 2016-01-01T12:00:00.123456-redis
+RE_OUTDIR = re.compile(r"^[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9:.]+-(.+)$")
+
+# Statistical tests available to compare()
+TESTS = ('welch', 'mannwhitney')
+
+# Fewest trials on each side of a point for its test to mean anything; points
+# with fewer are reported as insufficient rather than tested
+MIN_TRIALS = 2
+
+def lower_is_better(field):
+    """lower_is_better
+    Returns True if a decrease in the given statistic is an improvement (e.g.
+    latencies and runtimes), or False if an increase is (e.g. throughput)
+
+    :param field: Name of the statistic
+    """
+    return field in const.LOWER_IS_BETTER or field.endswith('_latency')
+
+def valid_field(field):
+    """valid_field
+    Returns True if the given field is a statistic which can be compared:
+    any statistic Statistics can store (see stat_type), or anomaly_score
+
+    :param field: Name of the statistic
+    """
+    return field == 'anomaly_score' or stat_type(field) is not None
+
+def load_outdir(path):
+    """load_outdir
+    Loads the stats of each DBMS from the output directories written by
+    Runner. path may be a DBMS's output directory, or the output_dir
+    containing them (in which case the newest one of each DBMS is used).
+    Stats are read from the journal if there is one, or the raw output CSV.
+
+    Returns a dict mapping each DBMS's name with label to a StatisticsSet
+
+    :param path: Output directory
+    """
+    dirs = {}
+    candidates = [path] + [os.path.join(path, d) for d in sorted(os.listdir(path))]
+    for outdir in candidates:
+        m = RE_OUTDIR.match(os.path.basename(os.path.normpath(outdir)))
+        if m is not None and os.path.isdir(outdir):
+            # Later (newer) directories replace earlier ones
+            dirs[m.group(1)] = outdir
+    sets = {}
+    for label, outdir in dirs.items():
+        names = os.listdir(outdir)
+        journals = [n for n in names if n.startswith("journal-") and n.endswith(".json")]
+        outputs = [n for n in names if n.startswith("output-") and n.endswith(".csv")]
+        if journals:
+            rows = Journal(os.path.join(outdir, journals[0])).statistics()
+        elif outputs:
+            rows = _read_csv(os.path.join(outdir, outputs[0]))
+        else:
+            continue
+        sets[label] = StatisticsSet(*rows)
+    return sets
+
+def _read_csv(path):
+    """_read_csv
+    Reads Statistics rows from a raw output CSV, ignoring derived columns
+    (e.g. anomaly_score)
+    """
+    rows = []
+    with open(path, newline='') as f:
+        for record in csv.DictReader(f):
+            rows.append(Statistics(**{k: stat_type(k)(float(v))
+                for k, v in record.items() if stat_type(k) is not None and v != ''}))
+    return rows
+
+def load_results_db(path):
+    """load_results_db
+    Loads the stats of the newest campaign of each DBMS from a results
+    database (see ResultsDb)
+
+    Returns a dict mapping each DBMS's name with label to a StatisticsSet
+
+    :param path: Path to the results database
+    """
+    from .results_db import ResultsDb
+    results = ResultsDb(path)
+    try:
+        latest = results.conn.execute("SELECT db, MAX(id) FROM runs GROUP BY db").fetchall()
+        return {db: StatisticsSet(*results.statistics(run_id)) for db, run_id in latest}
+    finally:
+        results.close()
+
+def load(path):
+    """load
+    Loads a result set from an output directory (see load_outdir) or a
+    results database file (see load_results_db)
+
+    :param path: Path to the output directory or results database
+    """
+    if os.path.isdir(path):
+        return load_outdir(path)
+    if os.path.isfile(path):
+        return load_results_db(path)
+    raise IOError("Result set '%s' does not exist" % path)
+
+def compare(baseline, candidate, fields=('throughput',), test='welch',
+        alpha=0.05, threshold=0.05):
+    """compare
+    Tests each (DBMS, MPL, field) found in both result sets for a
+    statistically significant change between the baseline and candidate
+    trials. A change is a regression if it is significant at the alpha level
+    and makes the field worse by more than threshold, relative to the
+    baseline mean. Points with fewer than MIN_TRIALS trials on either side
+    are insufficient, and DBMSes and MPLs found in only one of the result
+    sets are missing.
+
+    Returns a report dict, suitable for serializing as JSON
+
+    :param baseline: Dict mapping DBMS names to StatisticsSets (see load)
+    :param candidate: Dict mapping DBMS names to StatisticsSets (see load)
+    :param fields: Statistics fields to compare (raises ValueError if any
+        isn't a statistic; see valid_field)
+    :param test: Statistical test to use (see TESTS)
+    :param alpha: Significance level
+    :param threshold: Minimum relative change in the wrong direction for a
+        regression
+    """
+    if test not in TESTS:
+        raise ValueError("Unsupported test '%s': expected one of (%s)" %
+                (test, ','.join(TESTS)))
+    for field in fields:
+        if not valid_field(field):
+            raise ValueError("Unknown field '%s': expected a statistic, e.g. " %
+                    field + "throughput or read_avg_latency")
+    points = []
+    missing = sorted(set(baseline) ^ set(candidate))
+    for db in sorted(set(baseline) & set(candidate)):
+        for field in fields:
+            before = _samples(baseline[db], field)
+            after = _samples(candidate[db], field)
+            missing += ["%s:%s" % (db, mpl) for mpl in sorted(set(before) ^ set(after))
+                    if "%s:%s" % (db, mpl) not in missing]
+            for mpl in sorted(set(before) & set(after)):
+                points.append(_compare_point(db, mpl, field, before[mpl],
+                    after[mpl], test, alpha, threshold))
+    return {
+        'test'       : test,
+        'alpha'      : alpha,
+        'threshold'  : threshold,
+        'fields'     : list(fields),
+        'missing'    : missing,
+        'points'     : points,
+        'regressions': sum(1 for p in points if p['regression']),
+        'improvements': sum(1 for p in points if p['improvement']),
+        'insufficient': sum(1 for p in points if p['insufficient']),
+    }
+
+def gate(report, allow_missing=False):
+    """gate
+    Decides whether a compare() report should fail a regression gate
+
+    Returns a list of the reasons it fails, which is empty if it passes
+
+    :param report: Report returned by compare()
+    :param allow_missing: Whether DBMSes and MPLs found in only one of the
+        result sets are allowed
+    """
+    reasons = []
+    if report['regressions']:
+        reasons.append("%i regressions" % report['regressions'])
+    if report['insufficient']:
+        reasons.append("%i points with fewer than %i trials on a side" %
+                (report['insufficient'], MIN_TRIALS))
+    if report['missing'] and not allow_missing:
+        reasons.append("missing from one result set: %s" %
+                ", ".join(map(str, report['missing'])))
+    if not report['points']:
+        reasons.append("no points in common")
+    return reasons
+
+def _samples(stats_set, field):
+    """_samples
+    Returns a dict mapping each MPL in the given StatisticsSet to the list of
+    values of field across its trials, leaving out failed runs
+    """
+    samples = {}
+    for mpl, value, failed in zip(stats_set.column('mpl').tolist(),
+            stats_set.column(field).tolist(), stats_set.column('failed').tolist()):
+        if not failed:
+            samples.setdefault(mpl, []).append(float(value))
+    return samples
+
+def _compare_point(db, mpl, field, before, after, test, alpha, threshold):
+    """_compare_point
+    Compares the baseline and candidate trials of a single (DBMS, MPL,
+    field), returning its entry in the compare() report
+    """
+    insufficient = min(len(before), len(after)) < MIN_TRIALS
+    if insufficient:
+        p = float('nan')
+    elif test == 'welch':
+        p = statmath.welch_t_test(after, before)[2]
+    else:
+        p = statmath.mann_whitney_u(after, before)[1]
+    mean_before = sum(before) / len(before)
+    mean_after = sum(after) / len(after)
+    change = ((mean_after - mean_before) / abs(mean_before)
+            if mean_before != 0 else 0.)
+    # Positive if the field got worse
+    worse = -change if not lower_is_better(field) else change
+    significant = p == p and p < alpha
+    return {
+        'db'          : db,
+        'mpl'         : int(mpl),
+        'field'       : field,
+        'baseline_mean': mean_before,
+        'candidate_mean': mean_after,
+        'baseline_trials': len(before),
+        'candidate_trials': len(after),
+        'change'      : change,
+        'p_value'     : p if p == p else None,
+        'significant' : significant,
+        'insufficient': insufficient,
+        'regression'  : significant and worse > threshold,
+        'improvement' : significant and -worse > threshold,
+    }
+
+def dumps(report):
+    """dumps
+    Serializes a compare() report as JSON
+    """
+    return json.dumps(report, indent=2, sort_keys=True)
@@ -7,3 +7,16 @@ def csv2list(csv_str):
     :param csv_str: String of comma-separated values
     """
     return list(filter(lambda s: s != '', map(str.strip, csv_str.split(','))))
+
+def parse_option(t, value):
+    """parse_option
+    Converts a string value from the runner configuration file to the given
+    option type (see const.OPTION_KEYS), accepting the same boolean strings
+    as configparser.
+
+    :param t: Option type: bool, or a callable converting a string
+    :param value: String value to be converted
+    """
+    if t is bool:
+        return str(value).strip().lower() in ('1', 'yes', 'true', 'on')
+    return t(value)
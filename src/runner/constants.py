@@ -1,14 +1,20 @@
 import re
 
-from .             import const_helpers as helpers
-from .csv_exporter import CsvExporter
+from . import const_helpers as helpers
 
 ### OUTPUTS ########################################################
 
 # Supported output formats
+# Exporters are given as "module:class" paths (relative to this package if
+# the module starts with a dot), and are only imported when an export
+# actually runs, so their heavy dependencies (pandas, matplotlib) aren't
+# loaded otherwise. See exporter.get_exporter.
 SUPPORTED_OUTPUTS = {
-    'csv': CsvExporter,
+    'csv': '.csv_exporter:CsvExporter',
 }
+
+# Entry point group through which installed packages can provide exporters
+EXPORTER_ENTRY_POINT_GROUP = 'ycsb_runner.exporters'
 ####################################################################
 
 ### DATABASES: #####################################################
@@ -41,6 +47,21 @@ RE_DBNAME_LABEL = re.compile(r"(:[A-Za-z0-9_-]+$)")
 
 # Regexps for extracting port numbers, etc. from workload configurations
 RE_HOSTNAME_PORT  = re.compile(r"://(.+?):([0-9]{1,5})/?")
+RE_URL_HOSTNAME   = re.compile(r"://([^:/,?]+)")
+
+# Workload properties naming the server(s) targeted by each DBMS
+# Values may be URLs (e.g. jdbc:postgresql://host:5432/ycsb) or
+# comma-separated lists of hostnames (e.g. Cassandra's hosts property)
+TARGET_HOST_KEYS = {
+    'jdbc-mysql'    : 'db.url',
+    'jdbc-postgres' : 'db.url',
+    'mongodb'       : 'mongodb.url',
+    'redis'         : 'redis.host',
+    'cassandra-10'  : 'hosts',
+}
+
+# The host assumed when a DBMS's target host can't be determined
+DEFAULT_TARGET_HOST = "localhost"
 
 # Default DBMS settings to be substituted into clean commands
 CLEAN_DEFAULT_JDBC = {
@@ -108,6 +129,52 @@ CLEAN_COMMANDS = {
     ],
 }
 
+# Commands for snapshotting each DBMS's freshly loaded data, used by the
+# snapshot reset strategy. Each entry is a list of commands, run in order, with
+# the same {PLACEHOLDERS} as CLEAN_COMMANDS plus {SNAPSHOT_DIR}
+# NOTE: a PostgreSQL template database can't be copied while other sessions
+# are connected to it
+SNAPSHOT_COMMANDS = {
+    'jdbc-postgres': [
+        ["psql", "--host", "{JDBC_HOST}", "-d", "postgres", "-U", "{JDBC_USER}",
+            "-p", "{JDBC_PORT}", "-c",
+            "DROP DATABASE IF EXISTS {JDBC_DBNAME}_snapshot;"],
+        ["psql", "--host", "{JDBC_HOST}", "-d", "postgres", "-U", "{JDBC_USER}",
+            "-p", "{JDBC_PORT}", "-c",
+            "CREATE DATABASE {JDBC_DBNAME}_snapshot TEMPLATE {JDBC_DBNAME};"],
+    ],
+    'mongodb': [
+        ["mongodump", "--host", "{MONGO_HOST}", "--port", "{MONGO_PORT}",
+            "--db", "{MONGO_DBNAME}", "--out", "{SNAPSHOT_DIR}"],
+    ],
+}
+
+# Commands for restoring each DBMS's data from the snapshot taken by
+# SNAPSHOT_COMMANDS
+RESTORE_COMMANDS = {
+    'jdbc-postgres': [
+        ["psql", "--host", "{JDBC_HOST}", "-d", "postgres", "-U", "{JDBC_USER}",
+            "-p", "{JDBC_PORT}", "-c",
+            "DROP DATABASE IF EXISTS {JDBC_DBNAME};"],
+        ["psql", "--host", "{JDBC_HOST}", "-d", "postgres", "-U", "{JDBC_USER}",
+            "-p", "{JDBC_PORT}", "-c",
+            "CREATE DATABASE {JDBC_DBNAME} TEMPLATE {JDBC_DBNAME}_snapshot;"],
+    ],
+    'mongodb': [
+        ["mongorestore", "--host", "{MONGO_HOST}", "--port", "{MONGO_PORT}",
+            "--drop", "--db", "{MONGO_DBNAME}", "{SNAPSHOT_DIR}/{MONGO_DBNAME}"],
+    ],
+}
+
+# Ways of resetting the DBMS data before each run (the reset_strategy option)
+#   reload   = clean the DBMS and run 'ycsb load' before every run
+#   snapshot = load once, snapshot with SNAPSHOT_COMMANDS, and restore with
+#              RESTORE_COMMANDS before every later run
+#   datadir  = load once, stop the server and copy its data directory, then
+#              stop the server, copy the data directory back, and start the
+#              server before every later run (e.g. for Redis RDB files)
+RESET_STRATEGIES = ('reload', 'snapshot', 'datadir')
+
 ####################################################################
 
 ### CONFIGURATION: #################################################
@@ -125,8 +192,57 @@ CLEAN_COMMANDS = {
 # avgfields     =   fields to include in the averages data output (e.g. CSV cols)
 # plotkey       =   key to plot values against in output plot
 # plotfields    =   fields to include in the output plot
-# exportfields  =   fields to include in the raw data output (e.g. CSV cols)
+# exportfields  =   fields to include in the raw data output (e.g. CSV cols);
+#                   any of TRACKED_STATS may be added, e.g. reset_time, or
+#                   failed, retries and timeouts for runs which failed
 # clean_data    =   whether or not the DBMS data should be wiped prior to each YCSB run
+# parallel_group=   name of the parallel worker this DBMS should run in; DBMSes
+#                   sharing a group run one after another, while different
+#                   groups run concurrently unless they target the same
+#                   server (enables parallel mode if set)
+# export_mode   =   full: rewrite all outputs after each MPL; incremental:
+#                   append each new row to the raw output, and only
+#                   recompute averages and plots at aggregate_every boundaries
+# aggregate_every=  boundary (mpl, trial or db) at which averages and plots
+#                   are recomputed in incremental export mode
+# background_plots= whether plots should be rendered in a background process
+#                   rather than between YCSB runs
+# steady_state  =   whether the warm-up period should be detected from YCSB's
+#                   status reports, and steady-state stats reported
+# steady_state_window    = number of status reports in the moving window
+# steady_state_tolerance = max relative difference between the throughput in
+#                   the window and in the rest of the run for steady state
+# mpl_strategy  =   linear: run every MPL from min_mpl to max_mpl in steps of
+#                   inc_mpl; adaptive: search for the MPL with the highest
+#                   mpl_metric (the knee) in the first trial, and re-run the
+#                   MPLs it visited in later trials
+# mpl_metric    =   stat the adaptive MPL search maximises
+# mpl_factor    =   factor the MPL is multiplied by in the adaptive search's
+#                   coarse phase
+# mpl_resolution=   relative gap between MPLs (and drop in mpl_metric) at
+#                   which the adaptive search stops
+# timeout_clean =   seconds the clean, snapshot, restore and server commands
+#                   may each run for before they are killed (0 for no limit)
+# timeout_load  =   seconds ycsb load may run for before it is killed
+# timeout_run   =   seconds each ycsb run may run for before it is killed
+# stall_timeout =   seconds ycsb load or run may go without printing any
+#                   output (e.g. status reports) before it is killed
+# max_retries   =   number of times a run which failed (was killed, or a
+#                   clean, restore, load or run command or a worker failed)
+#                   is retried (after resetting the data again) before it is
+#                   recorded as failed
+# retry_backoff =   seconds to wait before the first retry of a run, doubling
+#                   with each further retry
+# sample_interval=  seconds between samples of the CPU, memory, context
+#                   switches and disk I/O of the YCSB clients and DBMS server
+#                   during each run (0, the default, disables sampling;
+#                   Linux only)
+# server_pids   =   IDs of the DBMS server processes to sample
+# server_processes= names of the DBMS server processes to sample (e.g.
+#                   redis-server), looked up at the start of each run
+# host_metrics  =   whether the host's CPU, disk, network, memory and load
+#                   should be measured over each load and run (default
+#                   false; Linux only)
 OPTION_KEYS = {
     'trials'       : int,
     'min_mpl'      : int,
@@ -142,6 +258,42 @@ OPTION_KEYS = {
     'plotfields'   : helpers.csv2list,
     'exportfields' : helpers.csv2list,
     'clean_data'   : bool,
+    'parallel_group': str,
+    'export_mode'  : lambda s: str(s).lower().strip(),
+    'aggregate_every': lambda s: str(s).lower().strip(),
+    'background_plots': bool,
+    'steady_state' : bool,
+    'steady_state_window': int,
+    'steady_state_tolerance': float,
+    'mpl_strategy' : lambda s: str(s).lower().strip(),
+    'mpl_metric'   : str,
+    'mpl_factor'   : float,
+    'mpl_resolution': float,
+    'ci_target'    : float,
+    'ci_confidence': float,
+    'ci_field'     : str,
+    'min_trials'   : int,
+    'reset_strategy': lambda s: str(s).lower().strip(),
+    'snapshot_dir' : str,
+    'datadir'      : str,
+    'server_stop'  : str,
+    'server_start' : str,
+    'load_threads' : int,
+    'load_processes': int,
+    'clients_per_run': int,
+    'workers'      : helpers.csv2list,
+    'worker_command': str,
+    'results_db'   : str,
+    'timeout_clean': int,
+    'timeout_load' : int,
+    'timeout_run'  : int,
+    'stall_timeout': int,
+    'max_retries'  : int,
+    'retry_backoff': float,
+    'sample_interval': float,
+    'server_pids'  : helpers.csv2list,
+    'server_processes': helpers.csv2list,
+    'host_metrics' : bool,
 }
 
 # Specifies default values for options in the Runner configuration file
@@ -159,22 +311,96 @@ OPTION_DEFAULTS = {
     'plotfields'   : 'anomaly_score',
     'exportfields' : 'mpl,runtime,throughput,trial',
     'clean_data'   : 'true',
+    'parallel_group': '',
+    'export_mode'  : 'full',
+    'aggregate_every': 'trial',
+    'background_plots': 'false',
+    'steady_state' : 'false',
+    'steady_state_window': 3,
+    'steady_state_tolerance': 0.1,
+    'mpl_strategy' : 'linear',
+    'mpl_metric'   : 'throughput',
+    'mpl_factor'   : 2.0,
+    'mpl_resolution': 0.1,
+    'ci_target'    : 0.0,
+    'ci_confidence': 0.95,
+    'ci_field'     : 'throughput',
+    'min_trials'   : 2,
+    'reset_strategy': 'reload',
+    'snapshot_dir' : '',
+    'datadir'      : '',
+    'server_stop'  : '',
+    'server_start' : '',
+    'load_threads' : 1,
+    'load_processes': 1,
+    'clients_per_run': 1,
+    'workers'      : '',
+    'worker_command': 'ycsb_worker.py',
+    'results_db'   : '',
+    'timeout_clean': 0,
+    'timeout_load' : 0,
+    'timeout_run'  : 0,
+    'stall_timeout': 0,
+    'max_retries'  : 2,
+    'retry_backoff': 30.0,
+    'sample_interval': 0.0,
+    'server_pids'  : '',
+    'server_processes': '',
+    'host_metrics' : 'false',
 }
+
+# Command which runs the worker agent on ssh:// workers, if not configured
+DEFAULT_WORKER_COMMAND = OPTION_DEFAULTS['worker_command']
+
+# Valid values of the export_mode option
+EXPORT_MODES = ('full', 'incremental')
+
+# Valid values of the mpl_strategy option
+MPL_STRATEGIES = ('linear', 'adaptive')
+
+# Points in a run at which stats are exported, from most to least frequent
+EXPORT_MPL   = 'mpl'
+EXPORT_TRIAL = 'trial'
+EXPORT_DB    = 'db'
+EXPORT_BOUNDARIES = (EXPORT_MPL, EXPORT_TRIAL, EXPORT_DB)
 ####################################################################
 
 ### STATS COLLECTION: ##############################################
 
-# Regex precompilation for statistics extraction
-# The first match group is extracted for each statistic
+# YCSB summary lines look like "[SECTION], Metric(unit), value" (or just
+# "[SECTION], value" for some workload-specific lines). This maps each tracked
+# statistic to the (SECTION, Metric) pair it is read from, with the unit
+# removed from the metric name and a metric of None for two-part lines.
 # The keys in this dict should match to keys in TRACKED_STATS
-STAT_REGEXPS = {
-    'totalcash'      : re.compile(r"TOTAL CASH], ([0-9]+)"),
-    'countcash'      : re.compile(r"COUNTED CASH], ([0-9]+)"),
-    'opcount'        : re.compile(r"ACTUAL OPERATIONS], ([0-9]+)"),
-    'runtime'        : re.compile(r"OVERALL], RunTime.+?, ([0-9.]+)"),
-    'throughput'     : re.compile(r"OVERALL], Throughput.+?, ([0-9.]+)"),
-    'latency_tx_rmw' : re.compile(r"TX-READMODIFYWRITE], AverageLatency.+?, ([0-9.]+)"),
+STAT_KEYS = {
+    'totalcash'      : ('TOTAL CASH'        , None            ),
+    'countcash'      : ('COUNTED CASH'      , None            ),
+    'opcount'        : ('ACTUAL OPERATIONS' , None            ),
+    'runtime'        : ('OVERALL'           , 'RunTime'       ),
+    'throughput'     : ('OVERALL'           , 'Throughput'    ),
+    'latency_tx_rmw' : ('TX-READMODIFYWRITE', 'AverageLatency'),
+}
+
+# Per-operation metrics are discovered dynamically: any "[OP], Metric, value"
+# line (other than [OVERALL]) becomes a statistic named <op>_<metric>, e.g.
+# "[READ], 99thPercentileLatency(us), 512" becomes read_p99_latency and
+# "[TX-READMODIFYWRITE], Return=0, 10" becomes tx_readmodifywrite_return_0.
+# Metric names are mapped using OP_STAT_METRICS, RE_PERCENTILE_METRIC, and
+# the Return= prefix; other metrics are ignored.
+OP_STAT_METRICS = {
+    'Operations'     : 'operations',
+    'AverageLatency' : 'avg_latency',
+    'MinLatency'     : 'min_latency',
+    'MaxLatency'     : 'max_latency',
 }
+RE_PERCENTILE_METRIC = re.compile(r"^([0-9]+(?:\.[0-9]+)?)(?:th)?PercentileLatency$")
+
+# Matches the names of dynamically discovered per-operation statistics
+RE_OP_STAT = re.compile(r"^[a-z][a-z0-9_]*_(operations|avg_latency|min_latency|" +
+    r"max_latency|p[0-9_]+_latency|return_[a-z0-9_]+|steady_latency)$")
+
+# Python type of dynamically discovered per-operation statistics
+OP_STAT_TYPE = float
 
 # Mappings of tracked statistics to their Python types
 # These Python types should be numerical, i.e. float, int, long
@@ -188,8 +414,76 @@ TRACKED_STATS = {
     'latency_tx_rmw' : float, # From YCSB output
     'mpl'            : int  , # Multiprogramming level (# threads)
     'trial'          : int  , # Trial number
+    'warmup_time'    : float, # Seconds before steady state (steady_state)
+    'steady_throughput': float, # Throughput after warm-up (steady_state)
+    'steady_latency' : float, # Avg latency after warm-up (steady_state)
+    'reset_time'     : float, # Seconds taken to reset the data before the run,
+                              # not counting any load (see load_runtime)
+    'load_runtime'   : float, # Seconds taken to load the data (0 if not loaded)
+    'load_throughput': float, # Records loaded per second (0 if not loaded)
+    'client'         : int  , # Client number (clients_per_run), 0 if combined
+    'failed'         : int  , # 1 if the run still failed after max_retries
+    'retries'        : int  , # Number of times the run was retried
+    'timeouts'       : int  , # Number of times the run was killed (see Watchdog)
+    # Resource usage of the YCSB client and DBMS server processes during the
+    # run (see sample_interval): CPU utilization in percent of one core, peak
+    # RSS in bytes, and totals of context switches and bytes read and written
+    'client_cpu_mean'    : float,
+    'client_cpu_max'     : float,
+    'client_rss_max'     : float,
+    'client_ctx_switches': float,
+    'client_read_bytes'  : float,
+    'client_write_bytes' : float,
+    'server_cpu_mean'    : float,
+    'server_cpu_max'     : float,
+    'server_rss_max'     : float,
+    'server_ctx_switches': float,
+    'server_read_bytes'  : float,
+    'server_write_bytes' : float,
 }
 
+# Metrics of the host measured over each run (as host_<metric> statistics)
+# and each load (as load_host_<metric>, set on the run following the load):
+# CPU utilization in percent of all cores, disk operations per second and
+# bytes, network bytes (all interfaces but loopback), and memory use in bytes
+# and 1-minute load average at the end of the phase (see runner.host_metrics)
+HOST_METRICS = ('cpu_user', 'cpu_sys', 'cpu_iowait', 'disk_read_iops',
+    'disk_write_iops', 'disk_read_bytes', 'disk_write_bytes', 'net_rx_bytes',
+    'net_tx_bytes', 'mem_used', 'loadavg')
+TRACKED_STATS.update({prefix + metric: float for metric in HOST_METRICS
+    for prefix in ('host_', 'load_host_')})
+
+# Phases each DBMS spends its wall-clock time in (see runner.phases): cleaning
+# the database, loading data, snapshotting and restoring data directories,
+# server control commands, JVM startup (spawning ycsb until its first output),
+# the rest of the YCSB run, waiting to retry, hooks and exporting stats. Each
+# run stores phase_<phase> statistics for the time since the previous run was
+# recorded, and phase_total for the whole of that time.
+PHASES = ('clean', 'load', 'snapshot', 'restore', 'server', 'startup', 'run',
+    'backoff', 'hooks', 'export')
+TRACKED_STATS.update({'phase_' + phase: float for phase in PHASES + ('total',)})
+
+# How each tracked statistic is combined across the clients of a run
+# (clients_per_run), as (aggregation, field to weight by). Aggregations are
+# sum, max, min, wmean (mean weighted by the weight field), and first (the
+# first client's value). Per-operation statistics are handled in
+# runner.clients.client_aggregate, and other statistics take the first value.
+# Every client validates the whole closed economy, so totalcash and countcash
+# are both whole-database totals and must be combined the same way.
+CLIENT_AGGREGATES = {
+    'totalcash'      : ('max', None),
+    'countcash'      : ('max', None),
+    'opcount'        : ('sum', None),
+    'runtime'        : ('max', None),
+    'throughput'     : ('sum', None),
+    'latency_tx_rmw' : ('wmean', 'tx_readmodifywrite_operations'),
+}
+
+# Statistics for which a decrease is an improvement, when comparing result
+# sets (see runner.compare); this also applies to every *_latency statistic
+LOWER_IS_BETTER = ('runtime', 'anomaly_score', 'warmup_time', 'reset_time',
+    'load_runtime')
+
 ####################################################################
 
 ### OUTPUT LOGGING: ################################################
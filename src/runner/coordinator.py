@@ -0,0 +1,114 @@
+import threading
+
+from .transport import make_transport, send, receive
+
+class Coordinator:
+    """Coordinator: Runs YCSB commands on a set of worker agents (see
+    runner.worker), starting them all at the same moment and streaming their
+    output back to the local parsers.
+
+    Each command is sent to a worker, along with the files it needs (e.g. the
+    generated workload file). Once every worker has written its files and is
+    ready, all of them are told to start, so that the clients' measurement
+    periods line up.
+    """
+    def __init__(self, workers, worker_command):
+        """__init__
+
+        :param workers: List of worker URLs (see transport.make_transport)
+        :param worker_command: Command which runs the worker agent over SSH
+        """
+        self.workers = workers
+        self.worker_command = worker_command
+        # Serializes logging and parsing of lines from the workers
+        self.__lock = threading.Lock()
+
+    def run(self, commands, files, log, parsers, watchdog=None):
+        """run
+        Runs each command on a worker (assigned round-robin) to completion
+
+        Returns a list of the exit code of each command. Raises a
+        RuntimeError if a worker fails or refuses a command.
+
+        :param commands: List of commands, each a list of strings
+        :param files: List of local file paths which appear in the commands,
+            and whose contents should be shipped to the workers
+        :param log: Function to which each line of output should be passed
+        :param parsers: List of tuples of parsers (objects with a feed(line)
+            method), one tuple per command
+        :param watchdog: Watchdog which may kill the commands (by telling
+            their workers to kill them), or None
+        """
+        contents = {}
+        for path in files:
+            with open(path) as f:
+                contents[path] = f.read()
+        transports = [make_transport(self.workers[i % len(self.workers)],
+            self.worker_command) for i in range(len(commands))]
+        codes = [None] * len(commands)
+        errors = []
+        try:
+            for transport, cmd in zip(transports, commands):
+                transport.open()
+                send(transport.wfile, cmd='run', argv=cmd,
+                        files={p: c for p, c in contents.items() if p in cmd})
+            # Wait for every worker to be ready before starting any of them
+            for transport in transports:
+                self.__expect_ready(transport)
+            for transport in transports:
+                send(transport.wfile, cmd='start')
+            if watchdog is not None:
+                parsers = [tuple(p) + (watchdog,) for p in parsers]
+                watchdog.add(lambda: self.__kill(transports))
+            threads = [threading.Thread(target=self.__stream,
+                args=(transport, log, p, codes, i, errors))
+                for i, (transport, p) in enumerate(zip(transports, parsers))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            for transport in transports:
+                transport.close()
+        if errors:
+            raise RuntimeError("Error: worker failed: %s" % '; '.join(errors))
+        return codes
+
+    def __kill(self, transports):
+        """__kill
+        Tells the worker behind each of the given transports to kill its
+        command
+        """
+        for transport in transports:
+            try:
+                send(transport.wfile, cmd='kill')
+            except (OSError, ValueError):
+                # Already disconnected
+                pass
+
+    def __expect_ready(self, transport):
+        """__expect_ready
+        Waits for the worker behind the given transport to be ready to start
+        """
+        message = receive(transport.rfile)
+        if message is None or not message.get('ready'):
+            raise RuntimeError("Error: worker not ready: %s" %
+                    (message or {}).get('error', 'disconnected'))
+
+    def __stream(self, transport, log, parsers, codes, i, errors):
+        """__stream
+        Logs and parses each line of output sent back by a worker until its
+        command exits, storing the exit code in codes[i]
+        """
+        while True:
+            message = receive(transport.rfile)
+            if message is None or 'error' in message:
+                errors.append((message or {}).get('error', 'disconnected'))
+                return
+            if 'exit' in message:
+                codes[i] = message['exit']
+                return
+            with self.__lock:
+                log(message['line'])
+                for parser in parsers:
+                    parser.feed(message['line'])
@@ -1,11 +1,8 @@
+import os
+import csv
 import collections
 import pandas as pd
 
-import matplotlib
-matplotlib.use('Agg')
-matplotlib.rc('font', family='sans-serif')
-
-from matplotlib import pyplot as plt
 from pandas     import DataFrame, concat
 
 from .exporter  import Exporter
@@ -19,48 +16,97 @@ class CsvExporter(Exporter):
     def export(self, filename, key, *fields):
         filename = filename + self.FILE_EXT
         # Export to CSV without indexes
-        DataFrame(self.stats_set.getfields(*fields)).to_csv(filename,
+        DataFrame(self.stats_set.columns(*fields)).to_csv(filename,
                 index=False)
 
-    def export_averages(self, filename, key, *fields):
+    def export_row(self, filename, stats, *fields):
+        filename = filename + self.FILE_EXT
+        with open(filename, 'a', newline='') as f:
+            writer = csv.writer(f)
+            # Write the header if this is a new file
+            if f.tell() == 0:
+                writer.writerow(fields)
+            writer.writerow([getattr(stats, field) for field in fields])
+            # Make sure the row survives a crash
+            f.flush()
+            os.fsync(f.fileno())
+
+    def export_averages(self, filename, key, *fields, ci_field=None,
+            ci_confidence=0.95):
         filename = filename + self.FILE_EXT
-        df = self.__dataframe(key, *fields)
-        df.groupby(key).mean().to_csv(filename)
+        fields = sorted(set(fields) - {key})
+        averages = self.__averages(key, 'mean', *fields)
+        if ci_field is not None:
+            # Half-width of the CI, relative to the mean, and number of trials
+            ci = self.__averages(key, 'ci%g' % (ci_confidence * 100), ci_field)[ci_field]
+            mean = self.__averages(key, 'mean', ci_field)[ci_field]
+            averages[ci_field + '_ci'] = ci
+            averages[ci_field + '_rel_ci'] = ci / mean.abs()
+            averages['trials'] = self.__averages(key, 'count', ci_field)[ci_field]
+        averages.to_csv(filename)
 
-    def export_averages_plot(self, filename, title, key, *fields):
+    def export_averages_plot(self, filename, title, key, *fields, renderer=None):
         #for field in fields:
         #filename = filename + "-" + field + self.PLOTS_FILE_EXT
-        pd.options.display.mpl_style = 'default'
         filename = filename + self.PLOTS_FILE_EXT
-        plt.figure()
-        fig, axes = plt.subplots(nrows=len(fields), ncols=1, sharex=True)
-
-        # axes must be iterable to satisfy later assumptions
-        if not isinstance(axes, collections.Iterable):
-            axes = axes,
-
-        # Plot each list field as a separate subplot
-        for i, field in enumerate(fields):
-            dfs = self.__dataframe(key, field).groupby(key)
+        frames = []
+        for field in fields:
             # We want to plot the minimum, maximum, average, and standard
             # deviation for a more representative analysis
-            dfs = concat([
-                dfs.max() .rename(columns=lambda s: 'max_'+s),
-                dfs.mean().rename(columns=lambda s: 'avg_'+s),
-                dfs.min() .rename(columns=lambda s: 'min_'+s),
-                dfs.std() .rename(columns=lambda s: 'std_'+s),
-            ], axis=1)
-            # Enlarge the graph if we're plotting multiple stats
-            fsz = (8,8) if i > 0 else None
-            dfs.plot(ax=axes[i], figsize=fsz)
+            frames.append(concat([
+                self.__averages(key, 'max' , field).rename(columns=lambda s: 'max_'+s),
+                self.__averages(key, 'mean', field).rename(columns=lambda s: 'avg_'+s),
+                self.__averages(key, 'min' , field).rename(columns=lambda s: 'min_'+s),
+                self.__averages(key, 'std' , field).rename(columns=lambda s: 'std_'+s),
+            ], axis=1))
+        if renderer is None:
+            render_plot(filename, title, frames)
+        else:
+            renderer.submit(filename, render_plot, filename, title, frames)
+
+    def __averages(self, key, how, *fields):
+        """__averages
+        Returns a DataFrame of the given fields aggregated by key, indexed by
+        key (see StatisticsSet.aggregate)
+        """
+        return DataFrame(self.stats_set.groupby(key, *fields, how=how)).set_index(key)
+
+def render_plot(filename, title, frames):
+    """render_plot
+    Plots each of the given DataFrames as a separate subplot, and saves the
+    figure to the given file. This is a module-level function so that it can
+    be run in a background process (see PlotRenderer).
+
+    :param filename: Filename and path for the plot output
+    :param title: Title shown above the first subplot
+    :param frames: List of DataFrames to be plotted
+    """
+    # matplotlib is only imported once a plot is needed, as it's slow to load
+    import matplotlib
+    matplotlib.use('Agg')
+    matplotlib.rc('font', family='sans-serif')
+    from matplotlib import pyplot as plt
+
+    pd.options.display.mpl_style = 'default'
+    plt.figure()
+    fig, axes = plt.subplots(nrows=len(frames), ncols=1, sharex=True)
+
+    # axes must be iterable to satisfy later assumptions
+    if not isinstance(axes, collections.Iterable):
+        axes = axes,
 
-        # Set the title above the first axis
-        axes[0].set_title(title)
-        # Tighten the layout, ensure all elements fit in the bounding box
-        plt.tight_layout()
-        # Finally, save and clear
-        plt.savefig(filename)
-        plt.clf()
+    # Plot each list field as a separate subplot
+    for i, dfs in enumerate(frames):
+        # Enlarge the graph if we're plotting multiple stats
+        fsz = (8,8) if i > 0 else None
+        dfs.plot(ax=axes[i], figsize=fsz)
 
-    def __dataframe(self, *fields):
-        return DataFrame(self.stats_set.getfields(*fields)).sort_index(axis=1)
+    # Set the title above the first axis
+    axes[0].set_title(title)
+    # Tighten the layout, ensure all elements fit in the bounding box
+    plt.tight_layout()
+    # Finally, save and clear
+    plt.savefig(filename)
+    plt.clf()
+    # Free the figures, as background render processes are long-lived
+    plt.close('all')
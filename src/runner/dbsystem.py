@@ -1,13 +1,23 @@
 import os
 import sys
+import glob
+import json
+import shlex
 import tempfile
-import subprocess
 
 from pyjavaproperties import Properties
 from datetime import datetime
 
 from .      import constants as const
+from .      import const_helpers as helpers
 from .stats import Statistics, StatisticsSet
+from .journal import Journal
+from .exporter import get_exporter, has_exporter, supported_outputs
+from .transport import make_transport
+from .mpl_strategy import LinearMplStrategy, FixedMplStrategy, AdaptiveMplStrategy
+from .ycsb_process import call
+from .resources import ResourceSampler
+from .phases import PhaseTimer
 
 class DbSystem:
     # A list of required configuration fields
@@ -22,9 +32,13 @@ class DbSystem:
     def __init__(self, dbname, config, label="",
             tablename=None, extraneous_config=None):
         # Ensure we have all required fields
-        self.__validate_config(config)
+        self.__validate_config(config, dbname)
         # Set public instance vars
         self.config = config
+        # Fill in defaults for any optional fields which weren't given
+        for k, t in const.OPTION_KEYS.items():
+            if k not in config and k in const.OPTION_DEFAULTS:
+                config[k] = helpers.parse_option(t, const.OPTION_DEFAULTS[k])
         self.dbname = dbname
         self.label = label
         self.tablename = tablename
@@ -35,6 +49,14 @@ class DbSystem:
         self.__logfile = None
         self.__temp_workload_file = None
         self.__base_workload_props = None
+        self.__temp_snapshot_dir = None
+        self.__journal = None
+        # YCSB status report time series for each run, keyed by (trial, mpl)
+        self.series = {}
+        # MPLs visited by the adaptive MPL search, replayed in later trials
+        self.mpl_points = []
+        # Wall-clock time spent in each phase of the runs (see PhaseTimer)
+        self.phases = PhaseTimer()
         # Set up the YCSB workload file
         self.workload_config = self.__generate_workload_config(extraneous_config)
         self.__create_temp_workload_file()
@@ -65,17 +87,56 @@ class DbSystem:
         objdir +=  list(self.config.keys())
         return objdir
 
-    def __validate_config(self, config):
+    def __validate_config(self, config, dbname=''):
         """__validate_config
         Ensure the given config dict contains all required keys, and no
         extraneous keys
-        Raises an AttributeError for invalid or missing keys
+        Raises an AttributeError for invalid or missing keys, and a ValueError
+        for invalid values
 
         :param config: dict of configuration key -> value mappings
+        :param dbname: Name of the DBMS being configured
         """
         for k in self.__REQUIRED_FIELDS:
             if k not in config:
                 raise AttributeError("Missing required configuration parameter: %s" % k)
+        if not has_exporter(config['output']):
+            raise ValueError("Invalid output '%s': expected one of (%s)" %
+                    (config['output'], ','.join(supported_outputs())))
+        if config.get('export_mode', 'full') not in const.EXPORT_MODES:
+            raise ValueError("Invalid export_mode '%s': expected one of (%s)" %
+                    (config['export_mode'], ','.join(const.EXPORT_MODES)))
+        if config.get('aggregate_every', 'trial') not in const.EXPORT_BOUNDARIES:
+            raise ValueError("Invalid aggregate_every '%s': expected one of (%s)" %
+                    (config['aggregate_every'], ','.join(const.EXPORT_BOUNDARIES)))
+        if not 0 < config.get('ci_confidence', 0.95) < 1:
+            raise ValueError("Invalid ci_confidence '%s': expected a value in (0, 1)" %
+                    config['ci_confidence'])
+        reset_strategy = config.get('reset_strategy', 'reload')
+        if reset_strategy not in const.RESET_STRATEGIES:
+            raise ValueError("Invalid reset_strategy '%s': expected one of (%s)" %
+                    (reset_strategy, ','.join(const.RESET_STRATEGIES)))
+        if (reset_strategy == 'snapshot' and
+                dbname.lower() not in const.SNAPSHOT_COMMANDS):
+            raise ValueError("The snapshot reset_strategy isn't supported for %s" %
+                    dbname)
+        if reset_strategy == 'datadir':
+            for k in ('datadir', 'server_stop', 'server_start'):
+                if not config.get(k):
+                    raise AttributeError("The datadir reset_strategy requires %s" % k)
+        for worker in config.get('workers', []):
+            make_transport(worker) # raises ValueError for invalid workers
+        if config.get('mpl_strategy', 'linear') not in const.MPL_STRATEGIES:
+            raise ValueError("Invalid mpl_strategy '%s': expected one of (%s)" %
+                    (config['mpl_strategy'], ','.join(const.MPL_STRATEGIES)))
+        for pid in config.get('server_pids', []):
+            if not pid.isdigit():
+                raise ValueError("Invalid server_pids '%s': expected process IDs" % pid)
+        for k in ('timeout_clean', 'timeout_load', 'timeout_run',
+                'stall_timeout', 'max_retries', 'retry_backoff'):
+            if config.get(k, 0) < 0:
+                raise ValueError("Invalid %s '%s': expected a value >= 0" %
+                        (k, config[k]))
         return True # presumably nothing was raised and all is well
 
     def __generate_workload_config(self, extraneous_config):
@@ -135,6 +196,8 @@ class DbSystem:
         subst = {
             "TABLENAME" : self.tablename,
         }
+        if any("{SNAPSHOT_DIR}" in s for s in lst):
+            subst["SNAPSHOT_DIR"] = self.snapshot_path
         # Add entries from {JDBC,MONGO}_CONFIG to subst, in the form
         #   {JDBC,MONGO}_{PORT,USER,PASSWD,DBNAME}
         subst.update({"JDBC_" +k.upper(): v for k, v in jdbc_config.items()})
@@ -156,6 +219,23 @@ class DbSystem:
         else:
             return True
 
+    @property
+    def target_hosts(self):
+        """target_hosts
+        A frozenset of the hostnames of the server(s) this DBMS runs on, as
+        given by the workload properties listed in const.TARGET_HOST_KEYS
+        """
+        key = const.TARGET_HOST_KEYS.get(self.dbname.lower())
+        if key is None or key not in self.workload_config:
+            return frozenset([const.DEFAULT_TARGET_HOST])
+        hosts = set()
+        for value in self.workload_config[key].split(','):
+            match = const.RE_URL_HOSTNAME.search(value)
+            host = match.group(1) if match else value.strip()
+            if host != '':
+                hosts.add(host.lower())
+        return frozenset(hosts or [const.DEFAULT_TARGET_HOST])
+
     @property
     def labelname(self):
         """labelname
@@ -177,6 +257,48 @@ class DbSystem:
             os.makedirs(self.__outdir)
         return self.__outdir
 
+    @property
+    def datestr(self):
+        """datestr
+        Timestamp of the campaign, as used in output directory and file names
+        """
+        return self.__datestr
+
+    @property
+    def journal(self):
+        """journal
+        The Journal of runs completed for this DBMS, stored in its output
+        directory
+        """
+        if self.__journal is None:
+            self.__journal = Journal(self.makefpath("journal-{}-{}.json"))
+        return self.__journal
+
+    def resume(self, path):
+        """resume
+        Points this DBMS's output at the output directory of an earlier,
+        unfinished campaign, so that its journal is picked up and its outputs
+        are added to. path may be that output directory, or the output_dir
+        containing it (in which case the newest one is used).
+
+        Returns True if an earlier output directory with a journal was found
+
+        :param path: Output directory to resume from
+        """
+        prefix = "journal-%s-" % self.labelname
+        candidates = [path] + sorted(glob.glob(os.path.join(glob.escape(path),
+            "*-" + glob.escape(self.labelname))), reverse=True)
+        for outdir in candidates:
+            if not os.path.isdir(outdir):
+                continue
+            for name in os.listdir(outdir):
+                if name.startswith(prefix) and name.endswith(".json"):
+                    self.__outdir = os.path.abspath(outdir)
+                    self.__datestr = name[len(prefix):-len(".json")]
+                    self.__journal = None
+                    return True
+        return False
+
     @property
     def logfile(self):
         """logfile
@@ -184,7 +306,8 @@ class DbSystem:
         """
         if self.__logfile == None or self.__logfile.closed:
             lfpath = self.makefpath("log-{}-{}.log")
-            self.__logfile = open(lfpath, 'w', 1)
+            # Append, so that resumed campaigns keep their earlier log
+            self.__logfile = open(lfpath, 'a', 1)
         return self.__logfile
 
     def log(self, message, lf=True, mpl=None, trial=None):
@@ -236,27 +359,153 @@ class DbSystem:
         """
         if self.__logfile != None and not self.__logfile.closed:
             self.__logfile.close()
+        if self.__temp_snapshot_dir is not None:
+            self.__temp_snapshot_dir.cleanup()
+            self.__temp_snapshot_dir = None
         if self.__temp_workload_file != None:
-            self.__temp_workload_file.close()
+            try:
+                self.__temp_workload_file.close()
+            except FileNotFoundError:
+                # Already removed by the worker process which ran this DB
+                pass
 
-    def export_stats(self):
+    def export_stats(self, boundary=const.EXPORT_MPL, renderer=None):
         """export_stats
         Writes output to the output directory using some Exporter
+
+        In full export mode, all outputs are rewritten at every MPL boundary.
+        In incremental mode, the newest stats row is appended to the raw
+        output at every MPL boundary, and averages and plots are only
+        recomputed at the configured aggregate_every boundary.
+
+        Returns True if anything was exported
+
+        :param boundary: The point in the run which has just been reached
+            (const.EXPORT_MPL, const.EXPORT_TRIAL or const.EXPORT_DB)
+        :param renderer: PlotRenderer to render plots in the background, or
+            None to render them immediately
         """
-        exporter = const.SUPPORTED_OUTPUTS[self.output](self.stats)
+        incremental = self.export_mode == 'incremental'
+        aggregate = boundary == (self.aggregate_every if incremental
+                else const.EXPORT_MPL)
+        if boundary != const.EXPORT_MPL and not aggregate:
+            return False
+        exporter = get_exporter(self.output)(self.stats)
         file_output   = self.makefpath("output-{}-{}")
         file_averages = self.makefpath("averages-{}-{}")
         file_plot     = self.makefpath("plot-{}-{}")
-        # Export averages
-        exporter.export_averages(file_averages, self.avgkey,
-                *self.avgfields)
         # Export all data
-        exporter.export(file_output, self.avgkey, *self.exportfields)
+        if not incremental:
+            exporter.export(file_output, self.avgkey, *self.exportfields)
+        elif boundary == const.EXPORT_MPL and len(self.stats) > 0:
+            exporter.export_row(file_output, self.stats[-1], *self.exportfields)
+        if not aggregate:
+            return True
+        # Export averages, leaving out failed runs
+        ci_field = self.ci_field if self.ci_target > 0 else None
+        completed = self.completed_stats
+        if completed is not self.stats:
+            exporter = get_exporter(self.output)(completed)
+        exporter.export_averages(file_averages, self.avgkey,
+                *self.avgfields, ci_field=ci_field,
+                ci_confidence=self.ci_confidence)
         # Output averages plot if configured
         if self.output_plots:
             exporter.export_averages_plot(file_plot, "{} {}".format(
                 self.labelname, self.__datestr),
-                    self.plotkey, *self.plotfields)
+                    self.plotkey, *self.plotfields, renderer=renderer)
+        return True
+
+    def ci_converged(self):
+        """ci_converged
+        Returns a dict mapping each MPL run so far to whether the half-width
+        of the confidence interval of ci_field at that MPL, relative to its
+        mean, is within ci_target (see sequential stopping in Runner)
+        """
+        how = 'ci%g' % (self.ci_confidence * 100)
+        stats = self.completed_stats
+        mpls, ci = stats.aggregate('mpl', self.ci_field, how)
+        _, means = stats.aggregate('mpl', self.ci_field, 'mean')
+        return {int(mpl): bool(c <= self.ci_target * abs(m))
+                for mpl, c, m in zip(mpls, ci, means)}
+
+    def add_client_stats(self, rows):
+        """add_client_stats
+        Appends the per-client Statistics rows of a multi-client run (see
+        clients_per_run) to this DB's client breakdown output
+
+        :param rows: List of Statistics, one per client
+        """
+        fields = ['trial', 'mpl', 'client']
+        fields += [f for f in self.exportfields if f not in fields]
+        exporter = get_exporter(self.output)(self.stats)
+        for row in rows:
+            exporter.export_row(self.makefpath("clients-{}-{}"), row, *fields)
+
+    def add_series(self, trial, mpl, series):
+        """add_series
+        Stores the status report time series for the given run in
+        self.series, and appends it to this DB's series output file (one JSON
+        object per line)
+
+        :param trial: Trial number of the run
+        :param mpl: MPL of the run
+        :param series: StatusSeries instance for the run
+        """
+        self.series[(trial, mpl)] = series
+        with open(self.makefpath("series-{}-{}.jsonl"), 'a') as f:
+            f.write(json.dumps(dict(series.dict(), trial=trial, mpl=mpl),
+                separators=(',', ':')) + "\n")
+
+    def add_resources(self, trial, mpl, sampler):
+        """add_resources
+        Appends the resource usage samples taken during the given run to this
+        DB's resources output file (one JSON object per line)
+
+        :param trial: Trial number of the run
+        :param mpl: MPL of the run
+        :param sampler: ResourceSampler which sampled the run
+        """
+        with open(self.makefpath("resources-{}-{}.jsonl"), 'a') as f:
+            f.write(json.dumps(dict(sampler.dict(), trial=trial, mpl=mpl),
+                separators=(',', ':')) + "\n")
+
+    def make_sampler(self):
+        """make_sampler
+        Returns a ResourceSampler for the next run, which samples the YCSB
+        clients and the configured server processes every sample_interval
+        seconds
+        """
+        return ResourceSampler(self.sample_interval,
+                [int(pid) for pid in self.server_pids], self.server_processes)
+
+    def make_mpl_strategy(self):
+        """make_mpl_strategy
+        Returns the MplStrategy which chooses the MPLs for the next trial. In
+        adaptive mode, trials after the first re-run the MPLs visited by the
+        first trial's search (see record_mpl_points), so that every trial
+        measures the same MPLs.
+        """
+        if self.mpl_strategy == 'adaptive':
+            if self.mpl_points:
+                return FixedMplStrategy(self.mpl_points)
+            return AdaptiveMplStrategy(self.min_mpl, self.max_mpl,
+                    self.mpl_factor, self.mpl_resolution)
+        return LinearMplStrategy(self.min_mpl, self.max_mpl, self.inc_mpl)
+
+    def record_mpl_points(self, visited):
+        """record_mpl_points
+        Stores the MPLs visited by an adaptive MPL search in self.mpl_points,
+        and writes them to this DB's MPL points output file in the order they
+        were visited
+
+        :param visited: List of (mpl, value) tuples (see MplStrategy.visited)
+        """
+        self.mpl_points = [mpl for mpl, _ in visited]
+        with open(self.makefpath("mpl-points-{}-{}.csv"), 'w') as f:
+            f.write("mpl,%s\n" % self.mpl_metric)
+            for mpl, value in visited:
+                f.write("%i,%s\n" % (mpl, value))
 
     @property
     def workload_path(self):
@@ -287,11 +536,15 @@ class DbSystem:
             for k, v in sorted(self.workload_config.items()):
                 f.write("{}={}\n".format(k, v))
 
-    def cmd_ycsb_load(self):
+    def cmd_ycsb_load(self, insertstart=None, insertcount=None):
         """cmd_ycsb_load
         Gets the YCSB load command as a list that may be passed to Popen
+
+        :param insertstart: First key to insert, or None for the workload's
+        :param insertcount: Number of records to insert, or None for the
+            workload's
         """
-        return [
+        cmd = [
             "ycsb",
             "load",
             self.__ycsb_dbname(self.dbname),
@@ -299,14 +552,27 @@ class DbSystem:
             self.workload_path,
             "-s",
             "-threads",
-            "1",
+            str(self.load_threads),
         ]
-
-    def cmd_ycsb_run(self, mpl):
+        if insertstart is not None:
+            cmd += ["-p", "insertstart=%i" % insertstart]
+        if insertcount is not None:
+            cmd += ["-p", "insertcount=%i" % insertcount]
+        return cmd
+
+    def cmd_ycsb_run(self, mpl, operationcount=None, insertstart=None,
+            insertcount=None):
         """cmd_ycsb_run
         Gets the YCSB run command as a list that may be passed to Popen
+
+        :param mpl: Number of YCSB threads
+        :param operationcount: Number of operations to run, or None for the
+            workload's
+        :param insertstart: First key to operate on, or None for the workload's
+        :param insertcount: Number of keys to operate on, or None for the
+            workload's
         """
-        return [
+        cmd = [
             "ycsb",
             "run",
             self.__ycsb_dbname(self.dbname),
@@ -316,21 +582,88 @@ class DbSystem:
             "-threads",
             str(mpl),
         ]
+        if operationcount is not None:
+            cmd += ["-p", "operationcount=%i" % operationcount]
+        if insertstart is not None:
+            cmd += ["-p", "insertstart=%i" % insertstart]
+        if insertcount is not None:
+            cmd += ["-p", "insertcount=%i" % insertcount]
+        return cmd
 
     def clean(self):
         """clean
         Cleans all YCSB+T data from the database by calling the corresponding
         clean command (configured in constants.py)
 
-        This should be called BEFORE the DB is processed
+        This should be called BEFORE the DB is processed. Raises a
+        ProcessTimeout if the command runs for longer than timeout_clean.
         """
-        excode = subprocess.call(self.__templateify(const.CLEAN_COMMANDS[self.dbname.lower()]))
+        with self.phases.phase('clean'):
+            excode = call(self.__templateify(const.CLEAN_COMMANDS[self.dbname.lower()]),
+                    self.timeout_clean)
         # We don't want to continue if cleaning the DB failed (see #7)
         if excode != 0:
             raise RuntimeError("Error: db.clean() did not complete " +
                 "successfully for DB %s" % self.dbname.lower())
         return excode
 
+    def snapshot(self):
+        """snapshot
+        Snapshots the DBMS's data by calling the corresponding snapshot
+        commands (configured in constants.py)
+        """
+        with self.phases.phase('snapshot'):
+            self.__run_commands(const.SNAPSHOT_COMMANDS[self.dbname.lower()], "snapshot")
+
+    def restore(self):
+        """restore
+        Restores the DBMS's data from the snapshot taken by snapshot() by
+        calling the corresponding restore commands (configured in constants.py)
+        """
+        with self.phases.phase('restore'):
+            self.__run_commands(const.RESTORE_COMMANDS[self.dbname.lower()], "restore")
+
+    def server_control(self, action):
+        """server_control
+        Stops or starts the DBMS server using the server_stop or server_start
+        command from the configuration
+
+        :param action: 'stop' or 'start'
+        """
+        command = self.config['server_' + action]
+        with self.phases.phase('server'):
+            self.__run_commands([shlex.split(command)], "server_" + action)
+
+    def __run_commands(self, commands, name):
+        """__run_commands
+        Runs each of the given commands in order, after substituting
+        {PLACEHOLDERS}. Raises a RuntimeError if any command fails, or a
+        ProcessTimeout if any runs for longer than timeout_clean.
+
+        :param commands: List of commands, each a list of strings
+        :param name: Name of the operation, for error messages
+        """
+        for command in commands:
+            excode = call(self.__templateify(command), self.timeout_clean)
+            if excode != 0:
+                raise RuntimeError("Error: db.%s() did not complete " % name +
+                    "successfully for DB %s" % self.dbname.lower())
+
+    @property
+    def snapshot_path(self):
+        """snapshot_path
+        Directory in which snapshots of this DB's data are stored: the
+        configured snapshot_dir, or a temporary directory which is removed by
+        cleanup()
+        """
+        if self.snapshot_dir:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            return os.path.abspath(self.snapshot_dir)
+        if self.__temp_snapshot_dir is None:
+            self.__temp_snapshot_dir = tempfile.TemporaryDirectory(
+                    prefix="ycsb-snapshot-")
+        return self.__temp_snapshot_dir.name
+
     @property
     def stats(self):
         """stats
@@ -341,6 +674,16 @@ class DbSystem:
             self.__stats = StatisticsSet()
         return self.__stats
 
+    @property
+    def completed_stats(self):
+        """completed_stats
+        A StatisticsSet of the runs in self.stats which didn't fail (see
+        max_retries), to be averaged. This is self.stats if none failed.
+        """
+        if not self.stats.column('failed').any():
+            return self.stats
+        return StatisticsSet(*[s for s in self.stats.items() if not s.failed])
+
     def makefpath(self, fstr):
         """makefpath
         Given a filename containing two format string spaces ({} {}), returns
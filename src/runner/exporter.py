@@ -1,3 +1,8 @@
+import functools
+import importlib
+
+from . import constants as const
+
 class Exporter:
     # Extensions for output files
     FILE_EXT       = ".txt"
@@ -21,7 +26,20 @@ class Exporter:
         """
         raise NotImplementedError
 
-    def export_averages(self, filename, key, *fields):
+    def export_row(self, filename, stats, *fields):
+        """export_row
+        Appends the given fields of a single Statistics row to the given
+        file, in the same format as export(), and flushes it to disk. The
+        file is created (with any header) if it doesn't exist.
+
+        :param filename: Filename and path for the export output
+        :param stats: Statistics object to be appended
+        :param *fields: Fields to be exported
+        """
+        raise NotImplementedError
+
+    def export_averages(self, filename, key, *fields, ci_field=None,
+            ci_confidence=0.95):
         """export_averages
         Exports the averages of the given fields, grouped by the given key, to
           the given CSV file.
@@ -29,14 +47,83 @@ class Exporter:
         :param filename: Filename and path for export output
         :param key: Key to group by
         :param *fields: Fields to average
+        :param ci_field: Field whose confidence interval and number of trials
+            are exported alongside the averages, or None for neither
+        :param ci_confidence: Confidence level of the exported interval
         """
         raise NotImplementedError
 
-    def export_averages_plot(self, filename, key, *fields):
+    def export_averages_plot(self, filename, key, *fields, renderer=None):
         """export_plot
         Automatically generates and saves a plot of the given fields
 
         :param filename: Filename and path for the plot output
         :param *fields: Fields to be plotted
+        :param renderer: PlotRenderer to render the plot in the background,
+            or None to render it immediately
         """
         raise NotImplementedError
+
+# Exporter classes which have already been resolved, keyed by output name
+_resolved = {}
+
+def get_exporter(name):
+    """get_exporter
+    Returns the Exporter class for the given output format, importing it on
+    first use. Output formats are looked up in const.SUPPORTED_OUTPUTS, whose
+    values may be "module:class" paths or Exporter classes, and then in the
+    const.EXPORTER_ENTRY_POINT_GROUP entry points of installed packages.
+
+    Raises ValueError if the output format isn't supported
+
+    :param name: Name of the output format (e.g. csv)
+    """
+    if name in _resolved:
+        return _resolved[name]
+    spec = const.SUPPORTED_OUTPUTS.get(name)
+    if spec is None:
+        spec = _entry_points().get(name)
+        if spec is None:
+            raise ValueError("Unsupported output format '%s': expected one of (%s)" %
+                    (name, ','.join(supported_outputs())))
+        cls = spec.load()
+    elif isinstance(spec, str):
+        modname, _, clsname = spec.partition(':')
+        cls = getattr(importlib.import_module(modname, package=__package__), clsname)
+    else:
+        cls = spec
+    _resolved[name] = cls
+    return cls
+
+def has_exporter(name):
+    """has_exporter
+    Returns True if the given output format is supported, without importing
+    its exporter
+
+    :param name: Name of the output format (e.g. csv)
+    """
+    return name in const.SUPPORTED_OUTPUTS or name in _entry_points()
+
+def supported_outputs():
+    """supported_outputs
+    Returns a sorted list of the names of all supported output formats,
+    without importing any exporters
+    """
+    return sorted(set(const.SUPPORTED_OUTPUTS.keys()) | set(_entry_points().keys()))
+
+@functools.lru_cache(maxsize=None)
+def _entry_points():
+    """_entry_points
+    Returns a dict mapping output format names to the exporter entry points
+    provided by installed packages
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return {}
+    try:
+        eps = entry_points(group=const.EXPORTER_ENTRY_POINT_GROUP)
+    except TypeError:
+        # Python < 3.10
+        eps = entry_points().get(const.EXPORTER_ENTRY_POINT_GROUP, [])
+    return {ep.name: ep for ep in eps}
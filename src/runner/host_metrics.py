@@ -0,0 +1,175 @@
+import os
+import time
+
+# Root of the proc filesystem (Linux only; host metrics are disabled without it)
+PROC = "/proc"
+
+# Lists the host's block devices, without their partitions
+SYS_BLOCK = "/sys/block"
+
+# Block devices which aren't physical disks, or which would count the I/O of
+# other devices twice
+VIRTUAL_DISKS = ('loop', 'ram', 'zram', 'dm-', 'md', 'sr', 'fd')
+
+# Disk sectors are always 512 bytes in /proc/diskstats
+SECTOR_SIZE = 512
+
+def supported():
+    """supported
+    Returns True if host metrics can be read on this system
+    """
+    return os.path.exists(os.path.join(PROC, "stat"))
+
+def read_cpu():
+    """read_cpu
+    Reads the host's total CPU times from /proc/stat
+
+    Returns a tuple of user, system and iowait times, and the total of all
+    times, in clock ticks
+    """
+    with open(os.path.join(PROC, "stat")) as f:
+        # cpu user nice system idle iowait irq softirq steal ...
+        ticks = [int(t) for t in f.readline().split()[1:9]]
+    user, nice, system, idle, iowait, irq, softirq, steal = ticks + [0] * (8 - len(ticks))
+    return user + nice, system + irq + softirq, iowait, sum(ticks)
+
+def read_disks():
+    """read_disks
+    Reads the total I/O of the host's physical disks from /proc/diskstats
+    (partitions and virtual devices are left out, so that nothing is counted
+    twice)
+
+    Returns a tuple of reads and writes completed, and bytes read and written
+    """
+    disks = None
+    if os.path.isdir(SYS_BLOCK):
+        disks = set(os.listdir(SYS_BLOCK))
+    totals = [0, 0, 0, 0]
+    with open(os.path.join(PROC, "diskstats")) as f:
+        for line in f:
+            fields = line.split()
+            name = fields[2]
+            if (disks is not None and name not in disks) or name.startswith(VIRTUAL_DISKS):
+                continue
+            totals[0] += int(fields[3])
+            totals[1] += int(fields[7])
+            totals[2] += int(fields[5]) * SECTOR_SIZE
+            totals[3] += int(fields[9]) * SECTOR_SIZE
+    return tuple(totals)
+
+def read_net():
+    """read_net
+    Reads the total bytes received and sent by the host's network interfaces
+    (except loopback) from /proc/net/dev
+
+    Returns a tuple of bytes received and bytes sent
+    """
+    rx = tx = 0
+    with open(os.path.join(PROC, "net", "dev")) as f:
+        for line in f:
+            name, sep, counters = line.partition(':')
+            if not sep or name.strip() == 'lo':
+                continue
+            counters = counters.split()
+            rx += int(counters[0])
+            tx += int(counters[8])
+    return rx, tx
+
+def read_mem_used():
+    """read_mem_used
+    Reads the host's memory in use (total less available) from /proc/meminfo,
+    in bytes
+    """
+    mem = {}
+    with open(os.path.join(PROC, "meminfo")) as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            mem[key] = int(value.split()[0]) * 1024
+    return mem.get('MemTotal', 0) - mem.get('MemAvailable', mem.get('MemFree', 0))
+
+def read_loadavg():
+    """read_loadavg
+    Reads the host's 1-minute load average from /proc/loadavg
+    """
+    with open(os.path.join(PROC, "loadavg")) as f:
+        return float(f.read().split()[0])
+
+def snapshot():
+    """snapshot
+    Reads the host's counters (see read_cpu, read_disks and read_net), along
+    with the time they were read at
+
+    Returns a dict
+    """
+    return {
+        'time': time.monotonic(),
+        'cpu' : read_cpu(),
+        'disk': read_disks(),
+        'net' : read_net(),
+    }
+
+def deltas(before, after):
+    """deltas
+    Computes the host metrics (see const.HOST_METRICS) for the period
+    between two snapshots
+
+    Returns a dict mapping each metric to its value
+
+    :param before: snapshot() taken at the start of the period
+    :param after: snapshot() taken at the end of the period
+    """
+    elapsed = after['time'] - before['time']
+    cpu = [a - b for a, b in zip(after['cpu'], before['cpu'])]
+    disk = [a - b for a, b in zip(after['disk'], before['disk'])]
+    net = [a - b for a, b in zip(after['net'], before['net'])]
+    total = cpu[3]
+    return {
+        'cpu_user'        : 100. * cpu[0] / total if total > 0 else 0.,
+        'cpu_sys'         : 100. * cpu[1] / total if total > 0 else 0.,
+        'cpu_iowait'      : 100. * cpu[2] / total if total > 0 else 0.,
+        'disk_read_iops'  : disk[0] / elapsed if elapsed > 0 else 0.,
+        'disk_write_iops' : disk[1] / elapsed if elapsed > 0 else 0.,
+        'disk_read_bytes' : float(disk[2]),
+        'disk_write_bytes': float(disk[3]),
+        'net_rx_bytes'    : float(net[0]),
+        'net_tx_bytes'    : float(net[1]),
+        'mem_used'        : float(read_mem_used()),
+        'loadavg'         : read_loadavg(),
+    }
+
+class HostMetrics:
+    """HostMetrics: Measures the host's CPU utilization, disk and network I/O,
+    memory use and load over a phase of the run (e.g. a load or a YCSB run),
+    from the counters in /proc. Used as a context manager around the phase.
+
+    This is the host YCSB Runner runs on, which is also the DBMS server's
+    host unless the DBMS is remote.
+    """
+    def __init__(self, enabled=True):
+        """__init__
+
+        :param enabled: Whether to measure anything (nothing is measured on
+            systems without /proc either)
+        """
+        self.enabled = enabled and supported()
+        self.__before = None
+        self.__metrics = {}
+
+    def __enter__(self):
+        if self.enabled:
+            self.__before = snapshot()
+        return self
+
+    def __exit__(self, *exc):
+        if self.__before is not None:
+            self.__metrics = deltas(self.__before, snapshot())
+
+    def stats(self, prefix='host_'):
+        """stats
+        Returns a dict mapping the Statistics field of each metric (the
+        metric name with the given prefix) to its value, or an empty dict if
+        nothing was measured
+
+        :param prefix: Prefix of the Statistics fields
+        """
+        return {prefix + k: v for k, v in self.__metrics.items()}
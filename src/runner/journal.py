@@ -0,0 +1,119 @@
+import os
+import json
+import tempfile
+
+from .stats import Statistics
+
+def atomic_write(path, data):
+    """atomic_write
+    Replaces the contents of the given file with data, such that a crash at
+    any point leaves either the old or the new contents in place: data is
+    written and synced to a temporary file in the same directory, which is
+    then renamed over the original
+
+    :param path: Path to the file to write
+    :param data: String to write
+    """
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=dirname, prefix=".tmp-",
+            suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    # Make sure the rename itself survives a crash
+    dirfd = os.open(dirname, os.O_RDONLY)
+    try:
+        os.fsync(dirfd)
+    finally:
+        os.close(dirfd)
+
+class Journal:
+    """Journal: Durable record of the runs completed for a DBMS, so that a
+    crashed or interrupted campaign can be resumed (see Runner's resume
+    option).
+
+    The journal is a JSON file which is rewritten atomically (see
+    atomic_write) after each run, holding the Statistics of every completed
+    (trial, mpl), and any other state needed to resume.
+    """
+    def __init__(self, path):
+        """__init__
+        Opens the journal at the given path, reading it if it exists
+
+        :param path: Path to the journal file
+        """
+        self.path = path
+        self.runs = []
+        self.state = {}
+        self.finished = False
+        self.__completed = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                journal = json.load(f)
+            self.state = journal.get('state', {})
+            self.finished = journal.get('finished', False)
+            for run in journal.get('runs', []):
+                self.__add(run['trial'], run['mpl'], run['stats'])
+
+    def __len__(self):
+        """__len__
+        Number of completed runs recorded
+        """
+        return len(self.runs)
+
+    def __add(self, trial, mpl, stats):
+        self.runs.append({'trial': trial, 'mpl': mpl, 'stats': stats})
+        self.__completed[(trial, mpl)] = stats
+
+    def completed(self, trial, mpl):
+        """completed
+        Returns the Statistics recorded for the given run, or None if it
+        hasn't been completed
+
+        :param trial: Trial number
+        :param mpl: MPL
+        """
+        stats = self.__completed.get((trial, mpl))
+        return None if stats is None else Statistics(**stats)
+
+    def statistics(self):
+        """statistics
+        Returns a list of the Statistics of every completed run, in the order
+        they were run
+        """
+        return [Statistics(**run['stats']) for run in self.runs]
+
+    def record(self, trial, mpl, stats):
+        """record
+        Records the given run as completed, and writes the journal
+
+        :param trial: Trial number
+        :param mpl: MPL
+        :param stats: Statistics for the run
+        """
+        self.__add(trial, mpl, stats.dict())
+        self.write()
+
+    def finish(self):
+        """finish
+        Records that every run has been completed, and writes the journal
+        """
+        self.finished = True
+        self.write()
+
+    def write(self):
+        """write
+        Atomically writes the journal to its file
+        """
+        atomic_write(self.path, json.dumps({
+            'finished': self.finished,
+            'state'   : self.state,
+            'runs'    : self.runs,
+        }, separators=(',', ':')))
@@ -0,0 +1,116 @@
+import time
+import threading
+
+from .clients       import split_range
+from .host_metrics  import HostMetrics
+from .output_parser import OutputParser
+from .ycsb_process  import YcsbProcess, Watchdog
+
+class YcsbLoader:
+    """YcsbLoader: Loads the YCSB data into a DBMS using load_processes
+    concurrent 'ycsb load' processes of load_threads threads each.
+
+    Each process inserts a disjoint range of keys (set with the insertstart
+    and insertcount properties), and the total number of records inserted is
+    checked against the workload's recordcount.
+    """
+    def __init__(self, db):
+        """__init__
+
+        :param db: DbSystem instance to load
+        """
+        self.db = db
+        # Serializes logging of lines from the concurrent processes
+        self.__lock = threading.Lock()
+
+    def shards(self):
+        """shards
+        Returns a list of (insertstart, insertcount) tuples, one for each
+        load process, or [(None, None)] if the load shouldn't be sharded
+        """
+        config = self.db.workload_config
+        if self.db.load_processes <= 1 or 'recordcount' not in config:
+            return [(None, None)]
+        start = int(config.get('insertstart', 0))
+        count = int(config.get('insertcount',
+            int(config['recordcount']) - start))
+        return split_range(start, count, self.db.load_processes)
+
+    def expected(self):
+        """expected
+        Returns the number of records the load should insert, or None if
+        unknown
+        """
+        config = self.db.workload_config
+        if 'insertcount' in config:
+            return int(config['insertcount'])
+        if 'recordcount' in config:
+            return int(config['recordcount']) - int(config.get('insertstart', 0))
+        return None
+
+    def run(self):
+        """run
+        Runs the load processes to completion
+
+        Returns a dict of load statistics (load_runtime in seconds,
+        load_throughput in records per second, and the load_host_* metrics of
+        the host during the load). Raises a RuntimeError if any process
+        exited with an error, or if the processes of a sharded load inserted
+        a different number of records than the workload's (a single process
+        only logs a warning, since YCSB may have retried some inserts), a
+        ProcessTimeout if the load was killed
+        for exceeding timeout_load or stall_timeout, or the first exception
+        raised by any of the processes.
+        """
+        shards = self.shards()
+        parsers = [OutputParser() for _ in shards]
+        watchdog = Watchdog("ycsb load", self.db.timeout_load,
+                self.db.stall_timeout)
+        processes = [YcsbProcess(self.db.cmd_ycsb_load(*shard), self.__log,
+            parser, watchdog=watchdog) for shard, parser in zip(shards, parsers)]
+        start = time.monotonic()
+        with self.db.phases.phase('load'), watchdog, \
+                HostMetrics(self.db.host_metrics) as host:
+            errors = []
+            threads = [threading.Thread(target=self.__run, args=(p, errors))
+                    for p in processes]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        codes = [p.returncode for p in processes if p.returncode]
+        if codes:
+            raise RuntimeError("Error: ycsb load exited with code %i for DB %s" %
+                    (codes[0], self.db.dbname.lower()))
+        runtime = time.monotonic() - start
+        inserted = sum(float(p.get('INSERT', 'Operations') or 0) for p in parsers)
+        expected = self.expected()
+        if expected is not None and inserted != expected:
+            message = ("ycsb load inserted %i of %i records " % (inserted, expected) +
+                    "for DB %s" % self.db.dbname.lower())
+            if len(shards) > 1:
+                raise RuntimeError("Error: " + message)
+            self.db.log("Warning: " + message)
+        return dict(host.stats('load_host_'), **{
+            'load_runtime': runtime,
+            'load_throughput': inserted / runtime if runtime > 0 else 0.,
+        })
+
+    def __run(self, process, errors):
+        """__run
+        Runs one of the load processes, storing any exception it raises in
+        errors so that run() can raise it
+        """
+        try:
+            process.run()
+        except BaseException as e:
+            errors.append(e)
+
+    def __log(self, line):
+        """__log
+        Logs a line of output from one of the load processes
+        """
+        with self.__lock:
+            self.db.raw_log(line)
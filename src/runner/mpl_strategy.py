@@ -0,0 +1,115 @@
+# The golden ratio conjugate, used to place probes in AdaptiveMplStrategy
+GOLDEN = (5 ** 0.5 - 1) / 2
+
+class MplStrategy:
+    """MplStrategy: Chooses the MPLs (YCSB thread counts) to run for a trial.
+
+    Iterating over a strategy yields each MPL to run; the result of each run
+    must be given to record() before the next MPL is requested.
+    """
+    def __init__(self):
+        # (mpl, value) for each MPL run, in the order they were run
+        self.visited = []
+
+    def __iter__(self):
+        raise NotImplementedError
+
+    def record(self, mpl, value):
+        """record
+        Records the measured value (e.g. throughput) for the given MPL
+
+        :param mpl: MPL which was run
+        :param value: Value measured at that MPL
+        """
+        self.visited.append((mpl, value))
+
+    @property
+    def points(self):
+        """points
+        A list of the MPLs run so far, in the order they were run
+        """
+        return [mpl for mpl, _ in self.visited]
+
+class LinearMplStrategy(MplStrategy):
+    """LinearMplStrategy: Runs every MPL from min_mpl to max_mpl in steps of
+    inc_mpl"""
+    def __init__(self, min_mpl, max_mpl, inc_mpl):
+        super().__init__()
+        self.min_mpl = min_mpl
+        self.max_mpl = max_mpl
+        self.inc_mpl = inc_mpl
+
+    def __iter__(self):
+        mpl = self.min_mpl
+        while mpl <= self.max_mpl:
+            yield mpl
+            mpl += self.inc_mpl
+
+class FixedMplStrategy(MplStrategy):
+    """FixedMplStrategy: Runs a given list of MPLs, e.g. those visited by an
+    adaptive search in an earlier trial"""
+    def __init__(self, mpls):
+        super().__init__()
+        self.mpls = list(mpls)
+
+    def __iter__(self):
+        return iter(self.mpls)
+
+class AdaptiveMplStrategy(MplStrategy):
+    """AdaptiveMplStrategy: Searches for the MPL with the highest measured
+    value (the throughput knee) using far fewer runs than a linear sweep.
+
+    The search first takes geometric steps up from min_mpl (multiplying by
+    factor) until the value drops by more than resolution below the best seen
+    or max_mpl is reached. It then refines around the best MPL with a
+    golden-section search, probing the larger gap to the best MPL's
+    neighbours until both gaps are within resolution of the best MPL.
+    """
+    def __init__(self, min_mpl, max_mpl, factor=2., resolution=0.1):
+        super().__init__()
+        self.min_mpl = min_mpl
+        self.max_mpl = max_mpl
+        self.factor = max(factor, 1.)
+        self.resolution = resolution
+
+    def __iter__(self):
+        results = {}
+        # Coarse, geometric bracketing of the knee
+        mpl = self.min_mpl
+        while mpl <= self.max_mpl:
+            yield mpl
+            results = dict(self.visited)
+            value = results.get(mpl, 0.)
+            best = max(results.values())
+            if mpl >= self.max_mpl or value < best * (1 - self.resolution):
+                break
+            mpl = min(self.max_mpl, max(mpl + 1, int(round(mpl * self.factor))))
+        # Golden-section refinement around the best MPL
+        while True:
+            results = dict(self.visited)
+            mpl = self.__next_probe(results)
+            if mpl is None:
+                return
+            yield mpl
+
+    def __next_probe(self, results):
+        """__next_probe
+        Returns the next MPL to probe, or None if the search is done
+
+        :param results: Dict mapping each visited MPL to its value
+        """
+        if not results:
+            return None
+        best = max(sorted(results), key=lambda m: results[m])
+        lower = [m for m in results if m < best]
+        upper = [m for m in results if m > best]
+        lo = max(lower) if lower else best
+        hi = min(upper) if upper else best
+        limit = max(1, self.resolution * best)
+        if hi - best <= limit and best - lo <= limit:
+            return None
+        if hi - best >= best - lo:
+            mpl = best + max(1, int(round((hi - best) * (1 - GOLDEN))))
+        else:
+            mpl = best - max(1, int(round((best - lo) * (1 - GOLDEN))))
+        return mpl if mpl not in results else None
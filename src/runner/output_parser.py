@@ -0,0 +1,106 @@
+import re
+
+from .      import constants as const
+from .stats import Statistics
+
+# Characters which may not appear in statistic names
+RE_NAME_INVALID = re.compile(r"[^a-z0-9]+")
+
+def op_stat_name(section, metric):
+    """op_stat_name
+    Returns the name of the per-operation statistic for the given YCSB
+    summary line section and metric (e.g. read_p99_latency for READ and
+    99thPercentileLatency), or None if the metric isn't one we track
+
+    :param section: Section name, without brackets (e.g. READ)
+    :param metric: Metric name, without units (e.g. AverageLatency)
+    """
+    if metric is None or section == 'OVERALL':
+        return None
+    if metric in const.OP_STAT_METRICS:
+        metric = const.OP_STAT_METRICS[metric]
+    elif metric.startswith('Return='):
+        # Distinguish negative return codes, e.g. Return=-1
+        metric = 'return_' + metric[len('Return='):].lower().replace('-', 'neg')
+    else:
+        m = const.RE_PERCENTILE_METRIC.match(metric)
+        if m is None:
+            return None
+        metric = 'p%s_latency' % m.group(1)
+    name = "%s_%s" % (section.lower(), metric.lower())
+    name = RE_NAME_INVALID.sub('_', name).strip('_')
+    return name if const.RE_OP_STAT.match(name) else None
+
+class OutputParser:
+    """OutputParser: Incrementally extracts statistics from YCSB output, one
+    line at a time, so that output never needs to be buffered in full.
+
+    Each "[SECTION], Metric(unit), value" summary line is split once and its
+    value stored under (SECTION, Metric), so the cost of parsing doesn't grow
+    with the number of tracked statistics.
+    """
+    def __init__(self):
+        # Values extracted so far, keyed by (section, metric)
+        self.__values = {}
+
+    def feed(self, line):
+        """feed
+        Extracts the value from the given line of YCSB output if it's a
+        summary line. Only the first value found for each (section, metric)
+        is kept.
+
+        :param line: A single line of YCSB output
+        """
+        if line[:1] != '[':
+            return
+        end = line.find('], ')
+        if end < 0:
+            return
+        rest = line[end + 3:]
+        metric, sep, value = rest.partition(', ')
+        if not sep:
+            metric, value = None, rest
+        elif metric.isdigit() or metric[:1] == '>':
+            # Skip histogram buckets, e.g. "[READ], 0, 1234" or "[READ], >1000, 3"
+            return
+        else:
+            metric = metric.partition('(')[0]
+        key = (line[1:end], metric)
+        if key in self.__values:
+            return
+        try:
+            self.__values[key] = float(value)
+        except ValueError:
+            pass
+
+    @property
+    def values(self):
+        """values
+        A dict mapping each (section, metric) seen so far to its value
+        """
+        return self.__values
+
+    def get(self, section, metric=None):
+        """get
+        Returns the value stored for the given section and metric, or None if
+        it hasn't been seen
+
+        :param section: Section name, without brackets (e.g. OVERALL)
+        :param metric: Metric name, without units (e.g. RunTime)
+        """
+        return self.__values.get((section, metric))
+
+    def stats(self):
+        """stats
+        Returns a new Statistics row storing the statistics extracted so far,
+        including every per-operation statistic discovered (see op_stat_name)
+        """
+        stats = {}
+        for (section, metric), value in self.__values.items():
+            name = op_stat_name(section, metric)
+            if name is not None:
+                stats[name] = const.OP_STAT_TYPE(value)
+        for k, key in const.STAT_KEYS.items():
+            if key in self.__values:
+                stats[k] = const.TRACKED_STATS[k](self.__values[key])
+        return Statistics(**stats)
@@ -0,0 +1,126 @@
+import re
+import contextlib
+
+from . import constants as const
+from . import trace
+
+# Matches the java command line which the ycsb launcher script prints before
+# starting the JVM, which doesn't count as output from YCSB itself
+RE_LAUNCHER = re.compile(r"^\S*java(?:\.exe)?\s")
+
+class FirstOutput:
+    """FirstOutput: Parser which records when the first line of output from
+    YCSB itself (rather than its launcher script) arrives. The time from
+    spawning ycsb to its first output is a proxy for JVM startup time.
+    """
+    def __init__(self):
+        self.time = None
+
+    def feed(self, line):
+        """feed
+        Records the time of the given line of output if it's the first from
+        YCSB
+
+        :param line: A single line of YCSB output
+        """
+        if self.time is None and not RE_LAUNCHER.match(line):
+            self.time = trace.now()
+
+class PhaseTimer:
+    """PhaseTimer: Accounts for the wall-clock time a DBMS spends in each
+    phase of its runs (see const.PHASES), e.g. cleaning, loading, JVM
+    startup, running YCSB, exporting and running hooks.
+
+    Times are kept both as totals since start() was called, and for the
+    current run, which covers the time since the previous run was recorded
+    (see restart()). That way, the time spent exporting one run's stats is
+    counted in the next run's phase_export, and the phase_total of every run
+    adds up to the time the DBMS took. Phases are also recorded as spans in
+    the trace, if tracing is enabled (see runner.trace).
+    """
+    def __init__(self):
+        self.totals = {}
+        self.current = {}
+        self.__start = self.__restart = trace.now()
+
+    def start(self):
+        """start
+        Starts timing from zero
+        """
+        self.totals = {}
+        self.current = {}
+        self.__start = self.__restart = trace.now()
+
+    def restart(self):
+        """restart
+        Starts timing the next run, once the current one has been recorded
+        """
+        self.current = {}
+        self.__restart = trace.now()
+
+    def add(self, phase, seconds, start=None):
+        """add
+        Adds time spent in the given phase
+
+        :param phase: Name of the phase (one of const.PHASES)
+        :param seconds: Time spent in the phase
+        :param start: Time the phase started, from trace.now(), to record it
+            in the trace, or None
+        """
+        self.totals[phase] = self.totals.get(phase, 0.) + seconds
+        self.current[phase] = self.current.get(phase, 0.) + seconds
+        if start is not None:
+            trace.complete(phase, start, seconds, 'phase')
+
+    @contextlib.contextmanager
+    def phase(self, phase):
+        """phase
+        Context manager which adds the time spent in its block to the given
+        phase
+
+        :param phase: Name of the phase (one of const.PHASES)
+        """
+        start = trace.now()
+        try:
+            yield
+        finally:
+            self.add(phase, trace.now() - start, start)
+
+    def stats(self):
+        """stats
+        Returns a dict mapping the Statistics field of each phase
+        (phase_<name>) to the time spent in it during the current run, along
+        with phase_total, the time since the previous run was recorded
+        """
+        stats = {'phase_' + phase: self.current.get(phase, 0.)
+                for phase in const.PHASES}
+        stats['phase_total'] = trace.now() - self.__restart
+        return stats
+
+    def summary(self, measured):
+        """summary
+        Describes where the time since start() went: the total time in each
+        phase, the time not spent in any phase, and the share of the time
+        which YCSB spent measuring (its reported runtimes) against the
+        overhead
+
+        Returns a list of lines
+
+        :param measured: Seconds of YCSB measurement (sum of the runtimes)
+        """
+        total = trace.now() - self.__start
+        # YCSB's own runtimes can't account for more than the wall-clock time
+        measured = min(measured, total)
+        percent = lambda t: 100. * t / total if total > 0 else 0.
+        lines = ["Time breakdown over %.1f sec:" % total]
+        other = total
+        for phase in const.PHASES:
+            if phase in self.totals:
+                lines.append("  %-8s %10.1f sec (%5.1f%%)" % (phase,
+                    self.totals[phase], percent(self.totals[phase])))
+                other -= self.totals[phase]
+        lines.append("  %-8s %10.1f sec (%5.1f%%)" % ('other', other, percent(other)))
+        lines.append("YCSB measured for %.1f sec (%.1f%%); overhead ratio %.2f" %
+                (measured, percent(measured), (total - measured) / total
+                    if total > 0 else 0.))
+        return lines
@@ -0,0 +1,107 @@
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+class PlotRenderer:
+    """PlotRenderer: Renders plots in a background process pool, so that
+    plotting doesn't hold up the runner between YCSB runs.
+
+    At most one render per output file is in flight at once. A render
+    submitted while an older one for the same file is waiting is dropped in
+    favour of the newer one, since it would be overwritten anyway.
+    """
+    def __init__(self, max_workers=1, max_pending=4):
+        """__init__
+
+        :param max_workers: Number of background rendering processes
+        :param max_pending: Maximum number of renders in flight at once;
+            submit() blocks until one finishes when this is reached
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.__executor = None
+        # Renders in flight, keyed by output filename
+        self.__futures = {}
+        # Renders waiting for an in-flight render of the same file
+        self.__queued = {}
+
+    def __len__(self):
+        """__len__
+        Number of renders in flight or waiting
+        """
+        return len(self.__futures) + len(self.__queued)
+
+    @property
+    def executor(self):
+        """executor
+        The process pool renders are run in, started on first use
+        """
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("fork"))
+        return self.__executor
+
+    def submit(self, filename, func, *args):
+        """submit
+        Schedules func(*args) to be run in the background to render the given
+        output file, superseding any render of that file which hasn't started
+
+        :param filename: Path of the file which func writes
+        :param func: Picklable (i.e. module-level) function to be run
+        :param *args: Picklable arguments to func
+        """
+        self.__collect()
+        future = self.__futures.get(filename)
+        if future is not None and future.cancel():
+            del self.__futures[filename]
+        if filename in self.__futures:
+            # Render once the current render of this file is done
+            self.__queued[filename] = (func, args)
+            return
+        self.__queued.pop(filename, None)
+        while len(self.__futures) >= self.max_pending:
+            self.__wait_any()
+        self.__futures[filename] = self.executor.submit(func, *args)
+
+    def wait(self):
+        """wait
+        Blocks until every submitted render has finished
+
+        Raises the exception raised by any failed render
+        """
+        while len(self) > 0:
+            self.__wait_any()
+
+    def shutdown(self):
+        """shutdown
+        Waits for every submitted render, then stops the process pool
+        """
+        try:
+            self.wait()
+        finally:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+                self.__executor = None
+
+    def __wait_any(self):
+        """__wait_any
+        Blocks until at least one in-flight render has finished
+        """
+        if self.__futures:
+            wait(list(self.__futures.values()), return_when=FIRST_COMPLETED)
+        self.__collect()
+
+    def __collect(self):
+        """__collect
+        Removes finished renders, starting any render queued behind them, and
+        raises the exception raised by any failed render
+        """
+        for filename, future in list(self.__futures.items()):
+            if not future.done():
+                continue
+            del self.__futures[filename]
+            if filename in self.__queued:
+                func, args = self.__queued.pop(filename)
+                self.__futures[filename] = self.executor.submit(func, *args)
+            if not future.cancelled():
+                future.result()
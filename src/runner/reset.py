@@ -0,0 +1,95 @@
+import os
+import shutil
+
+class ResetStrategy:
+    """ResetStrategy: Resets a DBMS's data to the freshly loaded state before
+    each YCSB run (see the reset_strategy option)"""
+    def __init__(self, db, load):
+        """__init__
+
+        :param db: DbSystem instance whose data should be reset
+        :param load: Function which loads the YCSB data into the DBMS
+        """
+        self.db = db
+        self.load = load
+
+    def reset(self):
+        """reset
+        Resets the DBMS's data, ready for the next run
+        """
+        raise NotImplementedError
+
+    def reload(self):
+        """reload
+        Cleans all data from the DBMS and loads the YCSB data again
+        """
+        self.db.clean()
+        self.load()
+
+class ReloadReset(ResetStrategy):
+    """ReloadReset: Cleans the DBMS and loads the data before every run"""
+    def reset(self):
+        self.reload()
+
+class SnapshotReset(ResetStrategy):
+    """SnapshotReset: Cleans the DBMS and loads the data once, snapshots it,
+    and restores the snapshot before every later run"""
+    def __init__(self, db, load):
+        super().__init__(db, load)
+        self.__snapshotted = False
+
+    def reset(self):
+        if self.__snapshotted:
+            self.db.restore()
+            return
+        self.reload()
+        self.db.snapshot()
+        self.__snapshotted = True
+
+class DatadirReset(ResetStrategy):
+    """DatadirReset: Cleans the DBMS and loads the data once, then copies the
+    server's data directory while it's stopped. Before every later run, the
+    server is stopped, its data directory replaced with the copy, and the
+    server started again."""
+    def __init__(self, db, load):
+        super().__init__(db, load)
+        self.__snapshotted = False
+
+    @property
+    def snapshot_path(self):
+        """snapshot_path
+        Path to the copy of the server's data directory
+        """
+        return os.path.join(self.db.snapshot_path, "datadir")
+
+    def reset(self):
+        if not self.__snapshotted:
+            self.reload()
+        self.db.server_control('stop')
+        if self.__snapshotted:
+            with self.db.phases.phase('restore'):
+                shutil.rmtree(self.db.datadir)
+                shutil.copytree(self.snapshot_path, self.db.datadir, symlinks=True)
+        else:
+            with self.db.phases.phase('snapshot'):
+                if os.path.exists(self.snapshot_path):
+                    shutil.rmtree(self.snapshot_path)
+                shutil.copytree(self.db.datadir, self.snapshot_path, symlinks=True)
+            self.__snapshotted = True
+        self.db.server_control('start')
+
+# Maps each of constants.RESET_STRATEGIES to its ResetStrategy
+RESETS = {
+    'reload'  : ReloadReset,
+    'snapshot': SnapshotReset,
+    'datadir' : DatadirReset,
+}
+
+def make_reset(db, load):
+    """make_reset
+    Returns the ResetStrategy configured for the given DbSystem
+
+    :param db: DbSystem instance whose data should be reset
+    :param load: Function which loads the YCSB data into the DBMS
+    """
+    return RESETS[db.reset_strategy](db, load)
@@ -0,0 +1,284 @@
+import os
+import time
+import threading
+
+# Root of the proc filesystem (Linux only; sampling is disabled without it)
+PROC = "/proc"
+
+# Clock ticks per second, the unit of CPU times in /proc/<pid>/stat
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+# Counters stored for each process group in each sample, and the statistics
+# they're summarized into (see ResourceSampler.summary)
+COUNTERS = ('cpu', 'rss', 'ctx_switches', 'read_bytes', 'write_bytes')
+
+def supported():
+    """supported
+    Returns True if processes can be sampled on this system
+    """
+    return os.path.exists(os.path.join(PROC, "self", "stat"))
+
+def _field(data, key):
+    """_field
+    Returns the integer value of the given "key: value" line in the contents
+    of a /proc file (e.g. status or io), or 0 if it isn't there
+
+    :param data: File contents (bytes)
+    :param key: Key, including the colon (bytes)
+    """
+    i = data.find(b"\n" + key)
+    if i < 0 and not data.startswith(key):
+        return 0
+    i += len(key) + 1
+    return int(data[i:data.index(b"\n", i)].split()[0])
+
+def read_counters(pid):
+    """read_counters
+    Reads the resource usage of a process from /proc/<pid>/stat, status and
+    io. I/O counters are 0 if they can't be read (e.g. processes owned by
+    another user). The files are parsed as bytes, which halves the cost of
+    each sample.
+
+    Returns a tuple of CPU time (seconds), RSS (bytes), context switches,
+    bytes read and bytes written, or None if the process no longer exists
+
+    :param pid: Process ID
+    """
+    base = "%s/%d/" % (PROC, pid)
+    try:
+        with open(base + "stat", 'rb') as f:
+            # The command name may contain spaces, so split after it
+            fields = f.read().rpartition(b')')[2].split()
+        with open(base + "status", 'rb') as f:
+            status = f.read()
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    cpu = (int(fields[11]) + int(fields[12])) / CLK_TCK
+    rss = _field(status, b"VmRSS:") * 1024
+    ctx = (_field(status, b"voluntary_ctxt_switches:") +
+            _field(status, b"nonvoluntary_ctxt_switches:"))
+    try:
+        with open(base + "io", 'rb') as f:
+            io = f.read()
+    except OSError:
+        return cpu, rss, ctx, 0, 0
+    return cpu, rss, ctx, _field(io, b"read_bytes:"), _field(io, b"write_bytes:")
+
+def parent_pids(known=None):
+    """parent_pids
+    Returns a dict mapping the ID of every running process to its parent's
+
+    :param known: An earlier result of parent_pids, or None. Only processes
+        started since then are read, which makes repeated calls cheap.
+    """
+    known = known or {}
+    ppids = {}
+    for name in os.listdir(PROC):
+        if not name.isdigit():
+            continue
+        pid = int(name)
+        if pid in known:
+            ppids[pid] = known[pid]
+            continue
+        try:
+            with open(os.path.join(PROC, name, "stat")) as f:
+                ppids[pid] = int(f.read().rpartition(')')[2].split()[1])
+        except (OSError, IndexError, ValueError):
+            # The process exited while we were listing
+            pass
+    return ppids
+
+def process_tree(roots, ppids=None):
+    """process_tree
+    Returns the set of the given processes and all of their descendants
+    (e.g. the JVM started by the ycsb script, or PostgreSQL's backends)
+
+    :param roots: Iterable of process IDs
+    :param ppids: Result of parent_pids(), or None to read it now
+    """
+    ppids = parent_pids() if ppids is None else ppids
+    children = {}
+    for pid, ppid in ppids.items():
+        children.setdefault(ppid, []).append(pid)
+    tree = set()
+    pending = [pid for pid in roots if pid in ppids]
+    while pending:
+        pid = pending.pop()
+        if pid not in tree:
+            tree.add(pid)
+            pending += children.get(pid, [])
+    return tree
+
+def find_pids(names):
+    """find_pids
+    Returns the IDs of the running processes whose name (as in ps -e) is one
+    of the given names, e.g. redis-server or postgres
+
+    :param names: Iterable of process names
+    """
+    names = set(names)
+    pids = []
+    for name in os.listdir(PROC):
+        if not name.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC, name, "comm")) as f:
+                if f.read().rstrip("\n") in names:
+                    pids.append(int(name))
+        except OSError:
+            pass
+    return pids
+
+class ResourceSampler:
+    """ResourceSampler: Samples the CPU, memory, context switches and disk I/O
+    of the YCSB client processes and the DBMS server processes at a fixed
+    interval during a run, in a background thread.
+
+    Each of the two process groups (client and server) includes every
+    descendant of its processes. Each sample stores, per group: CPU
+    utilization over the interval (percent of one core), total RSS, and the
+    context switches and bytes read and written during the interval.
+    Processes started during the run are counted from zero; processes which
+    exit during an interval contribute nothing to it.
+    """
+    def __init__(self, interval=1., server_pids=(), server_names=()):
+        """__init__
+
+        :param interval: Seconds between samples, or 0 to disable sampling
+        :param server_pids: IDs of the DBMS server processes
+        :param server_names: Names of the DBMS server processes (see
+            find_pids), looked up when sampling starts
+        """
+        self.interval = interval
+        self.enabled = interval > 0 and supported()
+        self.server_pids = list(server_pids)
+        self.server_names = list(server_names)
+        self.groups = ('client', 'server') if server_pids or server_names else ('client',)
+        self.elapsed = []
+        self.samples = {group: {c: [] for c in COUNTERS} for group in self.groups}
+        # Seconds of wall-clock time spent taking samples
+        self.overhead = 0.
+        self.__clients = []
+        self.__previous = {}
+        self.__previous_time = None
+        self.__ppids = {}
+        self.__stopped = threading.Event()
+        self.__thread = None
+        self.__start = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __len__(self):
+        """__len__
+        Number of samples taken
+        """
+        return len(self.elapsed)
+
+    def add(self, pid):
+        """add
+        Adds a YCSB client process (and its descendants) to the client group
+
+        :param pid: Process ID
+        """
+        self.__clients.append(pid)
+
+    def start(self):
+        """start
+        Starts sampling in a background thread, if enabled
+        """
+        if not self.enabled:
+            return
+        if self.server_names:
+            self.server_pids += find_pids(self.server_names)
+        self.__start = time.monotonic()
+        # Servers' counters are measured from here, not from their start
+        self.sample(record=False)
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """stop
+        Stops sampling, and takes a last sample of the time since the
+        previous one (so runs shorter than the interval are still sampled)
+        """
+        if self.__thread is None:
+            return
+        self.__stopped.set()
+        self.__thread.join()
+        self.__thread = None
+        self.sample()
+
+    def __run(self):
+        while not self.__stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self, record=True):
+        """sample
+        Reads the counters of every process in each group, and stores the
+        group totals for the interval since the previous sample. Samples are
+        normally taken by start(), its background thread, and stop().
+
+        :param record: Whether to store the sample (False for the baseline)
+        """
+        start = time.monotonic()
+        ppids = self.__ppids = parent_pids(self.__ppids)
+        roots = {'client': self.__clients, 'server': self.server_pids}
+        current = {}
+        totals = {}
+        for group in self.groups:
+            total = [0.] * len(COUNTERS)
+            for pid in process_tree(roots[group], ppids):
+                counters = read_counters(pid)
+                if counters is None:
+                    continue
+                current[pid] = counters
+                before = self.__previous.get(pid, (0., 0, 0, 0, 0))
+                total[0] += counters[0] - before[0]
+                total[1] += counters[1]
+                for i in (2, 3, 4):
+                    total[i] += counters[i] - before[i]
+            totals[group] = total
+        dt = start - (self.__previous_time or start)
+        self.__previous = current
+        self.__previous_time = start
+        if record:
+            self.elapsed.append(start - self.__start)
+            for group, total in totals.items():
+                total[0] = 100. * total[0] / dt if dt > 0 else 0.
+                for counter, value in zip(COUNTERS, total):
+                    self.samples[group][counter].append(value)
+        self.overhead += time.monotonic() - start
+
+    def summary(self):
+        """summary
+        Summarizes the samples of each group as Statistics fields:
+        <group>_cpu_mean and <group>_cpu_max (percent of one core),
+        <group>_rss_max (bytes), and the totals <group>_ctx_switches,
+        <group>_read_bytes and <group>_write_bytes
+
+        Returns a dict, which is empty if no samples were taken
+        """
+        if len(self) == 0:
+            return {}
+        stats = {}
+        for group, samples in self.samples.items():
+            cpu = samples['cpu']
+            stats[group + '_cpu_mean'] = sum(cpu) / len(cpu)
+            stats[group + '_cpu_max'] = max(cpu)
+            stats[group + '_rss_max'] = float(max(samples['rss']))
+            for counter in ('ctx_switches', 'read_bytes', 'write_bytes'):
+                stats[group + '_' + counter] = float(sum(samples[counter]))
+        return stats
+
+    def dict(self):
+        """dict
+        Returns the samples as a dict of lists, suitable for serializing as
+        JSON: elapsed (seconds since sampling started), and for each group a
+        dict of each counter's values
+        """
+        return dict(self.samples, elapsed=self.elapsed)
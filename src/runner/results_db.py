@@ -0,0 +1,209 @@
+import json
+import time
+import sqlite3
+import hashlib
+
+from .stats import Statistics, stat_type
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id           INTEGER PRIMARY KEY,
+    db           TEXT NOT NULL,
+    dbname       TEXT NOT NULL,
+    workload     TEXT NOT NULL,
+    workload_sha TEXT NOT NULL,
+    config_hash  TEXT NOT NULL,
+    workload_props TEXT NOT NULL,
+    datestr      TEXT NOT NULL,
+    time         REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    id      INTEGER PRIMARY KEY,
+    run_id  INTEGER NOT NULL REFERENCES runs(id),
+    db      TEXT NOT NULL,
+    workload TEXT NOT NULL,
+    mpl     INTEGER NOT NULL,
+    trial   INTEGER NOT NULL,
+    time    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vals (
+    row_id  INTEGER NOT NULL REFERENCES rows(id),
+    field   TEXT NOT NULL,
+    value   REAL,
+    PRIMARY KEY (row_id, field)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rows_db_workload_mpl_time
+    ON rows (db, workload, mpl, time);
+CREATE INDEX IF NOT EXISTS rows_run_id ON rows (run_id);
+"""
+
+# SQL aggregate functions available to ResultsDb.query
+AGGREGATES = {
+    'mean' : 'AVG',
+    'min'  : 'MIN',
+    'max'  : 'MAX',
+    'sum'  : 'SUM',
+    'count': 'COUNT',
+}
+
+# Ways of grouping the rows aggregated by ResultsDb.query, mapped to the
+# columns they group by and report
+GROUPINGS = {
+    'run': ('runs.id', 'runs.datestr', 'rows.db', 'rows.workload'),
+    'mpl': ('rows.db', 'rows.workload', 'rows.mpl'),
+    'run_mpl': ('runs.id', 'runs.datestr', 'rows.db', 'rows.workload', 'rows.mpl'),
+    'db' : ('rows.db', 'rows.workload'),
+}
+
+def git_blob_sha(data):
+    """git_blob_sha
+    Returns the SHA-1 which git would give the given file contents (as with
+    git hash-object), without needing git or a repository
+
+    :param data: File contents, as bytes
+    """
+    return hashlib.sha1(b"blob %i\0" % len(data) + data).hexdigest()
+
+class ResultsDb:
+    """ResultsDb: SQLite database of the Statistics of every run, across
+    every campaign, so that results can be compared over time without
+    re-reading the output directories (see the results_db option, and
+    ycsb_results.py).
+
+    Each campaign of a DBMS is a row of the runs table, with the metadata
+    needed to tell apart runs of different configurations. Each Statistics
+    row is a row of the rows table, with its fields in the vals table.
+    """
+    def __init__(self, path):
+        """__init__
+        Opens (creating if necessary) the results database at the given path
+
+        :param path: Path to the SQLite database file
+        """
+        self.path = path
+        # Parallel workers may write to the same database
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """close
+        Closes the database connection
+        """
+        self.conn.close()
+
+    def add_run(self, db):
+        """add_run
+        Records the start of a campaign for the given DbSystem
+
+        Returns the ID of the new run
+
+        :param db: DbSystem instance
+        """
+        with open(db.base_workload_path, 'rb') as f:
+            workload_sha = git_blob_sha(f.read())
+        config_hash = hashlib.sha1(json.dumps(db.config, sort_keys=True,
+            default=str).encode('utf-8')).hexdigest()
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO runs (db, dbname, " +
+                "workload, workload_sha, config_hash, workload_props, " +
+                "datestr, time) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                    db.labelname, db.dbname, db.workload, workload_sha,
+                    config_hash, json.dumps(db.workload_config, sort_keys=True),
+                    db.datestr, time.time()))
+        return cursor.lastrowid
+
+    def add_stats(self, run_id, stats):
+        """add_stats
+        Records the Statistics of a completed run
+
+        Returns the ID of the new row
+
+        :param run_id: ID of the campaign (see add_run)
+        :param stats: Statistics instance
+        """
+        db, workload = self.conn.execute(
+                "SELECT db, workload FROM runs WHERE id = ?", (run_id,)).fetchone()
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO rows (run_id, db, " +
+                "workload, mpl, trial, time) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, db, workload, stats.mpl, stats.trial, time.time()))
+            row_id = cursor.lastrowid
+            fields = stats.dict()
+            fields['anomaly_score'] = stats.anomaly_score
+            self.conn.executemany("INSERT INTO vals (row_id, field, value) " +
+                "VALUES (?, ?, ?)", [(row_id, k, float(v)) for k, v in fields.items()])
+        return row_id
+
+    def query(self, field, how='mean', by='run', db=None, workload=None,
+            mpl=None, since=None, last=None):
+        """query
+        Aggregates the values of a field across the matching rows
+
+        Returns a tuple: a list of column names, and a list of result rows,
+        oldest first. Each result row holds the grouping columns (see
+        GROUPINGS), the number of rows aggregated, and the aggregated value.
+
+        :param field: Statistics field to aggregate (e.g. throughput)
+        :param how: Aggregation (see AGGREGATES)
+        :param by: What to group rows by (see GROUPINGS)
+        :param db: Only include this DBMS (its name with label)
+        :param workload: Only include this workload (as named in the config)
+        :param mpl: Only include this MPL
+        :param since: Only include rows recorded since this UNIX time
+        :param last: Only include the most recent `last` runs (of db and
+            workload, if given)
+        """
+        if how not in AGGREGATES:
+            raise ValueError("Unsupported aggregate '%s': expected one of (%s)" %
+                    (how, ','.join(AGGREGATES)))
+        if by not in GROUPINGS:
+            raise ValueError("Unsupported grouping '%s': expected one of (%s)" %
+                    (by, ','.join(GROUPINGS)))
+        where, params = ["vals.field = ?"], [field]
+        for column, value in (('rows.db', db), ('rows.workload', workload),
+                ('rows.mpl', mpl)):
+            if value is not None:
+                where.append("%s = ?" % column)
+                params.append(value)
+        if since is not None:
+            where.append("rows.time >= ?")
+            params.append(since)
+        if last is not None:
+            # The most recent runs of the selected DBMS and workload, rather
+            # than of every DBMS and workload
+            runs, run_params = [], []
+            for column, value in (('db', db), ('workload', workload)):
+                if value is not None:
+                    runs.append("%s = ?" % column)
+                    run_params.append(value)
+            where.append("rows.run_id IN (SELECT id FROM runs %sORDER BY " % (
+                "WHERE %s " % ' AND '.join(runs) if runs else "") +
+                "time DESC, id DESC LIMIT ?)")
+            params += run_params + [last]
+        columns = GROUPINGS[by]
+        sql = ("SELECT %s, COUNT(vals.value), %s(vals.value) FROM rows " % (
+                    ', '.join(columns), AGGREGATES[how]) +
+                "JOIN runs ON runs.id = rows.run_id " +
+                "JOIN vals ON vals.row_id = rows.id " +
+                "WHERE %s GROUP BY %s ORDER BY MIN(rows.time), %s" % (
+                    ' AND '.join(where), ', '.join(columns), ', '.join(columns)))
+        names = [c.split('.')[1] for c in columns] + ['n', '%s_%s' % (how, field)]
+        return names, self.conn.execute(sql, params).fetchall()
+
+    def statistics(self, run_id):
+        """statistics
+        Returns a list of the Statistics recorded for the given campaign
+
+        :param run_id: ID of the campaign (see add_run)
+        """
+        rows = {}
+        for row_id, field, value in self.conn.execute("SELECT vals.row_id, " +
+                "vals.field, vals.value FROM vals JOIN rows ON rows.id = " +
+                "vals.row_id WHERE rows.run_id = ? ORDER BY rows.id", (run_id,)):
+            rows.setdefault(row_id, {})[field] = value
+        stats = []
+        for fields in rows.values():
+            fields.pop('anomaly_score', None)
+            stats.append(Statistics(**{k: stat_type(k)(v)
+                for k, v in fields.items()}))
+        return stats
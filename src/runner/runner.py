@@ -1,23 +1,47 @@
 import os
 import sys
-import subprocess
+import time
 import configparser
+import multiprocessing
+import multiprocessing.connection
 
 from shutil    import copyfile
-from itertools import count
 
-from .         import constants as const
-from .stats    import Statistics
-from .dbsystem import DbSystem
+from .              import constants as const
+from .              import clients
+from .              import reset
+from .              import steady_state
+from .              import trace
+from .stats         import Statistics
+from .clients       import YcsbClients
+from .dbsystem      import DbSystem
+from .host_metrics  import HostMetrics
+from .loader        import YcsbLoader
+from .output_parser import OutputParser
+from .plot_renderer import PlotRenderer
+from .results_db    import ResultsDb
+from .status        import StatusSeries
+from .ycsb_process  import ProcessTimeout
 
 class Runner:
     """Runner: Makes Popen calls to run YCSB, collects output, extracts data
     from YCSB output, handles logging"""
-    def __init__(self, configpath, hooks=None):
+    def __init__(self, configpath, hooks=None, parallel=False, max_workers=None,
+            resume=None, trace_path=None):
         """__init__
 
         :param configpath: Path to YCSB Runner configuration file
         :param hooks: A dictionary mapping hook names to lists of functions.
+        :param parallel: Whether DBs on separate servers should be run in
+            parallel worker processes. Parallel mode is also enabled if any
+            config section sets parallel_group.
+        :param max_workers: Maximum number of parallel worker processes (one
+            per lane by default)
+        :param resume: Output directory of an interrupted campaign to resume
+            (see DbSystem.resume), or None to start a new campaign. Raises
+            IOError if no DB has a campaign there to resume.
+        :param trace_path: Path of a Chrome trace-event JSON file to write a
+            timeline of the campaign to (see runner.trace), or None
         """
         # Check that the configpath exists before reading it
         if not os.path.exists(configpath):
@@ -27,70 +51,411 @@ class Runner:
         self.__config.read(configpath)
         # Now, process the config further, extracting DBMS names, options
         self.dbs = self.__process_sections()
+        # Pick up the journals of DBs which were started before
+        if resume is not None:
+            resumed = [db.resume(resume) for db in self.dbs]
+            if not any(resumed):
+                for db in self.dbs:
+                    db.cleanup()
+                raise IOError("No campaign to resume found in '%s'" % resume)
+            for db, found in zip(self.dbs, resumed):
+                if not found:
+                    print("Warning: no campaign of %s to resume in '%s'; " % (
+                        db.labelname, resume) + "starting it afresh")
         # Load hooks
         self.__hooks = {} if hooks is None else hooks
         # We need this in order to copy the file across to the output dir
         self.__configpath = configpath
+        # Run DBs on separate servers concurrently if requested
+        self.__parallel = parallel or any(db.parallel_group for db in self.dbs)
+        self.__max_workers = max_workers
+        self.__trace_path = trace_path
+        # Trace files written by parallel workers, merged at the end
+        self.__trace_parts = []
+        # Renders plots in the background, for DBs with background_plots set
+        self.__renderer = PlotRenderer()
 
     def run(self):
-        self.__run_hooks("PRE_RUN")
-        for db in self.dbs:
+        if self.__trace_path is not None:
+            trace.enable("ycsb-runner")
+        try:
+            with trace.span("campaign", 'runner'):
+                self.__run_hooks("PRE_RUN")
+                if self.__parallel:
+                    self.__run_parallel()
+                else:
+                    for db in self.dbs:
+                        with trace.span(db.labelname, 'runner'):
+                            self.__run_db(db)
+                # Plots are only waited for here, to keep them out of the way of runs
+                with trace.span("plots", 'runner'):
+                    self.__renderer.shutdown()
+                self.__run_hooks("POST_RUN")
+        finally:
+            self.__write_trace()
+
+    def __write_trace(self):
+        """__write_trace
+        Writes the campaign's trace (if enabled), including the traces of any
+        parallel workers
+        """
+        if self.__trace_path is None:
+            return
+        trace.tracer().write(self.__trace_path)
+        trace.merge(self.__trace_path, self.__trace_parts)
+        trace.disable()
+
+    def __run_db(self, db):
+        """__run_db
+        Runs every trial and MPL configured for the given DbSystem, exporting
+        its stats as it goes
+
+        :param db: DbSystem instance to run
+        """
+        # Restore the runs completed before an interruption
+        journal = db.journal
+        if journal.finished:
+            db.log("All runs were already completed; skipping")
+            db.cleanup()
+            return
+        if len(journal) > 0:
+            db.stats.addstats(*journal.statistics())
+            db.mpl_points = journal.state.get('mpl_points', [])
+            db.log("Resuming after %i completed runs" % len(journal))
+        # Add every run to the results database, under a single campaign
+        results = None
+        if db.results_db:
+            results = ResultsDb(db.results_db)
+            if 'results_run_id' not in journal.state:
+                journal.state['results_run_id'] = results.add_run(db)
+                journal.write()
+        # Account for where the time goes from here (see PhaseTimer)
+        db.phases.start()
+        measured = 0.
+        with db.phases.phase('hooks'):
             self.__run_hooks("PRE_DB", db)
-            # Copy config files to output dir
-            copyfile(self.__configpath, db.makefpath("config-{}-{}.ini"))
-            # Copy the raw workload and generated workload to output for
-            # reference. This is useful because the generated workload file
-            # doesn't include original comments, for exmaple.
-            copyfile(db.base_workload_path, db.makefpath("workload-{}-{}"))
-            db.generate_workload_file(db.makefpath("workload-generated-{}-{}"))
-            for trial in range(1, db.trials + 1):
-                self.__run_hooks("PRE_TRIAL", trial, db)
+        # Copy config files to output dir
+        copyfile(self.__configpath, db.makefpath("config-{}-{}.ini"))
+        # Copy the raw workload and generated workload to output for
+        # reference. This is useful because the generated workload file
+        # doesn't include original comments, for exmaple.
+        copyfile(db.base_workload_path, db.makefpath("workload-{}-{}"))
+        db.generate_workload_file(db.makefpath("workload-generated-{}-{}"))
+        # Snapshot-based strategies load once, so this lasts for every trial
+        loads = []
+        data_reset = reset.make_reset(db, lambda: loads.append(YcsbLoader(db).run()))
+        # MPLs whose CI already meets ci_target (sequential stopping)
+        converged = set()
+        for trial in range(1, db.trials + 1):
+            with trace.span("trial %i" % trial, 'runner', trial=trial):
+                with db.phases.phase('hooks'):
+                    self.__run_hooks("PRE_TRIAL", trial, db)
                 db.log("Starting trial %i..." % (trial), trial=trial)
-                for mpl in count(start=db.min_mpl, step=db.inc_mpl):
-                    self.__run_hooks("PRE_MPL", mpl, trial, db)
-                    # Obvious; don't go above configured maximum MPL
-                    if mpl > db.max_mpl:
+                # The strategy never goes above the configured maximum MPL
+                strategy = db.make_mpl_strategy()
+                for mpl in strategy:
+                    if mpl in converged:
+                        continue
+                    done = journal.completed(trial, mpl)
+                    if done is not None:
+                        # The strategy still needs the results of completed runs
+                        strategy.record(mpl, getattr(done, db.mpl_metric))
+                        continue
+                    with trace.span("mpl %i" % mpl, 'runner', mpl=mpl,
+                            trial=trial) as span:
+                        with db.phases.phase('hooks'):
+                            self.__run_hooks("PRE_MPL", mpl, trial, db)
+                        stats, series = self.__run_mpl(db, data_reset, loads, mpl, trial)
+                        if db.steady_state and not stats.failed:
+                            self.__analyze_steady_state(db, stats, series, mpl, trial)
+                        # Times since the previous run was recorded
+                        for k, v in db.phases.stats().items():
+                            setattr(stats, k, v)
+                        measured += stats.runtime / 1000.
+                        span.update(throughput=stats.throughput,
+                                runtime=stats.runtime, failed=stats.failed,
+                                retries=stats.retries)
+                        db.stats.addstats(stats)
+                        db.add_series(trial, mpl, series)
+                        journal.record(trial, mpl, stats)
+                        db.phases.restart()
+                        if results is not None:
+                            results.add_stats(journal.state['results_run_id'], stats)
+                        # Let the strategy choose the next MPL from this run's result
+                        strategy.record(mpl, getattr(stats, db.mpl_metric))
+                        with db.phases.phase('hooks'):
+                            self.__run_hooks("POST_MPL", mpl, trial, db)
+                        # Export run stats repeatedly for maximum durability
+                        db.log("Exporting run stats...")
+                        with db.phases.phase('export'):
+                            db.export_stats(const.EXPORT_MPL, self.__db_renderer(db))
+                if db.mpl_strategy == 'adaptive' and not db.mpl_points:
+                    db.record_mpl_points(strategy.visited)
+                    journal.state['mpl_points'] = db.mpl_points
+                    journal.write()
+                    db.log("Adaptive MPL search visited %i MPLs: %s" %
+                            (len(db.mpl_points), ','.join(map(str, db.mpl_points))),
+                            trial=trial)
+                with db.phases.phase('export'):
+                    exported = db.export_stats(const.EXPORT_TRIAL, self.__db_renderer(db))
+                if exported:
+                    db.log("Exported trial stats", trial=trial)
+                with db.phases.phase('hooks'):
+                    self.__run_hooks("POST_TRIAL", trial, db)
+                if db.ci_target > 0 and trial >= db.min_trials:
+                    converged = self.__converged_mpls(db, trial)
+                    if converged is None:
+                        db.log("All MPLs within the target CI after %i trials" %
+                                trial, trial=trial)
                         break
-                    # Clean the database
-                    db.log("Cleaning the database...", mpl=mpl, trial=trial)
-                    if db.clean_data:
-                        db.clean()
-                    # Load data and run YCSB
-                    db.log("Loading YCSB data...", mpl=mpl, trial=trial)
-                    if db.clean_data:
-                        db.raw_log(self.__popen(db.cmd_ycsb_load()))
-                    db.log("Running YCSB workload...", mpl=mpl, trial=trial)
-                    # Run YCSB+T, log output, collect stats
-                    stats = Runner.extract_stats(db.raw_log(self.__popen(db.cmd_ycsb_run(mpl))))
-                    # Set the MPL and trial number in the stats row
-                    stats.mpl = mpl
-                    stats.trial = trial
-                    db.stats.addstats(stats)
-                    self.__run_hooks("POST_MPL", mpl, trial, db)
-                    # Export run stats repeatedly for maximum durability
-                    db.log("Exporting run stats...")
-                    db.export_stats()
-                self.__run_hooks("POST_TRIAL", trial, db)
-            db.cleanup() # ensure file handles are closed properly and don't leak
-            self.__run_hooks("POST_DB", db)
-        self.__run_hooks("POST_RUN")
-
-    def __popen(self, cmd):
-        """__popen
-        Open a process given by the list of shell arguments, cmd
-
-        Returns the stdout resulting from running the process
-
-        :param cmd: List of shell arguments, including name of command as
-        first element
-        """
-        with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
-            # Collect and return stdout after running process
-            stdout = proc.stdout.read().decode("utf-8")
-            # If this doesn't hold then something is horribly wrong and we
-            #   should abort mission
-            assert type(stdout) is str
-            return stdout
+        with db.phases.phase('export'):
+            exported = db.export_stats(const.EXPORT_DB, self.__db_renderer(db))
+        if exported:
+            db.log("Exported DB stats")
+        for line in db.phases.summary(measured):
+            db.log(line)
+        journal.finish()
+        if results is not None:
+            results.close()
+        db.cleanup() # ensure file handles are closed properly and don't leak
+        self.__run_hooks("POST_DB", db)
+
+    def __run_mpl(self, db, data_reset, loads, mpl, trial):
+        """__run_mpl
+        Resets the DB's data and runs YCSB at the given MPL. If any command
+        fails (a RuntimeError: e.g. it is killed for hanging (see Watchdog),
+        a clean, restore or ycsb command exits with an error, a worker fails,
+        or a sharded load inserts the wrong number of records), the run is
+        retried up to max_retries times, waiting retry_backoff seconds before
+        the first retry and twice as long before each further one. A run
+        which still fails is recorded as failed, rather than aborting the
+        campaign.
+
+        Returns a tuple of the run's Statistics row and StatusSeries
+
+        :param db: DbSystem instance being run
+        :param data_reset: ResetStrategy which resets the DB's data
+        :param loads: List to which the stats of each load are appended
+        :param mpl: MPL to run
+        :param trial: Trial number
+        """
+        retries = timeouts = 0
+        while True:
+            try:
+                # Reset the database to the freshly loaded data
+                reset_time = 0.
+                if db.clean_data:
+                    db.log("Resetting the database (%s)..." % db.reset_strategy,
+                            mpl=mpl, trial=trial)
+                    reset_start = time.monotonic()
+                    loaded = len(loads)
+                    with trace.span("reset", 'runner'):
+                        data_reset.reset()
+                    # Loads are timed separately (load_runtime), so that
+                    # resets which had to load compare fairly with the rest
+                    reset_time = time.monotonic() - reset_start - sum(
+                            load['load_runtime'] for load in loads[loaded:])
+                db.log("Running YCSB workload...", mpl=mpl, trial=trial)
+                # Run YCSB+T, log output, collect stats and status reports as
+                # the output arrives, and measure the clients', server's and
+                # host's resource usage
+                with db.make_sampler() as sampler, \
+                        HostMetrics(db.host_metrics) as host:
+                    rows, client_series = YcsbClients(db).run(mpl, sampler)
+                break
+            except RuntimeError as e:
+                db.log(str(e), mpl=mpl, trial=trial)
+                if isinstance(e, ProcessTimeout):
+                    timeouts += 1
+                    trace.instant("timeout", 'runner', reason=e.reason)
+                else:
+                    trace.instant("error", 'runner', error=str(e))
+                if retries == db.max_retries:
+                    db.log("Run failed after %i retries" % db.max_retries,
+                            mpl=mpl, trial=trial)
+                    return Statistics(mpl=mpl, trial=trial, failed=1,
+                            retries=retries, timeouts=timeouts), StatusSeries()
+                retries += 1
+                backoff = db.retry_backoff * 2 ** (retries - 1)
+                db.log("Retrying in %g sec (retry %i of %i)..." % (backoff,
+                    retries, db.max_retries), mpl=mpl, trial=trial)
+                with db.phases.phase('backoff'):
+                    time.sleep(backoff)
+        # Set the MPL and trial number in each client's stats row
+        for row in rows:
+            row.mpl = mpl
+            row.trial = trial
+        if len(rows) > 1:
+            db.add_client_stats(rows)
+        stats = clients.combine_stats(rows)
+        series = clients.combine_series(client_series)
+        stats.reset_time = reset_time
+        stats.retries = retries
+        stats.timeouts = timeouts
+        for k, v in dict(sampler.summary(), **host.stats()).items():
+            setattr(stats, k, v)
+        if len(sampler) > 0:
+            db.add_resources(trial, mpl, sampler)
+            db.log("Took %i resource samples (%.2f ms each)" % (len(sampler),
+                1000. * sampler.overhead / len(sampler)), mpl=mpl, trial=trial)
+        # Load stats are only set for runs which followed a load; a retried
+        # run may have followed more than one
+        for k, v in (loads[-1].items() if loads else ()):
+            setattr(stats, k, v)
+        del loads[:]
+        return stats, series
+
+    def __converged_mpls(self, db, trial):
+        """__converged_mpls
+        Returns the set of MPLs whose ci_field confidence interval meets the
+        DB's ci_target, or None if every MPL run so far meets it, and logs the
+        MPLs which still need more trials
+
+        :param db: DbSystem instance being run
+        :param trial: Trial number which has just finished
+        """
+        status = db.ci_converged()
+        pending = sorted(mpl for mpl, ok in status.items() if not ok)
+        if not pending:
+            return None
+        db.log("%i MPLs above the target CI: %s" % (len(pending),
+            ','.join(map(str, pending))), trial=trial)
+        return {mpl for mpl, ok in status.items() if ok}
+
+    def __analyze_steady_state(self, db, stats, series, mpl, trial):
+        """__analyze_steady_state
+        Detects the warm-up period of a run from its status reports, and
+        stores the steady-state stats in the given Statistics row
+
+        :param db: DbSystem instance which was run
+        :param stats: Statistics row for the run
+        :param series: StatusSeries for the run
+        :param mpl: MPL of the run
+        :param trial: Trial number of the run
+        """
+        steady = steady_state.analyze(series, db.steady_state_window,
+                db.steady_state_tolerance, stats)
+        if steady is None:
+            db.log("No steady state found in %i status reports" % len(series),
+                    mpl=mpl, trial=trial)
+            return
+        for k, v in steady.items():
+            setattr(stats, k, v)
+        db.log("Warm-up ended after %.0f sec; steady-state throughput %.1f ops/sec" %
+                (stats.warmup_time, stats.steady_throughput), mpl=mpl, trial=trial)
+
+    def __run_parallel(self):
+        """__run_parallel
+        Runs each lane of DbSystems (see Runner.lanes) in its own worker
+        process, with at most self.__max_workers workers at once. The DBs in
+        each lane are run one after another, so hooks fire in order within
+        each lane.
+
+        Raises RuntimeError once all workers have finished if any of them
+        failed
+        """
+        ctx = multiprocessing.get_context("fork")
+        pending = list(self.lanes())
+        running = []
+        failed = []
+        max_workers = self.__max_workers or len(pending)
+        while pending or running:
+            # Start workers until the pool is full
+            while pending and len(running) < max_workers:
+                lane = pending.pop(0)
+                proc = ctx.Process(target=self.__run_lane, args=(lane,),
+                        name=",".join(db.labelname for db in lane))
+                proc.start()
+                running.append(proc)
+                if self.__trace_path is not None:
+                    self.__trace_parts.append(self.__worker_trace_path(proc.pid))
+            # Wait for any worker to finish
+            multiprocessing.connection.wait([p.sentinel for p in running])
+            for proc in [p for p in running if not p.is_alive()]:
+                proc.join()
+                running.remove(proc)
+                if proc.exitcode != 0:
+                    failed.append(proc.name)
+        # The workers have their own copies of each DbSystem; tidy ours up
+        for db in self.dbs:
+            db.cleanup()
+        if failed:
+            raise RuntimeError("Error: parallel worker(s) for (%s) did not " %
+                    "; ".join(failed) + "complete successfully")
+
+    def __run_lane(self, lane):
+        """__run_lane
+        Target of each parallel worker process: runs the DbSystems in the
+        given lane one after another
+
+        :param lane: List of DbSystem instances
+        """
+        # The worker's copy of the parent's tracer is replaced with its own
+        if self.__trace_path is not None:
+            trace.enable("worker: " + ",".join(db.labelname for db in lane))
+        try:
+            for db in lane:
+                with trace.span(db.labelname, 'runner'):
+                    self.__run_db(db)
+            # Each worker has its own renderer, which must finish before it exits
+            with trace.span("plots", 'runner'):
+                self.__renderer.shutdown()
+        finally:
+            if self.__trace_path is not None:
+                trace.tracer().write(self.__worker_trace_path(os.getpid()))
+
+    def __worker_trace_path(self, pid):
+        """__worker_trace_path
+        Returns the path of the trace file written by the parallel worker
+        with the given process ID
+
+        :param pid: Process ID of the worker
+        """
+        return "%s.%d" % (self.__trace_path, pid)
+
+    def __db_renderer(self, db):
+        """__db_renderer
+        Returns the PlotRenderer to be used to render plots for the given DB,
+        or None if its plots should be rendered immediately
+
+        :param db: DbSystem instance
+        """
+        return self.__renderer if db.background_plots else None
+
+    def lanes(self):
+        """lanes
+        Partitions self.dbs into lists of DbSystems which may safely run in
+        parallel with one another. DBs with a parallel_group share a lane with
+        the other DBs in that group, and every lane shares a lane with any
+        other lane targeting one of the same servers.
+
+        Returns a list of lists of DbSystem instances, in config order
+        """
+        groups = {}
+        lanes = []
+        for db in self.dbs:
+            if db.parallel_group:
+                if db.parallel_group not in groups:
+                    groups[db.parallel_group] = (set(), [])
+                    lanes.append(groups[db.parallel_group])
+                groups[db.parallel_group][0].update(db.target_hosts)
+                groups[db.parallel_group][1].append(db)
+            else:
+                lanes.append((set(db.target_hosts), [db]))
+        # Merge every lane which shares a server with another (including
+        # groups, which could otherwise run against an ungrouped DB's server)
+        merged = []
+        for hosts, lane in lanes:
+            hosts, lane = set(hosts), list(lane)
+            for other in [l for l in merged if l[0] & hosts]:
+                merged.remove(other)
+                hosts |= other[0]
+                lane = other[1] + lane
+            merged.append((hosts, lane))
+        # Keep the DBs in each lane in config order
+        order = {id(db): i for i, db in enumerate(self.dbs)}
+        lanes = [sorted(l, key=lambda db: order[id(db)]) for _, l in merged]
+        return sorted(lanes, key=lambda l: order[id(l[0])])
 
     def __process_sections(self):
         """__process_sections
@@ -181,13 +546,11 @@ class Runner:
         :param stdout: YCSB+T output from which statistics extraction should
         take place
         """
-        stats = {}
-        for k, regex in const.STAT_REGEXPS.items():
-            m = Runner.get_re_match(regex, stdout)
-            if m is not None:
-                stats[k] = const.TRACKED_STATS[k](m)
+        parser = OutputParser()
+        for line in stdout.splitlines():
+            parser.feed(line)
         # Return new Statistics row storing extracted stats
-        return Statistics(**stats)
+        return parser.stats()
 
     @classmethod
     def get_re_match(cls, regex, string):
@@ -213,4 +576,6 @@ class Runner:
         location = location.upper()
         if location in self.__hooks:
             for h in self.__hooks[location]:
-                h(*args)
+                with trace.span(getattr(h, '__name__', location), 'hook',
+                        location=location):
+                    h(*args)
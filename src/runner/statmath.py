@@ -0,0 +1,181 @@
+import math
+
+# Iteration limit and tolerance for the incomplete beta continued fraction
+BETACF_MAX_ITER = 300
+BETACF_EPS = 1e-14
+
+def betainc(a, b, x):
+    """betainc
+    Returns the regularized incomplete beta function I_x(a, b)
+
+    :param a: Shape parameter a > 0
+    :param b: Shape parameter b > 0
+    :param x: Upper limit of integration, in [0, 1]
+    """
+    if x <= 0.:
+        return 0.
+    if x >= 1.:
+        return 1.
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+            a * math.log(x) + b * math.log1p(-x))
+    # The continued fraction converges quickly only on this side of the mean
+    if x < (a + 1.) / (a + b + 2.):
+        return front * _betacf(a, b, x) / a
+    return 1. - front * _betacf(b, a, 1. - x) / b
+
+def _betacf(a, b, x):
+    """_betacf
+    Evaluates the continued fraction for the incomplete beta function using
+    the modified Lentz method
+    """
+    tiny = 1e-300
+    c = 1.
+    d = 1. - (a + b) * x / (a + 1.)
+    d = 1. / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, BETACF_MAX_ITER + 1):
+        m2 = 2 * m
+        # Even step
+        num = m * (b - m) * x / ((a + m2 - 1.) * (a + m2))
+        d = 1. + num * d
+        d = 1. / (d if abs(d) > tiny else tiny)
+        c = 1. + num / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        # Odd step
+        num = -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1.))
+        d = 1. + num * d
+        d = 1. / (d if abs(d) > tiny else tiny)
+        c = 1. + num / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.) < BETACF_EPS:
+            break
+    return h
+
+def t_cdf(t, df):
+    """t_cdf
+    Returns the cumulative distribution function of Student's t distribution
+
+    :param t: Value of the t statistic
+    :param df: Degrees of freedom (need not be an integer)
+    """
+    if math.isinf(t):
+        return 1. if t > 0 else 0.
+    tail = 0.5 * betainc(df / 2., 0.5, df / (df + t * t))
+    return 1. - tail if t > 0 else tail
+
+def t_ppf(p, df):
+    """t_ppf
+    Returns the quantile function (inverse CDF) of Student's t distribution
+
+    :param p: Probability, in (0, 1)
+    :param df: Degrees of freedom (need not be an integer)
+    """
+    if not 0. < p < 1.:
+        raise ValueError("Probability must be in (0, 1): %r" % p)
+    if p < 0.5:
+        return -t_ppf(1. - p, df)
+    lo, hi = 0., 1.
+    while t_cdf(hi, df) < p:
+        lo, hi = hi, hi * 2.
+    # Bisection is plenty fast for the handful of quantiles we need
+    for _ in range(100):
+        mid = (lo + hi) / 2.
+        if t_cdf(mid, df) < p:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo < 1e-12 * max(1., hi):
+            break
+    return (lo + hi) / 2.
+
+def normal_cdf(z):
+    """normal_cdf
+    Returns the cumulative distribution function of the standard normal
+    distribution
+
+    :param z: Value of the z statistic
+    """
+    return 0.5 * math.erfc(-z / math.sqrt(2.))
+
+def ci_halfwidth(std, n, confidence=0.95):
+    """ci_halfwidth
+    Returns the half-width of the two-sided Student's t confidence interval
+    of a sample mean, or NaN for fewer than two values
+
+    :param std: Sample standard deviation
+    :param n: Number of values in the sample
+    :param confidence: Confidence level, in (0, 1)
+    """
+    if n < 2:
+        return float('nan')
+    return t_ppf((1. + confidence) / 2., n - 1) * std / math.sqrt(n)
+
+def welch_t_test(a, b):
+    """welch_t_test
+    Welch's unequal variances t-test of whether the means of two samples
+    differ
+
+    Returns a tuple of the t statistic, the Welch-Satterthwaite degrees of
+    freedom, and the two-sided p-value (NaN if either sample has fewer than
+    two values)
+
+    :param a: First sample, as a sequence of numbers
+    :param b: Second sample, as a sequence of numbers
+    """
+    na, nb = len(a), len(b)
+    if na < 2 or nb < 2:
+        return float('nan'), float('nan'), float('nan')
+    ma, mb = sum(a) / na, sum(b) / nb
+    va = sum((x - ma) ** 2 for x in a) / (na - 1) / na
+    vb = sum((x - mb) ** 2 for x in b) / (nb - 1) / nb
+    if va + vb == 0:
+        # Both samples are constant: the means either match exactly or differ
+        # with certainty
+        return (0., float('inf'), 1.) if ma == mb else \
+                (math.copysign(float('inf'), ma - mb), float('inf'), 0.)
+    t = (ma - mb) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va ** 2 / (na - 1) + vb ** 2 / (nb - 1))
+    return t, df, 2. * t_cdf(-abs(t), df)
+
+def mann_whitney_u(a, b):
+    """mann_whitney_u
+    Mann-Whitney U test of whether values from one sample tend to be larger
+    than values from the other, using the normal approximation with a tie
+    correction
+
+    Returns a tuple of the U statistic of the first sample, and the two-sided
+    p-value (NaN if either sample is empty)
+
+    :param a: First sample, as a sequence of numbers
+    :param b: Second sample, as a sequence of numbers
+    """
+    na, nb = len(a), len(b)
+    if na == 0 or nb == 0:
+        return float('nan'), float('nan')
+    values = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    n = na + nb
+    # Assign average ranks to ties
+    ranks = [0.] * n
+    ties = 0.
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2. + 1.
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    ra = sum(r for r, (_, g) in zip(ranks, values) if g == 0)
+    u = ra - na * (na + 1) / 2.
+    mu = na * nb / 2.
+    sigma = math.sqrt(na * nb / 12. * ((n + 1) - ties / (n * (n - 1)))) if n > 1 else 0.
+    if sigma == 0:
+        return u, 1.
+    # Continuity correction
+    z = (abs(u - mu) - 0.5) / sigma
+    return u, min(1., 2. * (1. - normal_cdf(max(z, 0.))))
@@ -1,53 +1,126 @@
 import re
+import functools
 
 from . import constants as const
+from . import statmath
+
+# NumPy is imported by the first StatisticsSet, rather than with this module,
+# so that tools which only need Statistics start quickly
+np = None
+
+def _import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+@functools.lru_cache(maxsize=None)
+def stat_type(name):
+    """stat_type
+    Returns the Python type of the given statistic, or None if it isn't a
+    statistic which can be stored by the Statistics class (i.e. it is neither
+    in const.TRACKED_STATS nor a per-operation statistic matching
+    const.RE_OP_STAT)
+
+    :param name: Name of the statistic
+    """
+    if name in const.TRACKED_STATS:
+        return const.TRACKED_STATS[name]
+    if const.RE_OP_STAT.match(name):
+        return const.OP_STAT_TYPE
+    return None
 
 class Statistics:
-    """Statistics: Stores statistical data for a single run of YCSB"""
+    """Statistics: Stores statistical data for a single run of YCSB
+
+    Each tracked statistic is stored in a slot, so rows carry no per-instance
+    dict; per-operation statistics are kept in a small dict created on demand.
+    """
+    # One slot per tracked statistic, plus the per-operation stats dict
+    __slots__ = tuple(const.TRACKED_STATS.keys()) + ('__ops',)
+
+    # Cached types and default values of tracked statistics
+    __TYPES    = dict(const.TRACKED_STATS)
+    __DEFAULTS = tuple((k, t()) for k, t in const.TRACKED_STATS.items())
 
     # Handle importing stats from kwargs
     def __init__(self, **kwargs):
-        self.__stats = {}
+        init = object.__setattr__
+        # Add default values for all tracked stats
+        for k, v in self.__DEFAULTS:
+            init(self, k, v)
         # Import values from given keyword arguments
+        types = self.__TYPES
+        ops = None
         for k, v in kwargs.items():
-            if k not in const.TRACKED_STATS:
-                raise AttributeError("Unexpected keyword argument: '%s'. " % k +
-                    "Valid arguments are ({})".format(','.join(const.TRACKED_STATS.keys())))
-            setattr(self, k, v)
-        # Add default values for missing stats
-        for k, v in const.TRACKED_STATS.items():
-            if k not in kwargs:
-                setattr(self, k, v())
-
-    # Get from __stats dict
+            t = types.get(k)
+            if t is None:
+                t = stat_type(k)
+                if t is None:
+                    raise AttributeError("Unexpected keyword argument: '%s'. " % k +
+                        "Valid arguments are ({}) ".format(','.join(const.TRACKED_STATS.keys())) +
+                        "or per-operation statistics, e.g. read_p99_latency")
+            if type(v) is not t:
+                raise self.__type_error(k, t, v)
+            if k in types:
+                init(self, k, v)
+            else:
+                if ops is None:
+                    ops = {}
+                ops[k] = v
+        init(self, '_Statistics__ops', ops)
+
+    # Only called for per-operation stats and attributes which don't exist
     def __getattr__(self, name):
-        if name in self.__stats:
-            return self.__stats[name]
+        if const.RE_OP_STAT.match(name):
+            if self.__ops is not None and name in self.__ops:
+                return self.__ops[name]
+            # Per-operation stats which weren't reported take the default value
+            return const.OP_STAT_TYPE()
         raise AttributeError("'%s' does not exist" % name)
 
-    # Store stats attributes in __stats dict
+    # Type-check stats before storing them
     def __setattr__(self, name, value):
-        if name in const.TRACKED_STATS:
-            # Ensure the type of the value matches what we expect
-            if type(value) != type(const.TRACKED_STATS[name]()):
-                raise TypeError("Type mismatch: '%s' should be '%s', but was '%s'" %
-                    (name, type(const.TRACKED_STATS[name]()).__name__, type(value).__name__))
-            self.__stats[name] = value
-        else:
+        t = stat_type(name)
+        if t is None:
+            object.__setattr__(self, name, value)
+            return
+        # Ensure the type of the value matches what we expect
+        if type(value) is not t:
+            raise self.__type_error(name, t, value)
+        if name in self.__TYPES:
             object.__setattr__(self, name, value)
+        else:
+            if self.__ops is None:
+                object.__setattr__(self, '_Statistics__ops', {})
+            self.__ops[name] = value
+
+    @staticmethod
+    def __type_error(name, t, value):
+        return TypeError("Type mismatch: '%s' should be '%s', but was '%s'" %
+            (name, t.__name__, type(value).__name__))
 
     def __getitem__(self, key):
-        if key in self.__stats:
-            return self.__stats[key]
+        if type(key) is str and stat_type(key) is not None:
+            return getattr(self, key)
         raise KeyError(key)
 
     def __str__(self):
-        return str(dict(self.__stats))
+        return str(self.dict(*self.fields()))
+
+    # Statistics are equal when every field has the same value, as rows are
+    # rebuilt from a StatisticsSet's columns whenever they're fetched
+    def __eq__(self, other):
+        if type(other) is not Statistics:
+            return NotImplemented
+        fields = set(self.fields()) | set(other.fields())
+        return self.dict(*fields) == other.dict(*fields)
+
+    __hash__ = None
 
     def __dir__(self):
         objdir = list(dir(super(Statistics, self)))
-        objdir += list(self.__dict__.keys())
-        objdir +=  list(self.__stats.keys())
+        objdir += self.fields()
         return objdir
 
     @property
@@ -60,12 +133,25 @@ class Statistics:
             return float(abs(self.totalcash - self.countcash) / self.opcount)
         return 0.
 
+    def fields(self):
+        """fields
+        Returns a list of the names of the fields stored in this Statistics
+        object (every tracked statistic, plus any per-operation statistics)
+        """
+        fields = list(self.__TYPES.keys())
+        if self.__ops is not None:
+            fields += list(self.__ops.keys())
+        return fields
+
     def dict(self, *fields):
         """dict
         Returns a dictionary representing this Statistics object
 
-        :param *fields: Names of fields to be included in the returned dictionary
+        :param *fields: Names of fields to be included in the returned
+            dictionary; every field (see fields()) if none are given
         """
+        if not fields:
+            fields = self.fields()
         try:
             return {field : getattr(self, field) for field in fields}
         except TypeError:
@@ -74,6 +160,12 @@ class Statistics:
 class StatisticsSet:
     """StatisticsSet: Stores a set of Statistics objects.
 
+    Values are stored in columns, as one NumPy array per field, so that
+    aggregation over the set is vectorized. Statistics objects are copied into
+    the columns when they are added, and aren't kept: indexing the set (or
+    calling items()) rebuilds them from the columns, so changing a fetched
+    Statistics object doesn't change the set.
+
     Averages can be accessed by prepending a Statistics field name with avg_
         e.g. statset.avg_anomaly_score
         or   statset.avg_opcount
@@ -81,18 +173,28 @@ class StatisticsSet:
     # The type of data we're storing here
     STATS_TYPE = Statistics
 
+    # Initial capacity of each column; columns double in size when full
+    INITIAL_CAPACITY = 16
+
+    # Aggregation functions supported by StatisticsSet.aggregate, in addition
+    # to percentiles (e.g. p95)
+    AGGREGATES = ('mean', 'sum', 'min', 'max', 'std', 'count', 'median')
+
     def __init__(self, *args):
         """__init__
         Instantiate this StatisticsSet with the given Statistics objects
 
         :param *args: Statistics instances to add to this StatisticsSet
         """
+        _import_numpy()
         # Mappings of magic prefixes to aggregation methods
         self.__MAGIC_ATTR_PREFIX_MAP = {
             "avg_": self.average,
             "sum_": self.sum,
         }
-        self.__stats = []
+        self.__len = 0
+        self.__columns = {}
+        self.__capacity = self.INITIAL_CAPACITY
         self.addstats(*args)
 
     def __getattr__(self, name):
@@ -110,12 +212,9 @@ class StatisticsSet:
         :param key: Index to retrieve (int), or name of an attribute (str)
         """
         if type(key) is int:
-            try:
-                return self.__stats[key]
-            # Custom error string to avoid confusion and avoid leaking internal
-            # implementation details
-            except IndexError:
+            if not -self.__len <= key < self.__len:
                 raise IndexError("StatisticsSet index out of range")
+            return self.__row(key % self.__len)
         elif type(key) is str:
             try:
                 return getattr(self, key)
@@ -128,7 +227,7 @@ class StatisticsSet:
         """__len__
         Number of Statistics instances stored
         """
-        return len(self.__stats)
+        return self.__len
 
     def __dir__(self):
         objdir = list(dir(super(StatisticsSet, self)))
@@ -150,14 +249,77 @@ class StatisticsSet:
             if type(arg) != self.STATS_TYPE:
                 raise ValueError("Can only store instances of %s class" %
                         self.STATS_TYPE.__name__)
-            else:
-                self.__stats.append(arg)
+            n = self.__len
+            # Grow every column when full (amortized O(1) append)
+            if n == self.__capacity:
+                self.__capacity *= 2
+                for field, column in self.__columns.items():
+                    self.__columns[field] = np.resize(column, self.__capacity)
+            # Fields first seen in this row get a column with default values
+            for field in arg.fields():
+                if field not in self.__columns:
+                    t = stat_type(field)
+                    self.__columns[field] = np.full(self.__capacity, t(),
+                            dtype=np.dtype(t))
+            for field, column in self.__columns.items():
+                column[n] = getattr(arg, field)
+            self.__len += 1
+
+    def __row(self, i):
+        """__row
+        Rebuilds the Statistics instance at the given index from the columns.
+        Per-operation stats which have their default value are left out, as
+        they read the same whether or not the original row reported them.
+
+        :param i: Index of the row, from 0 to len(self) - 1
+        """
+        row = {}
+        for field, column in self.__columns.items():
+            value = column[i].item()
+            if field in const.TRACKED_STATS or value != const.OP_STAT_TYPE():
+                row[field] = value
+        return Statistics(**row)
 
     def items(self):
         """items
-        A list of Statistics instances stored in this StatisticsSet
+        A list of Statistics instances stored in this StatisticsSet, rebuilt
+        from its columns
         """
-        return self.__stats
+        return [self.__row(i) for i in range(self.__len)]
+
+    def column(self, field):
+        """column
+        Returns a NumPy array of the values of the given field, one per
+        Statistics instance, in the order they were added. The array must not
+        be modified.
+
+        :param field: Field for which values should be retrieved
+        """
+        if field in self.__columns:
+            return self.__columns[field][:len(self)]
+        if field == 'anomaly_score':
+            # Vectorized equivalent of Statistics.anomaly_score
+            opcount = self.column('opcount')
+            diff = np.abs(self.column('totalcash') - self.column('countcash'))
+            return np.divide(diff, opcount, out=np.zeros(len(self)),
+                    where=opcount > 0)
+        if type(field) is str and stat_type(field) is not None:
+            # Stats not stored by any row take their default value
+            t = stat_type(field)
+            return np.full(len(self), t(), dtype=np.dtype(t))
+        # Fall back to fetching other attributes from each row
+        return np.array([getattr(stat, field) for stat in self.items()])
+
+    def columns(self, *fields):
+        """columns
+        Returns a dict mapping each of the given fields to a NumPy array of
+        its values (see StatisticsSet.column)
+
+        :param *fields: Names of fields to be included
+        """
+        if len(fields) == 0:
+            raise TypeError("StatisticsSet.columns expected at least 1 argument, got 0")
+        return {field: self.column(field) for field in fields}
 
     def getfields(self, *fields):
         """getfields
@@ -169,7 +331,11 @@ class StatisticsSet:
         """
         if len(fields) == 0:
             raise TypeError("StatisticsSet.getfields expected at least 1 argument, got 0")
-        return list(map(lambda s: s.dict(*fields), self.items()))
+        for field in fields:
+            if type(field) is not str:
+                raise TypeError("Statistics.dict(): field names must be strings")
+        values = [self.column(field).tolist() for field in fields]
+        return [dict(zip(fields, row)) for row in zip(*values)]
 
     def average(self, field):
         """average
@@ -177,10 +343,8 @@ class StatisticsSet:
 
         :param field: Field to average
         """
-        stats = self.getvalues(field)
-        if None in stats:
-            return None
-        return sum(stats) / len(stats)
+        values = self.column(field)
+        return values.sum().item() / len(values)
 
     def sum(self, field):
         """sum
@@ -188,10 +352,7 @@ class StatisticsSet:
 
         :param field: Field to be summed
         """
-        stats = self.getvalues(field)
-        if None in stats:
-            return None
-        return sum(stats)
+        return self.column(field).sum().item()
 
     def getvalues(self, field):
         """getvalues
@@ -199,4 +360,87 @@ class StatisticsSet:
 
         :param field: Field for which values should be retrieved
         """
-        return [getattr(stat, field) for stat in self.__stats]
+        return self.column(field).tolist()
+
+    def aggregate(self, key, field, how='mean'):
+        """aggregate
+        Groups the values of field by the values of key, and aggregates each
+        group using the given function.
+
+        Returns a tuple of two NumPy arrays: the distinct values of key, in
+        ascending order, and the aggregated value of field for each
+
+        :param key: Field to group by
+        :param field: Field to aggregate
+        :param how: One of StatisticsSet.AGGREGATES, a percentile given as
+            pNN (e.g. p95 or p99.9), or a confidence interval given as ciNN
+            (e.g. ci95). std is the sample standard deviation, and is NaN for
+            groups of one value. ciNN is the half-width of the Student's t
+            confidence interval of the mean at NN% confidence, and is also NaN
+            for groups of one value.
+        """
+        keys = self.column(key)
+        values = self.column(field).astype(np.float64)
+        if len(keys) == 0:
+            return keys, values
+        # Sort by key, then value, so each group is contiguous and sorted
+        order = np.lexsort((values, keys))
+        keys, values = keys[order], values[order]
+        groups, starts = np.unique(keys, return_index=True)
+        counts = np.diff(np.append(starts, len(keys)))
+        if how == 'count':
+            return groups, counts
+        if how == 'sum':
+            return groups, np.add.reduceat(values, starts)
+        if how == 'mean':
+            return groups, np.add.reduceat(values, starts) / counts
+        if how == 'min':
+            return groups, values[starts]
+        if how == 'max':
+            return groups, values[starts + counts - 1]
+        if how == 'std' or type(how) is str and how.startswith('ci'):
+            means = np.add.reduceat(values, starts) / counts
+            sqdev = np.add.reduceat((values - np.repeat(means, counts)) ** 2, starts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                std = np.sqrt(np.where(counts > 1, sqdev, np.nan) / (counts - 1))
+            if how == 'std':
+                return groups, std
+            try:
+                confidence = float(how[2:]) / 100.
+            except ValueError:
+                confidence = -1
+            if 0 < confidence < 1:
+                return groups, np.array([statmath.ci_halfwidth(s, n, confidence)
+                    for s, n in zip(std, counts)])
+        if how == 'median':
+            how = 'p50'
+        if type(how) is str and how.startswith('p'):
+            try:
+                q = float(how[1:])
+            except ValueError:
+                q = -1
+            if 0 <= q <= 100:
+                # Linear interpolation between closest ranks, as np.percentile
+                pos = starts + (counts - 1) * q / 100.
+                lo = np.floor(pos).astype(np.int64)
+                hi = np.ceil(pos).astype(np.int64)
+                return groups, values[lo] + (values[hi] - values[lo]) * (pos - lo)
+        raise ValueError("Unsupported aggregate '%s': expected one of (%s), pNN or ciNN" %
+                (how, ','.join(self.AGGREGATES)))
+
+    def groupby(self, key, *fields, how='mean'):
+        """groupby
+        Returns a dict mapping key to an array of its distinct values, and each
+        of the given fields to an array of its aggregated values for each
+        distinct key (see StatisticsSet.aggregate)
+
+        :param key: Field to group by
+        :param *fields: Fields to aggregate
+        :param how: Aggregation function (see StatisticsSet.aggregate)
+        """
+        result = {}
+        for field in fields:
+            result[key], result[field] = self.aggregate(key, field, how)
+        if key not in result:
+            result[key] = np.unique(self.column(key))
+        return result
@@ -0,0 +1,98 @@
+import re
+
+# Matches YCSB -s status lines, e.g.
+#   10 sec: 97812 operations; 9781.2 current ops/sec; [READ AverageLatency(us)=96.98]
+# or, in newer versions of YCSB,
+#   2015-10-05 12:00:00:123 10 sec: 97812 operations; 9781.2 current ops/sec;
+#   est completion in 1 minute [READ: Count=48927, Max=3051, Min=48, Avg=97.32, ...]
+RE_STATUS = re.compile(r"(?:^|\s)([0-9]+) sec: ([0-9]+) operations;" +
+    r"(?: ([0-9.]+) current ops/sec;)?(.*)$")
+RE_STATUS_LATENCY = re.compile(r"\[([A-Z][A-Z0-9_-]*):? [^\]]*?" +
+    r"(?:AverageLatency\(us\)|Avg)=([0-9.]+)")
+# Newer versions of YCSB also report each operation's count in the interval
+RE_STATUS_COUNT = re.compile(r"\[([A-Z][A-Z0-9_-]*): [^\]]*?Count=([0-9]+)")
+
+class StatusSeries:
+    """StatusSeries: Time series of the periodic status reports YCSB prints
+    when run with -s: elapsed time, total operations, current throughput, and
+    the current average latency of each operation type, and (in newer
+    versions of YCSB) the number of each operation type in the interval.
+
+    Values are stored as parallel lists, one entry per status report; latency
+    and count lists hold None for reports which didn't include that
+    operation.
+    """
+    def __init__(self):
+        self.elapsed = []
+        self.operations = []
+        self.ops_per_sec = []
+        self.latencies = {}
+        self.counts = {}
+
+    def __len__(self):
+        """__len__
+        Number of status reports stored
+        """
+        return len(self.elapsed)
+
+    def feed(self, line):
+        """feed
+        Stores the values from the given line of YCSB output if it's a status
+        report
+
+        Returns True if the line was a status report
+
+        :param line: A single line of YCSB output
+        """
+        m = RE_STATUS.search(line)
+        if m is None:
+            return False
+        elapsed, operations, ops_per_sec, rest = m.groups()
+        n = len(self)
+        self.elapsed.append(int(elapsed))
+        self.operations.append(int(operations))
+        self.ops_per_sec.append(float(ops_per_sec) if ops_per_sec else None)
+        for op, latency in RE_STATUS_LATENCY.findall(rest):
+            if op not in self.latencies:
+                self.latencies[op] = [None] * n
+            if len(self.latencies[op]) == n:
+                self.latencies[op].append(float(latency))
+        for op, count in RE_STATUS_COUNT.findall(rest):
+            if op not in self.counts:
+                self.counts[op] = [None] * n
+            if len(self.counts[op]) == n:
+                self.counts[op].append(int(count))
+        # Operations missing from this report have no latency or count
+        for values in list(self.latencies.values()) + list(self.counts.values()):
+            if len(values) == n:
+                values.append(None)
+        return True
+
+    def dict(self):
+        """dict
+        Returns a dictionary representing this StatusSeries, suitable for
+        serializing as JSON
+        """
+        return {
+            'elapsed'     : self.elapsed,
+            'operations'  : self.operations,
+            'ops_per_sec' : self.ops_per_sec,
+            'latency'     : self.latencies,
+            'count'       : self.counts,
+        }
+
+    @classmethod
+    def fromdict(cls, d):
+        """fromdict
+        Creates a StatusSeries from a dictionary returned by StatusSeries.dict
+
+        :param d: Dictionary representing a StatusSeries
+        """
+        series = cls()
+        series.elapsed = list(d['elapsed'])
+        series.operations = list(d['operations'])
+        series.ops_per_sec = list(d['ops_per_sec'])
+        series.latencies = {k: list(v) for k, v in d['latency'].items()}
+        # Series written before counts were recorded have none
+        series.counts = {k: list(v) for k, v in d.get('count', {}).items()}
+        return series
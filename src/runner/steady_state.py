@@ -0,0 +1,98 @@
+from .output_parser import RE_NAME_INVALID
+
+def interval_throughputs(series):
+    """interval_throughputs
+    Returns a list of the throughput (ops/sec) in each interval between
+    consecutive status reports in the given series
+
+    :param series: StatusSeries instance
+    """
+    rates = []
+    for j in range(1, len(series)):
+        dt = series.elapsed[j] - series.elapsed[j - 1]
+        dops = series.operations[j] - series.operations[j - 1]
+        rates.append(float(dops) / dt if dt > 0 else 0.)
+    return rates
+
+def detect_warmup(rates, window=3, tolerance=0.1):
+    """detect_warmup
+    Detects the end of the warm-up period in a sequence of interval
+    throughputs using a moving-window test: warm-up ends at the first interval
+    whose window of the next `window` intervals has a mean throughput within
+    `tolerance` (relative) of the mean throughput of the rest of the run.
+
+    Returns the index of the first steady-state interval, or None if no
+    steady state was found (including when there are fewer than 2 * window
+    intervals)
+
+    :param rates: List of interval throughputs (see interval_throughputs)
+    :param window: Number of intervals in the moving window
+    :param tolerance: Maximum relative difference between the window mean and
+        the mean of the rest of the run
+    """
+    window = max(1, window)
+    # The window must be compared against at least as many later intervals
+    for i in range(0, len(rates) - 2 * window + 1):
+        current = sum(rates[i:i + window]) / window
+        rest = rates[i + window:]
+        rest = sum(rest) / len(rest)
+        if abs(current - rest) <= tolerance * abs(rest):
+            return i
+    return None
+
+def analyze(series, window=3, tolerance=0.1, stats=None):
+    """analyze
+    Detects the warm-up period in the given status report series, and
+    computes throughput and latency over the remaining steady-state period.
+
+    Each operation's steady latency is the mean of its steady-state
+    reports, and steady_latency is the mean of those, both weighted by the
+    number of operations: the counts in each report where YCSB gives them,
+    or else each operation's total count from the run's summary (stats).
+
+    Returns a dict of Statistics fields: warmup_time (seconds), and
+    steady_throughput, steady_latency, and <op>_steady_latency for each
+    operation type; or None if no steady state was found
+
+    :param series: StatusSeries instance for a run
+    :param window: Number of status intervals in the moving window
+    :param tolerance: Maximum relative difference for steady state (see
+        detect_warmup)
+    :param stats: Statistics row for the run (for its <op>_operations), or
+        None to weight operations equally when the reports have no counts
+    """
+    start = detect_warmup(interval_throughputs(series), window, tolerance)
+    if start is None:
+        return None
+    # Interval i runs from report i to report i + 1
+    elapsed = series.elapsed[-1] - series.elapsed[start]
+    operations = series.operations[-1] - series.operations[start]
+    result = {
+        'warmup_time'      : float(series.elapsed[start]),
+        'steady_throughput': float(operations) / elapsed if elapsed > 0 else 0.,
+    }
+    # Average each operation's latency over the steady-state reports
+    means = []
+    total = weights = 0.
+    for op, values in series.latencies.items():
+        counts = series.counts.get(op, [None] * len(values))
+        reports = [(v, c) for v, c in zip(values[start + 1:], counts[start + 1:])
+                if v is not None]
+        if not reports:
+            continue
+        name = RE_NAME_INVALID.sub('_', op.lower()).strip('_')
+        count = sum(c for _, c in reports if c is not None)
+        if count > 0 and all(c is not None for _, c in reports):
+            mean = sum(v * c for v, c in reports) / count
+        else:
+            mean = sum(v for v, _ in reports) / len(reports)
+            count = getattr(stats, name + '_operations') if stats is not None else 1.
+        result[name + '_steady_latency'] = mean
+        means.append(mean)
+        total += mean * count
+        weights += count
+    if weights > 0:
+        result['steady_latency'] = total / weights
+    else:
+        result['steady_latency'] = sum(means) / len(means) if means else 0.
+    return result
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import threading
+import contextlib
+
+# The tracer of this process, set by enable(); the module-level functions
+# below do nothing while it's None
+_tracer = None
+
+def now():
+    """now
+    Returns the current time in seconds on the clock trace events use, which
+    is shared by every process on the host (so the traces of parallel workers
+    line up)
+    """
+    return time.monotonic()
+
+class Tracer:
+    """Tracer: Records a timeline of the campaign as Chrome trace events,
+    which can be opened in Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+    Spans are recorded as complete ("X") events on the thread which ran
+    them, so spans run inside one another on the same thread are shown
+    nested; counters ("C") are shown as graphs, e.g. YCSB's throughput over
+    each run.
+    """
+    def __init__(self, name=None):
+        """__init__
+
+        :param name: Name shown for this process in the timeline, or None
+        """
+        self.events = []
+        self.__lock = threading.Lock()
+        if name is not None:
+            self.metadata('process_name', name=name)
+
+    def __add(self, event):
+        event.setdefault('pid', os.getpid())
+        event.setdefault('tid', threading.get_native_id())
+        with self.__lock:
+            self.events.append(event)
+
+    def metadata(self, event, **args):
+        """metadata
+        Records a metadata event, e.g. process_name or thread_name
+
+        :param event: Name of the metadata event
+        :param **args: Its arguments, e.g. name='worker'
+        """
+        self.__add({'name': event, 'ph': 'M', 'args': args})
+
+    def complete(self, name, start, seconds, cat='runner', args=None):
+        """complete
+        Records a span which has already finished
+
+        :param name: Name of the span
+        :param start: Time the span started, from now()
+        :param seconds: Duration of the span
+        :param cat: Category of the span (e.g. runner, phase or hook)
+        :param args: Dict of values to show with the span, or None
+        """
+        event = {'name': name, 'cat': cat, 'ph': 'X',
+                'ts': start * 1e6, 'dur': seconds * 1e6}
+        if args:
+            event['args'] = args
+        self.__add(event)
+
+    @contextlib.contextmanager
+    def span(self, name, cat='runner', **args):
+        """span
+        Context manager which records its block as a span. Yields a dict of
+        the span's arguments, which can be added to within the block.
+
+        :param name: Name of the span
+        :param cat: Category of the span
+        :param **args: Values to show with the span
+        """
+        start = now()
+        try:
+            yield args
+        finally:
+            self.complete(name, start, now() - start, cat, args)
+
+    def instant(self, name, cat='runner', **args):
+        """instant
+        Records an event which takes no time, e.g. a retry
+
+        :param name: Name of the event
+        :param cat: Category of the event
+        :param **args: Values to show with the event
+        """
+        self.__add({'name': name, 'cat': cat, 'ph': 'i', 's': 'p',
+            'ts': now() * 1e6, 'args': args})
+
+    def counter(self, name, ts=None, **values):
+        """counter
+        Records the values of a counter
+
+        :param name: Name of the counter
+        :param ts: Time of the values, from now(), or None for the current time
+        :param **values: Value of each of the counter's series
+        """
+        self.__add({'name': name, 'ph': 'C',
+            'ts': (now() if ts is None else ts) * 1e6, 'args': values})
+
+    def write(self, path):
+        """write
+        Writes the trace as Chrome trace-event JSON
+
+        :param path: Path of the file to write
+        """
+        with self.__lock:
+            events = list(self.events)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+def enable(name=None):
+    """enable
+    Starts tracing this process with a new Tracer (replacing any previous
+    one, e.g. one inherited by a forked worker)
+
+    Returns the Tracer
+
+    :param name: Name shown for this process in the timeline, or None
+    """
+    global _tracer
+    _tracer = Tracer(name)
+    return _tracer
+
+def disable():
+    """disable
+    Stops tracing this process
+    """
+    global _tracer
+    _tracer = None
+
+def tracer():
+    """tracer
+    Returns the Tracer of this process, or None if tracing is disabled
+    """
+    return _tracer
+
+def span(name, cat='hook', **args):
+    """span
+    Context manager which records its block as a span in this process's
+    trace, if tracing is enabled (see Tracer.span). Hooks can use this to
+    show their own work in the timeline, e.g.
+
+        from runner import trace
+        with trace.span("restart server"):
+            ...
+    """
+    if _tracer is None:
+        return contextlib.nullcontext(args)
+    return _tracer.span(name, cat, **args)
+
+def complete(name, start, seconds, cat='runner', args=None):
+    """complete
+    Records a span which has already finished, if tracing is enabled (see
+    Tracer.complete)
+    """
+    if _tracer is not None:
+        _tracer.complete(name, start, seconds, cat, args)
+
+def instant(name, cat='hook', **args):
+    """instant
+    Records an event which takes no time, if tracing is enabled (see
+    Tracer.instant)
+    """
+    if _tracer is not None:
+        _tracer.instant(name, cat, **args)
+
+def counter(name, ts=None, **values):
+    """counter
+    Records the values of a counter, if tracing is enabled (see
+    Tracer.counter)
+    """
+    if _tracer is not None:
+        _tracer.counter(name, ts, **values)
+
+def merge(path, parts):
+    """merge
+    Appends the events of the given trace files (e.g. those written by
+    parallel workers) to the trace file at path, and removes them. Missing
+    parts (e.g. of workers which crashed before writing them) are skipped.
+
+    :param path: Path of the trace file to add to
+    :param parts: List of paths of trace files to merge into it
+    """
+    with open(path) as f:
+        trace = json.load(f)
+    for part in parts:
+        if not os.path.exists(part):
+            continue
+        with open(part) as f:
+            trace['traceEvents'] += json.load(f)['traceEvents']
+        os.remove(part)
+    with open(path, 'w') as f:
+        json.dump(trace, f)
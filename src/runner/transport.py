@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import shlex
+import socket
+import subprocess
+
+from . import constants as const
+
+def send(wfile, **message):
+    """send
+    Writes a message to the given stream, as one line of JSON
+
+    :param wfile: Text stream to write to
+    :param **message: Message fields
+    """
+    wfile.write(json.dumps(message, separators=(',', ':')) + "\n")
+    wfile.flush()
+
+def receive(rfile):
+    """receive
+    Reads a message written by send() from the given stream
+
+    Returns the message as a dict, or None at EOF
+
+    :param rfile: Text stream to read from
+    """
+    line = rfile.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+class Transport:
+    """Transport: Connection from a coordinator to a worker agent (see
+    runner.worker), providing a pair of text streams to exchange messages"""
+    def __init__(self):
+        self.rfile = None
+        self.wfile = None
+
+    def open(self):
+        """open
+        Connects to the worker, setting rfile and wfile
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """close
+        Disconnects from the worker
+        """
+        for f in (self.wfile, self.rfile):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+
+class ProcessTransport(Transport):
+    """ProcessTransport: Runs a worker agent as a child process, talking to it
+    over its stdin and stdout"""
+    def __init__(self, cmd, env=None):
+        """__init__
+
+        :param cmd: Command which runs the worker agent, as a list
+        :param env: Environment for the command, or None to inherit ours
+        """
+        super().__init__()
+        self.cmd = cmd
+        self.env = env
+        self.__proc = None
+
+    def open(self):
+        self.__proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE, bufsize=1, universal_newlines=True,
+                encoding="utf-8", env=self.env)
+        self.rfile, self.wfile = self.__proc.stdout, self.__proc.stdin
+
+    def close(self):
+        super().close()
+        if self.__proc is not None:
+            self.__proc.wait()
+
+class LocalTransport(ProcessTransport):
+    """LocalTransport: Runs a worker agent from this package as a local
+    subprocess"""
+    def __init__(self):
+        src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        path = [src] + [p for p in os.environ.get('PYTHONPATH', '').split(os.pathsep) if p]
+        super().__init__([sys.executable, "-m", "runner.worker"],
+                dict(os.environ, PYTHONPATH=os.pathsep.join(path)))
+
+class SshTransport(ProcessTransport):
+    """SshTransport: Runs a worker agent on a remote host over SSH"""
+    def __init__(self, host, worker_command=const.DEFAULT_WORKER_COMMAND):
+        """__init__
+
+        :param host: SSH destination, e.g. user@host
+        :param worker_command: Command which runs the worker agent on the host
+        """
+        super().__init__(["ssh", "-T", host] + shlex.split(worker_command))
+
+class TcpTransport(Transport):
+    """TcpTransport: Connects to a worker agent listening on a TCP port
+    (see ycsb_worker.py --listen)"""
+    def __init__(self, host, port):
+        """__init__
+
+        :param host: Hostname of the worker
+        :param port: Port the worker is listening on
+        """
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.__sock = None
+
+    def open(self):
+        self.__sock = socket.create_connection((self.host, self.port))
+        self.rfile = self.__sock.makefile('r', encoding='utf-8')
+        self.wfile = self.__sock.makefile('w', encoding='utf-8')
+
+    def close(self):
+        super().close()
+        if self.__sock is not None:
+            self.__sock.close()
+
+def make_transport(url, worker_command=const.DEFAULT_WORKER_COMMAND):
+    """make_transport
+    Returns a Transport for the given worker URL: local, ssh://[user@]host,
+    or tcp://host:port
+
+    :param url: Worker URL (see the workers option)
+    :param worker_command: Command which runs the worker agent over SSH
+    """
+    scheme, _, address = url.partition('://')
+    if url == 'local':
+        return LocalTransport()
+    if scheme == 'ssh' and address:
+        return SshTransport(address, worker_command)
+    if scheme == 'tcp' and address:
+        host, _, port = address.rpartition(':')
+        if host and port.isdigit():
+            return TcpTransport(host, int(port))
+    raise ValueError("Invalid worker '%s': expected local, ssh://[user@]host " % url +
+            "or tcp://host:port")
@@ -0,0 +1,188 @@
+import os
+import sys
+import queue
+import tempfile
+import threading
+import subprocess
+import socketserver
+
+from .transport    import send, receive
+from .ycsb_process import kill_group
+
+# Programs a worker runs by default; anything else sent by a coordinator is
+# refused, as workers may be reachable over the network
+DEFAULT_ALLOWED = ('ycsb',)
+
+# Queued for Worker.__watch once a command has exited
+_EXITED = object()
+
+class Worker:
+    """Worker: Agent which runs YCSB commands on behalf of a coordinator (see
+    Coordinator), and streams their output back.
+
+    Messages are JSON objects, one per line. For each run, the coordinator
+    sends {"cmd": "run", "argv": [...], "files": {path: content}}; the worker
+    writes the files to a temporary directory, replaces the paths in argv
+    with the local copies, and replies {"ready": true}. Once every worker is
+    ready, the coordinator sends {"cmd": "start"}, and the worker runs the
+    command, sending {"line": ...} for each line of output and finally
+    {"exit": code}. If the coordinator sends {"cmd": "kill"} or disconnects
+    while the command runs, its whole process group is killed.
+    """
+    def __init__(self, rfile, wfile, allowed=DEFAULT_ALLOWED):
+        """__init__
+
+        :param rfile: Text stream to read messages from
+        :param wfile: Text stream to write messages to
+        :param allowed: Names of the programs this worker may run
+        """
+        self.rfile = rfile
+        self.wfile = wfile
+        self.allowed = allowed
+        # Serializes messages from the stdout and stderr readers
+        self.__lock = threading.Lock()
+        # Messages from the coordinator, read by a background thread so that
+        # a kill can arrive while a command runs (None once disconnected)
+        self.__messages = queue.Queue()
+
+    def serve(self):
+        """serve
+        Handles runs from the coordinator until it disconnects
+        """
+        threading.Thread(target=self.__receive, daemon=True).start()
+        while True:
+            message = self.__messages.get()
+            if message is None:
+                return
+            if message.get('cmd') != 'run':
+                send(self.wfile, error="Unexpected message: %r" % message)
+                continue
+            self.__run(message['argv'], message.get('files', {}))
+
+    def __run(self, argv, files):
+        """__run
+        Prepares and runs a single command (see Worker)
+
+        :param argv: Command to run
+        :param files: Dict mapping coordinator file paths to file contents
+        """
+        if os.path.basename(argv[0]) not in self.allowed:
+            send(self.wfile, error="Program not allowed: %s" % argv[0])
+            return
+        with tempfile.TemporaryDirectory(prefix="ycsb-worker-") as tmpdir:
+            for i, (path, content) in enumerate(files.items()):
+                local = os.path.join(tmpdir, "%i-%s" % (i, os.path.basename(path)))
+                with open(local, 'w') as f:
+                    f.write(content)
+                argv = [local if arg == path else arg for arg in argv]
+            send(self.wfile, ready=True)
+            message = self.__messages.get()
+            if message is None or message.get('cmd') != 'start':
+                return
+            try:
+                # The command mustn't read the coordinator's messages
+                proc = subprocess.Popen(argv, stdin=subprocess.DEVNULL,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE, bufsize=1,
+                        universal_newlines=True, encoding="utf-8",
+                        errors="replace", start_new_session=True)
+            except OSError as e:
+                send(self.wfile, error=str(e))
+                return
+            watch = threading.Thread(target=self.__watch, args=(proc,),
+                    daemon=True)
+            watch.start()
+            with proc:
+                stderr = threading.Thread(target=self.__stream,
+                        args=(proc.stderr,), daemon=True)
+                stderr.start()
+                self.__stream(proc.stdout)
+                stderr.join()
+            # The coordinator sends nothing more until it receives the exit
+            self.__messages.put(_EXITED)
+            watch.join()
+            send(self.wfile, exit=proc.returncode)
+
+    def __receive(self):
+        """__receive
+        Queues each message from the coordinator until it disconnects
+        """
+        while True:
+            message = receive(self.rfile)
+            self.__messages.put(message)
+            if message is None:
+                return
+
+    def __watch(self, proc):
+        """__watch
+        Kills the given command's process group if the coordinator sends a
+        kill or disconnects before the command exits
+        """
+        message = self.__messages.get()
+        if message is _EXITED:
+            return
+        kill_group(proc)
+        disconnected = message is None
+        # Wait for the command to exit
+        while message is not _EXITED:
+            message = self.__messages.get()
+            disconnected = disconnected or message is None
+        if disconnected:
+            # Leave the disconnection for serve() to see
+            self.__messages.put(None)
+
+    def __stream(self, stream):
+        """__stream
+        Sends each line read from the given stream to the coordinator
+
+        :param stream: File object to read from
+        """
+        for line in stream:
+            with self.__lock:
+                send(self.wfile, line=line.rstrip("\n"))
+
+class _TcpHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        wfile = self.connection.makefile('w', encoding='utf-8')
+        rfile = self.connection.makefile('r', encoding='utf-8')
+        Worker(rfile, wfile, self.server.allowed).serve()
+
+class TcpWorkerServer(socketserver.ThreadingTCPServer):
+    """TcpWorkerServer: Serves a Worker to each coordinator which connects
+    over TCP"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, allowed=DEFAULT_ALLOWED):
+        """__init__
+
+        :param address: (host, port) tuple to listen on; port 0 picks a free
+            port (see server_address)
+        :param allowed: Names of the programs the workers may run
+        """
+        self.allowed = allowed
+        super().__init__(address, _TcpHandler)
+
+def main(argv=None):
+    """main
+    Runs a worker, talking to the coordinator over stdin/stdout (for the local
+    and ssh transports), or listening on a TCP port with --listen
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="YCSB Runner worker agent")
+    parser.add_argument("--listen", metavar="HOST:PORT",
+            help="accept coordinators over TCP rather than stdin/stdout")
+    parser.add_argument("--allow", metavar="PROGRAM", action="append",
+            help="program which coordinators may run (default: ycsb)")
+    args = parser.parse_args(argv)
+    allowed = tuple(args.allow) if args.allow else DEFAULT_ALLOWED
+    if args.listen:
+        host, _, port = args.listen.rpartition(':')
+        with TcpWorkerServer((host or '127.0.0.1', int(port)), allowed) as server:
+            print("Listening on %s:%i" % server.server_address, file=sys.stderr)
+            server.serve_forever()
+    else:
+        Worker(sys.stdin, sys.stdout, allowed).serve()
+
+if __name__ == '__main__':
+    main()
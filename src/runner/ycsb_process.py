@@ -0,0 +1,264 @@
+import os
+import time
+import signal
+import threading
+import subprocess
+
+class ProcessTimeout(RuntimeError):
+    """ProcessTimeout: Raised when a command is killed for running longer than
+    its timeout, or for producing no output for longer than its stall
+    timeout"""
+    def __init__(self, message, reason):
+        """__init__
+
+        :param message: Error message
+        :param reason: 'timeout' or 'stall'
+        """
+        super().__init__(message)
+        self.reason = reason
+
+def kill_group(proc):
+    """kill_group
+    Kills the process group led by the given process (which must have been
+    started with start_new_session=True), so that any processes it started
+    (e.g. the JVM started by the ycsb script) are killed too
+
+    :param proc: Popen instance
+    """
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        # The whole group has already exited
+        pass
+
+def call(cmd, timeout=0):
+    """call
+    Runs a command to completion in its own process group, like
+    subprocess.call. Raises a ProcessTimeout if it is still running after
+    timeout seconds, once the whole group has been killed.
+
+    Returns the exit code of the command
+
+    :param cmd: List of shell arguments, including name of command as first
+        element
+    :param timeout: Maximum number of seconds the command may run for, or 0
+        for no limit
+    """
+    with subprocess.Popen(cmd, start_new_session=True) as proc:
+        try:
+            return proc.wait(timeout=timeout or None)
+        except subprocess.TimeoutExpired:
+            kill_group(proc)
+            proc.wait()
+            raise ProcessTimeout("Error: %s timed out after %i sec" %
+                    (os.path.basename(cmd[0]), timeout), 'timeout')
+        except BaseException:
+            # e.g. KeyboardInterrupt, which the new session doesn't receive
+            kill_group(proc)
+            raise
+
+class Watchdog:
+    """Watchdog: Kills a set of processes which run for longer than a timeout,
+    or which stop producing output for longer than a stall timeout (e.g. a
+    YCSB client blocked on a wedged connection).
+
+    Processes register a kill function with add(), and each line of their
+    output is fed to the watchdog like any other parser. When used as a
+    context manager, the watchdog runs while the block runs, and a
+    ProcessTimeout is raised at the end of the block if it killed anything.
+    """
+    # Seconds between checks of the timeouts
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, name, timeout=0, stall_timeout=0):
+        """__init__
+
+        :param name: Name of the phase being watched, for error messages
+        :param timeout: Maximum number of seconds the processes may run for,
+            or 0 for no limit
+        :param stall_timeout: Maximum number of seconds between lines of
+            output, or 0 for no limit
+        """
+        self.name = name
+        self.timeout = timeout
+        self.stall_timeout = stall_timeout
+        self.reason = None
+        self.__kills = []
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__thread = None
+        self.__start = self.__last_output = time.monotonic()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        if self.reason is not None and exc[0] is None:
+            raise ProcessTimeout(self.message(), self.reason)
+
+    def message(self):
+        """message
+        Describes why the watchdog killed the processes
+        """
+        if self.reason == 'stall':
+            return "Error: %s produced no output for %i sec" % (self.name,
+                    self.stall_timeout)
+        return "Error: %s timed out after %i sec" % (self.name, self.timeout)
+
+    def add(self, kill):
+        """add
+        Registers a function which kills one of the watched processes. It is
+        called immediately if the watchdog has already fired.
+
+        :param kill: Function taking no arguments
+        """
+        with self.__lock:
+            self.__kills.append(kill)
+            fired = self.reason is not None
+        if fired:
+            kill()
+
+    def feed(self, line):
+        """feed
+        Records that a line of output was produced
+
+        :param line: Line of output
+        """
+        self.__last_output = time.monotonic()
+
+    def start(self):
+        """start
+        Starts watching the processes in a background thread, if any timeout
+        is set
+        """
+        self.__start = self.__last_output = time.monotonic()
+        if self.timeout > 0 or self.stall_timeout > 0:
+            self.__thread = threading.Thread(target=self.__watch, daemon=True)
+            self.__thread.start()
+
+    def stop(self):
+        """stop
+        Stops watching the processes
+        """
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def __watch(self):
+        """__watch
+        Fires once either timeout expires, unless stopped first
+        """
+        while not self.__stopped.wait(self.POLL_INTERVAL):
+            now = time.monotonic()
+            if self.timeout > 0 and now - self.__start > self.timeout:
+                self.fire('timeout')
+            elif self.stall_timeout > 0 and now - self.__last_output > self.stall_timeout:
+                self.fire('stall')
+            else:
+                continue
+            return
+
+    def fire(self, reason):
+        """fire
+        Kills every watched process
+
+        :param reason: 'timeout' or 'stall'
+        """
+        with self.__lock:
+            self.reason = reason
+            kills = list(self.__kills)
+        for kill in kills:
+            kill()
+
+class YcsbProcess:
+    """YcsbProcess: Runs a YCSB command, logging its stdout and stderr line by
+    line as they arrive, and feeding each line to a set of parsers.
+
+    Both streams are read concurrently (stderr in a background thread), so
+    that neither pipe can fill up and block the process. The command runs in
+    its own process group, so that a Watchdog can kill it along with any
+    processes it starts.
+    """
+    def __init__(self, cmd, log, *parsers, watchdog=None, sampler=None):
+        """__init__
+
+        :param cmd: List of shell arguments, including name of command as
+            first element
+        :param log: Function to which each line of output should be passed
+            for logging (e.g. DbSystem.raw_log)
+        :param *parsers: Objects with a feed(line) method (e.g. OutputParser,
+            StatusSeries) to which each line of output should be fed
+        :param watchdog: Watchdog which may kill the command, or None
+        :param sampler: ResourceSampler which should sample the command's
+            resource usage, or None
+        """
+        self.cmd = cmd
+        self.log = log
+        self.parsers = parsers if watchdog is None else parsers + (watchdog,)
+        self.watchdog = watchdog
+        self.sampler = sampler
+        self.returncode = None
+        # Serializes logging and parsing of lines from the two streams
+        self.__lock = threading.Lock()
+
+    def run(self):
+        """run
+        Runs the process to completion. Exceptions raised while logging or
+        parsing either stream (e.g. by a parser) are raised here.
+
+        Returns the exit code of the process
+        """
+        with subprocess.Popen(self.cmd, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, bufsize=1, universal_newlines=True,
+                encoding="utf-8", errors="replace",
+                start_new_session=True) as proc:
+            if self.watchdog is not None:
+                self.watchdog.add(lambda: kill_group(proc))
+            if self.sampler is not None:
+                self.sampler.add(proc.pid)
+            errors = []
+            try:
+                stderr = threading.Thread(target=self.__read_stderr,
+                        args=(proc, errors), daemon=True)
+                stderr.start()
+                self.__read(proc.stdout)
+                stderr.join()
+                if errors:
+                    raise errors[0]
+            except BaseException:
+                # e.g. KeyboardInterrupt, which the new session doesn't receive
+                kill_group(proc)
+                raise
+        self.returncode = proc.returncode
+        return self.returncode
+
+    def __read_stderr(self, proc, errors):
+        """__read_stderr
+        Target of the stderr thread: reads the process's stderr (see __read),
+        storing any exception raised in errors so that run() can raise it.
+        The process is killed on an exception, as its stderr would no longer
+        be read.
+
+        :param proc: Popen instance
+        :param errors: List to which an exception is appended
+        """
+        try:
+            self.__read(proc.stderr)
+        except BaseException as e:
+            errors.append(e)
+            kill_group(proc)
+
+    def __read(self, stream):
+        """__read
+        Logs and parses each line read from the given stream until EOF
+
+        :param stream: File object to read from
+        """
+        for line in stream:
+            line = line.rstrip("\n")
+            with self.__lock:
+                self.log(line)
+                for parser in self.parsers:
+                    parser.feed(line)
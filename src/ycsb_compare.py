@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Compares a candidate set of YCSB Runner results against a baseline, testing
+# each (DBMS, MPL) for a statistically significant change across trials, e.g.
+#   ycsb_compare.py baseline-output/ output/ --field throughput --field read_avg_latency
+# Each result set is an output directory (or the output_dir containing them),
+# or a results database (see the results_db option). Prints a JSON report, and
+# exits with status 1 if any point regressed by more than the threshold, had
+# fewer than 2 trials on either side, or is missing from one of the result
+# sets (unless --allow-missing is given).
+import sys
+import argparse
+
+from runner import compare
+
+parser = argparse.ArgumentParser(description="Compare YCSB Runner results")
+parser.add_argument("baseline", help="baseline output directory or results database")
+parser.add_argument("candidate", help="candidate output directory or results database")
+parser.add_argument("--field", action="append", dest="fields", metavar="FIELD",
+        help="stat to compare; may be repeated (default: throughput)")
+parser.add_argument("--test", choices=compare.TESTS, default="welch",
+        help="statistical test (default: welch)")
+parser.add_argument("--alpha", type=float, default=0.05,
+        help="significance level (default: 0.05)")
+parser.add_argument("--threshold", type=float, default=0.05,
+        help="relative change in the wrong direction which counts as a " +
+             "regression (default: 0.05)")
+parser.add_argument("--allow-missing", action="store_true",
+        help="don't fail when a DBMS or MPL is in only one result set")
+parser.add_argument("--report", metavar="FILE",
+        help="also write the JSON report to this file")
+args = parser.parse_args()
+fields = args.fields or ['throughput']
+for field in fields:
+    if not compare.valid_field(field):
+        parser.error("unknown field '%s': expected a statistic, e.g. " % field +
+                "throughput or read_avg_latency")
+
+report = compare.compare(compare.load(args.baseline),
+        compare.load(args.candidate), fields=fields,
+        test=args.test, alpha=args.alpha, threshold=args.threshold)
+output = compare.dumps(report)
+if args.report is not None:
+    with open(args.report, 'w') as f:
+        f.write(output + "\n")
+print(output)
+reasons = compare.gate(report, args.allow_missing)
+for reason in reasons:
+    print("Failed: %s" % reason, file=sys.stderr)
+sys.exit(1 if reasons else 0)
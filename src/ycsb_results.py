@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# Queries the results database written by YCSB Runner (see the results_db
+# option), e.g. the mean throughput of each of the last 30 runs of PostgreSQL
+# at MPL 16:
+#   ycsb_results.py results.sqlite throughput --db jdbc-postgres --mpl 16 --last 30
+import csv
+import sys
+import argparse
+
+from datetime import datetime
+
+from runner.results_db import ResultsDb, AGGREGATES, GROUPINGS
+
+parser = argparse.ArgumentParser(description="Query YCSB Runner results")
+parser.add_argument("database", help="results database file (results_db)")
+parser.add_argument("field", help="stat to aggregate, e.g. throughput")
+parser.add_argument("--how", choices=sorted(AGGREGATES), default="mean",
+        help="aggregation (default: mean)")
+parser.add_argument("--by", choices=sorted(GROUPINGS), default="run",
+        help="what to group rows by (default: run)")
+parser.add_argument("--db", help="only include this DBMS (name with label)")
+parser.add_argument("--workload", help="only include this workload file")
+parser.add_argument("--mpl", type=int, help="only include this MPL")
+parser.add_argument("--since", metavar="DATE",
+        help="only include runs since this ISO 8601 date")
+parser.add_argument("--last", type=int, metavar="N",
+        help="only include the last N runs")
+args = parser.parse_args()
+
+since = None
+if args.since is not None:
+    since = datetime.fromisoformat(args.since).timestamp()
+
+results = ResultsDb(args.database)
+try:
+    names, rows = results.query(args.field, how=args.how, by=args.by,
+            db=args.db, workload=args.workload, mpl=args.mpl, since=since,
+            last=args.last)
+finally:
+    results.close()
+
+writer = csv.writer(sys.stdout)
+writer.writerow(names)
+writer.writerows(rows)
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 import os
-import sys
+import argparse
 
 from runner import Runner
 
@@ -14,17 +14,25 @@ if os.path.exists(os.path.join(
 else:
     HOOKS = {}
 
-# Print usage info and exit
-def usage():
-    print("Usage: %s configfile" % sys.argv[0])
-    sys.exit(1)
-
 # Validate command-line args passed to script
-if len(sys.argv) < 2:
-    usage()
+parser = argparse.ArgumentParser(description="Run YCSB workloads")
+parser.add_argument("configfile", help="YCSB Runner configuration file")
+parser.add_argument("-p", "--parallel", metavar="WORKERS", type=int,
+        nargs="?", const=0, default=None,
+        help="run DBs on separate servers in parallel worker processes, " +
+             "using at most WORKERS workers (default: one per server)")
+parser.add_argument("-r", "--resume", metavar="OUTDIR",
+        help="resume an interrupted run from its output directory (or the " +
+             "output_dir containing it), skipping the runs already completed")
+parser.add_argument("-t", "--trace", metavar="FILE",
+        help="write a timeline of the campaign to FILE as Chrome trace-event " +
+             "JSON, which can be opened in Perfetto or chrome://tracing")
+args = parser.parse_args()
 
 # Read and parse the given config file, instantiate Runner, and run workloads
-ini_path = sys.argv[1]
-
-runner = Runner(ini_path, hooks=HOOKS)
+runner = Runner(args.configfile, hooks=HOOKS,
+        parallel=args.parallel is not None,
+        max_workers=args.parallel or None,
+        resume=args.resume,
+        trace_path=args.trace)
 runner.run()
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+# Worker agent which runs YCSB commands on behalf of a YCSB Runner
+# coordinator (see the workers option). Talks to the coordinator over
+# stdin/stdout when started over SSH, or over TCP with --listen HOST:PORT.
+from runner.worker import main
+
+main()
@@ -0,0 +1,182 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from .helpers import *
+
+import runner.constants as const
+from runner          import clients
+from runner.dbsystem import DbSystem
+from runner.stats    import Statistics
+from runner.status   import StatusSeries
+
+FOO_WORKLOAD = """
+recordcount=1000
+operationcount=10000
+workload=com.yahoo.ycsb.workloads.ClosedEconomyWorkload
+"""
+
+class ClientsTestCase(unittest.TestCase):
+    def test_split_evenly(self):
+        self.assertEqual(clients.split_evenly(10, 3), [4, 3, 3])
+        self.assertEqual(clients.split_evenly(2, 4), [1, 1])
+        self.assertEqual(clients.split_evenly(5, 0), [5])
+
+    def test_split_range(self):
+        self.assertEqual(clients.split_range(100, 10, 3), [(100, 4), (104, 3), (107, 3)])
+
+    def test_client_aggregate(self):
+        self.assertEqual(clients.client_aggregate('throughput'), ('sum', None))
+        self.assertEqual(clients.client_aggregate('read_avg_latency'),
+                ('wmean', 'read_operations'))
+        self.assertEqual(clients.client_aggregate('read_operations'), ('sum', None))
+        self.assertEqual(clients.client_aggregate('read_p99_latency'), ('max', None))
+        self.assertEqual(clients.client_aggregate('mpl'), ('first', None))
+
+    def test_combine_stats(self):
+        stats = clients.combine_stats([
+            Statistics(mpl=4, runtime=1000., throughput=100., opcount=100.,
+                read_operations=100., read_avg_latency=10., read_max_latency=50.,
+                client=1),
+            Statistics(mpl=4, runtime=2000., throughput=50., opcount=100.,
+                read_operations=300., read_avg_latency=20., read_max_latency=40.,
+                client=2),
+        ])
+        self.assertEqual(stats.mpl, 4)
+        self.assertEqual(stats.client, 0)
+        self.assertEqual(stats.runtime, 2000.)
+        self.assertEqual(stats.throughput, 150.)
+        self.assertEqual(stats.opcount, 200.)
+        self.assertEqual(stats.read_operations, 400.)
+        self.assertEqual(stats.read_avg_latency, 17.5)
+        self.assertEqual(stats.read_max_latency, 50.)
+
+    def test_combine_stats_anomaly_score(self):
+        # Each client reports the totals of the whole database
+        rows = [Statistics(totalcash=1000., countcash=1000., opcount=50., client=i)
+                for i in (1, 2)]
+        stats = clients.combine_stats(rows)
+        self.assertEqual(stats.totalcash, 1000.)
+        self.assertEqual(stats.countcash, 1000.)
+        self.assertEqual(stats.anomaly_score, 0.)
+        rows[1].countcash = 990.
+        rows[0].countcash = 990.
+        self.assertEqual(clients.combine_stats(rows).anomaly_score, 0.1)
+
+    def test_combine_series(self):
+        a, b = StatusSeries(), StatusSeries()
+        a.feed("10 sec: 100 operations; 10.0 current ops/sec; [READ AverageLatency(us)=10]")
+        a.feed("20 sec: 200 operations; 10.0 current ops/sec; [READ AverageLatency(us)=10]")
+        b.feed("11 sec: 300 operations; 30.0 current ops/sec; [READ AverageLatency(us)=30]")
+        series = clients.combine_series([a, b])
+        self.assertEqual(series.elapsed, [11])
+        self.assertEqual(series.operations, [400])
+        self.assertEqual(series.ops_per_sec, [40.])
+        self.assertEqual(series.latencies['READ'], [25.])
+        # Per-operation counts are summed
+        a, b = StatusSeries(), StatusSeries()
+        a.feed("10 sec: 100 operations; 10.0 current ops/sec; [READ: Count=100, Avg=10]")
+        b.feed("10 sec: 300 operations; 30.0 current ops/sec; [READ: Count=300, Avg=30]")
+        self.assertEqual(clients.combine_series([a, b]).counts, {'READ': [400]})
+
+class YcsbClientsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.__real_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        with open('foo', 'w') as wf:
+            wf.write(FOO_WORKLOAD)
+        const.SUPPORTED_DBS['clientdb'] = None
+        self.db = DbSystem('clientdb', {
+            'trials'      : 1,
+            'min_mpl'     : 1,
+            'max_mpl'     : 5,
+            'inc_mpl'     : 1,
+            'workload'    : 'foo',
+            'output'      : 'csv',
+            'output_dir'  : 'output',
+            'avgkey'      : 'mpl',
+            'avgfields'   : ['runtime'],
+            'plotkey'     : 'mpl',
+            'plotfields'  : ['runtime'],
+            'exportfields': ['runtime'],
+            'clients_per_run': 3,
+        })
+
+    def tearDown(self):
+        self.db.cleanup()
+        os.chdir(self.__real_cwd)
+        self.tempdir.cleanup()
+        del const.SUPPORTED_DBS['clientdb']
+
+    def test_commands(self):
+        cmds = clients.YcsbClients(self.db).commands(8)
+        self.assertEqual(len(cmds), 3)
+        self.assertEqual([c[c.index('-threads') + 1] for c in cmds], ['3', '3', '2'])
+        self.assertIn('operationcount=3334', cmds[0])
+        self.assertIn('insertstart=667', cmds[2])
+        self.assertIn('insertcount=333', cmds[2])
+        # Never more clients than threads
+        self.assertEqual(len(clients.YcsbClients(self.db).commands(2)), 2)
+        self.db.clients_per_run = 1
+        self.assertEqual(clients.YcsbClients(self.db).commands(8),
+                [self.db.cmd_ycsb_run(8)])
+
+    def test_commands_few_operations(self):
+        # No client may get operationcount=0, which YCSB treats as unlimited
+        self.db.workload_config['operationcount'] = '2'
+        cmds = clients.YcsbClients(self.db).commands(8)
+        self.assertEqual(len(cmds), 2)
+        self.assertEqual([c[c.index('-threads') + 1] for c in cmds], ['4', '4'])
+        self.assertEqual([c[c.index('-threads') + 3] for c in cmds],
+                ['operationcount=1', 'operationcount=1'])
+        self.assertIn('insertcount=500', cmds[1])
+        self.db.workload_config['operationcount'] = '1'
+        self.assertEqual(clients.YcsbClients(self.db).commands(8),
+                [self.db.cmd_ycsb_run(8)])
+
+    def test_commands_few_records(self):
+        # Clients' key ranges never overlap
+        self.db.workload_config['recordcount'] = '2'
+        cmds = clients.YcsbClients(self.db).commands(8)
+        self.assertEqual(len(cmds), 2)
+        self.assertIn('insertstart=0', cmds[0])
+        self.assertIn('insertstart=1', cmds[1])
+        self.assertEqual([c.count('insertcount=1') for c in cmds], [1, 1])
+        self.assertIn('operationcount=5000', cmds[0])
+
+    def test_run_error(self):
+        # Errors in the client threads aren't lost
+        real_path = os.environ['PATH']
+        os.environ['PATH'] = self.tempdir.name
+        try:
+            with self.assertRaises(FileNotFoundError):
+                clients.YcsbClients(self.db).run(8)
+        finally:
+            os.environ['PATH'] = real_path
+
+    def test_run_exit_code(self):
+        # One client (the last) exiting with an error fails the run
+        os.mkdir('bin')
+        with open(os.path.join('bin', 'ycsb'), 'w') as f:
+            f.write("#!%s\nimport sys\n" % sys.executable +
+                    "print('[OVERALL], Throughput(ops/sec), 1.0')\n" +
+                    "sys.exit(1 if 'insertstart=667' in sys.argv else 0)\n")
+        os.chmod(os.path.join('bin', 'ycsb'), 0o755)
+        real_path = os.environ['PATH']
+        os.environ['PATH'] = os.pathsep.join([os.path.abspath('bin'), real_path])
+        try:
+            with self.assertRaises(RuntimeError):
+                clients.YcsbClients(self.db).run(8)
+        finally:
+            os.environ['PATH'] = real_path
+
+        self.db.add_client_stats([Statistics(mpl=2, trial=1, client=c, runtime=1.)
+            for c in (1, 2)])
+        with open(self.db.makefpath("clients-{}-{}.csv")) as f:
+            self.assertEqual(f.read().splitlines(),
+                    ['trial,mpl,client,runtime', '1,2,1,1.0', '1,2,2,1.0'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+
+from .helpers import *
+
+from runner           import compare
+from runner.journal   import Journal
+from runner.stats     import Statistics, StatisticsSet
+
+def trials(mpl, *throughputs):
+    return [Statistics(mpl=mpl, trial=i + 1, throughput=t, runtime=1000. / t)
+            for i, t in enumerate(throughputs)]
+
+BASELINE = StatisticsSet(*(trials(1, 100., 101., 99., 100.5, 99.5) +
+        trials(2, 200., 202., 198., 201., 199.)))
+
+class CompareTestCase(unittest.TestCase):
+    def test_lower_is_better(self):
+        self.assertFalse(compare.lower_is_better('throughput'))
+        self.assertTrue(compare.lower_is_better('runtime'))
+        self.assertTrue(compare.lower_is_better('read_latency'))
+
+    def test_compare(self):
+        # MPL 1 drops by 10%, MPL 2 is unchanged
+        candidate = StatisticsSet(*(trials(1, 90., 91., 89., 90.5, 89.5) +
+                trials(2, 201., 199., 200., 202., 198.)))
+        for test in compare.TESTS:
+            report = compare.compare({'redis': BASELINE}, {'redis': candidate},
+                    fields=('throughput', 'runtime'), test=test)
+            self.assertEqual(len(report['points']), 4)
+            self.assertEqual(report['regressions'], 2)
+            bad = [(p['mpl'], p['field']) for p in report['points'] if p['regression']]
+            self.assertEqual(sorted(bad), [(1, 'runtime'), (1, 'throughput')])
+            json.loads(compare.dumps(report))
+        # A large threshold tolerates the drop
+        report = compare.compare({'redis': BASELINE}, {'redis': candidate},
+                threshold=0.2)
+        self.assertEqual(report['regressions'], 0)
+        # An improvement is never a regression
+        report = compare.compare({'redis': candidate}, {'redis': BASELINE})
+        self.assertEqual((report['regressions'], report['improvements']), (0, 1))
+        with self.assertRaises(ValueError):
+            compare.compare({}, {}, test='foo')
+        with self.assertRaises(ValueError):
+            compare.compare({'redis': BASELINE}, {'redis': candidate},
+                    fields=('foo',))
+
+    def test_valid_field(self):
+        for field in ('throughput', 'anomaly_score', 'read_avg_latency',
+                'tx_readmodifywrite_p99_latency'):
+            self.assertTrue(compare.valid_field(field))
+        self.assertFalse(compare.valid_field('foo'))
+        self.assertFalse(compare.valid_field('read_foo'))
+
+    def test_cli_unknown_field(self):
+        # An unknown field is a usage error, not a traceback
+        script = os.path.join(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))), 'src', 'ycsb_compare.py')
+        proc = subprocess.run([sys.executable, script, 'baseline', 'candidate',
+            '--field', 'foo'], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn(b"unknown field 'foo'", proc.stderr)
+        self.assertNotIn(b"Traceback", proc.stderr)
+
+    def test_compare_missing(self):
+        report = compare.compare({'redis': BASELINE}, {'mongodb': BASELINE})
+        self.assertEqual(report['points'], [])
+        self.assertEqual(report['missing'], ['mongodb', 'redis'])
+        # Nothing was compared, so even allowing missing DBMSes fails
+        self.assertEqual(len(compare.gate(report)), 2)
+        self.assertEqual(compare.gate(report, allow_missing=True),
+                ["no points in common"])
+        # MPLs run on only one side are missing too
+        candidate = StatisticsSet(*trials(1, 100., 101., 99., 100.5, 99.5))
+        report = compare.compare({'redis': BASELINE}, {'redis': candidate})
+        self.assertEqual(report['missing'], ['redis:2'])
+        self.assertEqual(len(compare.gate(report)), 1)
+        self.assertEqual(compare.gate(report, allow_missing=True), [])
+
+    def test_compare_insufficient(self):
+        # A single trial per side can't show a significant change, so it
+        # must fail the gate rather than pass it silently
+        candidate = StatisticsSet(*(trials(1, 50.) + trials(2, 201.)))
+        for test in compare.TESTS:
+            report = compare.compare({'redis': BASELINE}, {'redis': candidate},
+                    test=test)
+            self.assertEqual(report['insufficient'], 2)
+            self.assertEqual(report['regressions'], 0)
+            self.assertTrue(all(p['insufficient'] and p['p_value'] is None
+                for p in report['points']))
+            self.assertEqual(len(compare.gate(report)), 1)
+        report = compare.compare({'redis': BASELINE}, {'redis': BASELINE})
+        self.assertEqual(report['insufficient'], 0)
+        self.assertEqual(compare.gate(report), [])
+
+    def test_load_outdir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            old = os.path.join(tmp, "2016-01-01T00:00:00.000000-redis")
+            new = os.path.join(tmp, "2016-01-02T00:00:00.000000-redis")
+            csvdir = os.path.join(tmp, "2016-01-01T00:00:00.000000-mongodb")
+            for path in (old, new, csvdir):
+                os.mkdir(path)
+            journal = Journal(os.path.join(new, "journal-foo.json"))
+            for stats in BASELINE.items():
+                journal.record(stats.trial, stats.mpl, stats)
+            with open(os.path.join(csvdir, "output-foo.csv"), 'w') as f:
+                f.write("mpl,throughput,anomaly_score\n1,10.0,0.0\n1,12.0,0.0\n")
+            sets = compare.load(tmp)
+            self.assertEqual(sorted(sets), ['mongodb', 'redis'])
+            self.assertEqual(len(sets['redis']), len(BASELINE))
+            self.assertEqual(sets['mongodb'].average('throughput'), 11.)
+            # A single DBMS's output directory
+            self.assertEqual(sorted(compare.load(new)), ['redis'])
+            with self.assertRaises(IOError):
+                compare.load(os.path.join(tmp, 'foo'))
@@ -0,0 +1,139 @@
+import os
+import sys
+import stat
+import tempfile
+import threading
+import unittest
+
+from .helpers import *
+
+import runner.constants as const
+from runner.clients     import YcsbClients
+from runner.coordinator import Coordinator
+from runner.dbsystem    import DbSystem
+from runner.output_parser import OutputParser
+from runner.transport   import (LocalTransport, SshTransport, TcpTransport,
+        make_transport)
+from runner.worker      import TcpWorkerServer
+from runner.ycsb_process import Watchdog, ProcessTimeout
+
+FOO_WORKLOAD = """
+recordcount=1000
+operationcount=10000
+workload=com.yahoo.ycsb.workloads.ClosedEconomyWorkload
+"""
+
+# Stands in for the ycsb command: checks that the workload file was shipped,
+# and reports the number of threads as its throughput
+FAKE_YCSB = """#!%s
+import sys
+args = sys.argv[1:]
+with open(args[args.index('-P') + 1]) as f:
+    assert 'recordcount=1000' in f.read()
+print("10 sec: 10 operations; 1.0 current ops/sec;", file=sys.stderr)
+print("[OVERALL], RunTime(ms), 1000")
+print("[OVERALL], Throughput(ops/sec), %%s" %% args[args.index('-threads') + 1])
+"""
+
+# Stands in for a ycsb command which hangs after its first status report
+HANG_YCSB = """#!%s
+import sys, time
+print("10 sec: 10 operations; 1.0 current ops/sec;", file=sys.stderr, flush=True)
+time.sleep(60)
+"""
+
+class TransportTestCase(unittest.TestCase):
+    def test_make_transport(self):
+        self.assertIsInstance(make_transport('local'), LocalTransport)
+        ssh = make_transport('ssh://ycsb@client1', 'agent --flag')
+        self.assertIsInstance(ssh, SshTransport)
+        self.assertEqual(ssh.cmd, ['ssh', '-T', 'ycsb@client1', 'agent', '--flag'])
+        tcp = make_transport('tcp://client2:7000')
+        self.assertIsInstance(tcp, TcpTransport)
+        self.assertEqual((tcp.host, tcp.port), ('client2', 7000))
+        for url in ('foo', 'tcp://client2', 'ssh://'):
+            with self.assertRaises(ValueError):
+                make_transport(url)
+
+class CoordinatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.__real_cwd = os.getcwd()
+        self.__real_path = os.environ['PATH']
+        self.__real_stdout = sys.stdout
+        os.chdir(self.tempdir.name)
+        with open('foo', 'w') as wf:
+            wf.write(FOO_WORKLOAD)
+        # Workers run the fake ycsb from the PATH they inherit
+        os.mkdir('bin')
+        with open(os.path.join('bin', 'ycsb'), 'w') as f:
+            f.write(FAKE_YCSB % sys.executable)
+        os.chmod(os.path.join('bin', 'ycsb'), stat.S_IRWXU)
+        os.environ['PATH'] = os.pathsep.join([os.path.abspath('bin'), self.__real_path])
+        self.server = TcpWorkerServer(('127.0.0.1', 0))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        const.SUPPORTED_DBS['workerdb'] = None
+        self.db = DbSystem('workerdb', {
+            'trials'      : 1,
+            'min_mpl'     : 1,
+            'max_mpl'     : 5,
+            'inc_mpl'     : 1,
+            'workload'    : 'foo',
+            'output'      : 'csv',
+            'output_dir'  : 'output',
+            'avgkey'      : 'mpl',
+            'avgfields'   : ['runtime'],
+            'plotkey'     : 'mpl',
+            'plotfields'  : ['runtime'],
+            'workers'     : ['local', 'tcp://127.0.0.1:%i' % self.server.server_address[1]],
+        })
+        sys.stdout = open(os.devnull, 'w')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.db.cleanup()
+        sys.stdout.close()
+        sys.stdout = self.__real_stdout
+        os.environ['PATH'] = self.__real_path
+        os.chdir(self.__real_cwd)
+        self.tempdir.cleanup()
+        del const.SUPPORTED_DBS['workerdb']
+
+    def test_run(self):
+        rows, series = YcsbClients(self.db).run(5)
+        # One client per worker, with the threads split between them
+        self.assertEqual([row.throughput for row in rows], [3., 2.])
+        self.assertEqual([row.client for row in rows], [1, 2])
+        self.assertEqual([len(s) for s in series], [1, 1])
+
+    def test_refused(self):
+        parsers = [(OutputParser(),)]
+        with self.assertRaises(RuntimeError):
+            Coordinator(self.db.workers, self.db.worker_command).run(
+                    [['rm', '-rf', 'bin']], [], lambda line: None, parsers)
+        self.assertTrue(os.path.exists('bin'))
+
+    def test_kill(self):
+        os.mkdir('hang')
+        with open(os.path.join('hang', 'ycsb'), 'w') as f:
+            f.write(HANG_YCSB % sys.executable)
+        os.chmod(os.path.join('hang', 'ycsb'), stat.S_IRWXU)
+        cmd = [os.path.abspath(os.path.join('hang', 'ycsb'))]
+        parsers = [(OutputParser(),), (OutputParser(),)]
+        lines = []
+        with self.assertRaises(ProcessTimeout):
+            with Watchdog("hang", stall_timeout=1) as watchdog:
+                codes = Coordinator(self.db.workers, self.db.worker_command).run(
+                        [cmd, cmd], [], lines.append, parsers, watchdog)
+        # Each worker killed its command, and reported its exit
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(all(code < 0 for code in codes))
+
+    def test_invalid_worker(self):
+        config = dict(self.db.config, workers=['foo'])
+        with self.assertRaises(ValueError):
+            DbSystem('workerdb', config)
+
+if __name__ == '__main__':
+    unittest.main()
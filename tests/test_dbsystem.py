@@ -126,6 +126,77 @@ class DbSystemTestCase(unittest.TestCase):
         self.db.export_stats()
         self.assertTrue(len(os.listdir(self.db.outdirpath)) == 2)
 
+    def test_export_stats_incremental(self):
+        self.db.output_plots = False
+        self.db.export_mode = 'incremental'
+        self.db.aggregate_every = const.EXPORT_TRIAL
+        self.db.stats.addstats(Statistics(mpl=1, runtime=3.))
+        self.assertTrue(self.db.export_stats(const.EXPORT_MPL))
+        # Only the raw output is written at each MPL
+        self.assertEqual(len(os.listdir(self.db.outdirpath)), 1)
+        self.db.stats.addstats(Statistics(mpl=2, runtime=6.))
+        self.db.export_stats(const.EXPORT_MPL)
+        with open(self.db.makefpath("output-{}-{}.csv")) as f:
+            self.assertEqual(f.read().splitlines(), ['runtime', '3.0', '6.0'])
+        self.assertTrue(self.db.export_stats(const.EXPORT_TRIAL))
+        self.assertEqual(len(os.listdir(self.db.outdirpath)), 2)
+        self.assertFalse(self.db.export_stats(const.EXPORT_DB))
+
+    def test_export_mode_invalid(self):
+        config = dict(self.db.config, export_mode='foo')
+        with self.assertRaises(ValueError):
+            DbSystem(self.dbname, config)
+
+    def test_make_mpl_strategy(self):
+        self.assertEqual(list(self.db.make_mpl_strategy()), [1, 2, 3, 4, 5])
+        self.db.mpl_strategy = 'adaptive'
+        strategy = self.db.make_mpl_strategy()
+        for mpl in strategy:
+            strategy.record(mpl, float(mpl))
+        self.assertEqual(strategy.points[-1], 5)
+        # Later trials replay the visited MPLs
+        self.db.record_mpl_points(strategy.visited)
+        self.assertEqual(list(self.db.make_mpl_strategy()), strategy.points)
+        with open(self.db.makefpath("mpl-points-{}-{}.csv")) as f:
+            self.assertEqual(f.readline(), "mpl,throughput\n")
+        config = dict(self.db.config, mpl_strategy='foo')
+        with self.assertRaises(ValueError):
+            DbSystem(self.dbname, config)
+
+    def test_ci_converged(self):
+        self.db.ci_target = 0.03
+        self.db.stats.addstats(*[Statistics(mpl=m, throughput=t)
+            for m, t in ((1, 100.), (1, 101.), (1, 100.5), (2, 100.), (2, 150.))])
+        self.assertEqual(self.db.ci_converged(), {1: True, 2: False})
+        config = dict(self.db.config, ci_confidence=1.5)
+        with self.assertRaises(ValueError):
+            DbSystem(self.dbname, config)
+
+    def test_completed_stats(self):
+        self.db.stats.addstats(Statistics(mpl=1, runtime=3.))
+        self.assertIs(self.db.completed_stats, self.db.stats)
+        self.db.stats.addstats(Statistics(mpl=1, failed=1, timeouts=3))
+        self.assertEqual(len(self.db.completed_stats), 1)
+        self.assertEqual(self.db.completed_stats.average('runtime'), 3.)
+        config = dict(self.db.config, stall_timeout=-1)
+        with self.assertRaises(ValueError):
+            DbSystem(self.dbname, config)
+
+    def test_resume(self):
+        self.db.journal.record(1, 1, Statistics(mpl=1, trial=1))
+        outdir = self.db.outdirpath
+        db = DbSystem(self.dbname, dict(self.db.config))
+        self.assertFalse(db.resume(os.path.join(outdir, 'foo')))
+        db.cleanup()
+        # Either the DB's output dir or the output_dir containing it
+        for path in (outdir, self.db.output_dir):
+            db = DbSystem(self.dbname, dict(self.db.config))
+            self.assertTrue(db.resume(path))
+            self.assertEqual(db.outdirpath, outdir)
+            self.assertEqual(db.makefpath("log-{}-{}"), self.db.makefpath("log-{}-{}"))
+            self.assertIsNotNone(db.journal.completed(1, 1))
+            db.cleanup()
+
     def test_export_stats_and_plots(self):
         self.db.stats.addstats(Statistics(mpl=1, runtime=5.),
                 Statistics(mpl=2, runtime=8.))
@@ -177,3 +248,12 @@ class DbSystemTestCase(unittest.TestCase):
         path = self.db.makefpath("test-file-{}-{}")
         self.assertTrue(os.path.basename(path).startswith("test-file-"))
         self.assertEqual(os.path.dirname(path), self.db.outdirpath)
+
+    def test_target_hosts(self):
+        self.assertEqual(self.db.target_hosts, frozenset(['localhost']))
+        self.db.dbname = 'jdbc-postgres'
+        self.db.workload_config['db.url'] = 'jdbc:postgresql://DBHOST:5432/ycsb'
+        self.assertEqual(self.db.target_hosts, frozenset(['dbhost']))
+        self.db.dbname = 'cassandra-10'
+        self.db.workload_config['hosts'] = 'host1, host2'
+        self.assertEqual(self.db.target_hosts, frozenset(['host1', 'host2']))
@@ -1,12 +1,14 @@
 import os
+import sys
 import tempfile
 import unittest
+import subprocess
 from time import time
 
 from .helpers import *
 
 import runner.constants as const
-from runner.exporter     import Exporter
+from runner.exporter     import Exporter, get_exporter, has_exporter, supported_outputs
 from runner.csv_exporter import CsvExporter
 from runner.stats        import Statistics, StatisticsSet
 
@@ -21,11 +23,33 @@ class ExporterTestCase(unittest.TestCase):
     def test_export_methods(self):
         with self.assertRaises(NotImplementedError):
             self.exp.export('foobar', 'foobar', 'foobar')
+        with self.assertRaises(NotImplementedError):
+            self.exp.export_row('foobar', Statistics(), 'foobar')
         with self.assertRaises(NotImplementedError):
             self.exp.export_averages('foobar', 'foobar', 'foobar')
         with self.assertRaises(NotImplementedError):
             self.exp.export_averages_plot('foobar', 'foobar', 'foobar')
 
+class ExporterRegistryTestCase(unittest.TestCase):
+    def test_get_exporter(self):
+        self.assertIs(get_exporter('csv'), CsvExporter)
+        with self.assertRaises(ValueError):
+            get_exporter(noattr(self))
+
+    def test_has_exporter(self):
+        self.assertTrue(has_exporter('csv'))
+        self.assertFalse(has_exporter(noattr(self)))
+        self.assertIn('csv', supported_outputs())
+
+    def test_lazy_import(self):
+        # Importing runner mustn't import pandas or matplotlib
+        code = ("import sys, runner; " +
+                "print(','.join(m for m in ('pandas', 'matplotlib', 'runner.csv_exporter') " +
+                "if m in sys.modules))")
+        out = subprocess.check_output([sys.executable, '-c', code],
+                env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+        self.assertEqual(out.decode('utf-8').strip(), '')
+
 class CsvExporterTestCase(unittest.TestCase):
     def setUp(self):
         self.ss = StatisticsSet(Statistics(), Statistics())
@@ -43,6 +67,22 @@ class CsvExporterTestCase(unittest.TestCase):
             self.assertTrue(os.path.exists(fname + CsvExporter.FILE_EXT))
             self.assertTrue(os.stat(fname + CsvExporter.FILE_EXT).st_size > 0)
 
+    def test_export_row(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            fname = os.path.join(tmpdirname, 'export')
+            self.exp.export_row(fname, Statistics(mpl=1, runtime=2.), 'mpl', 'runtime')
+            self.exp.export_row(fname, Statistics(mpl=2, runtime=3.), 'mpl', 'runtime')
+            with open(fname + CsvExporter.FILE_EXT) as f:
+                self.assertEqual(f.read().splitlines(),
+                        ['mpl,runtime', '1,2.0', '2,3.0'])
+            # Appending rows gives the same output as a full export
+            full = os.path.join(tmpdirname, 'full')
+            CsvExporter(StatisticsSet(Statistics(mpl=1, runtime=2.),
+                Statistics(mpl=2, runtime=3.))).export(full, 'mpl', 'mpl', 'runtime')
+            with open(full + CsvExporter.FILE_EXT) as f:
+                self.assertEqual(f.read().splitlines(),
+                        ['mpl,runtime', '1,2.0', '2,3.0'])
+
     def test_export_averages(self):
         with tempfile.TemporaryDirectory() as tmpdirname:
             fname = os.path.join(tmpdirname, 'averages')
@@ -51,6 +91,20 @@ class CsvExporterTestCase(unittest.TestCase):
             self.assertTrue(os.path.exists(fname + CsvExporter.FILE_EXT))
             self.assertTrue(os.stat(fname + CsvExporter.FILE_EXT).st_size > 0)
 
+    def test_export_averages_ci(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            fname = os.path.join(tmpdirname, 'averages')
+            CsvExporter(StatisticsSet(*[Statistics(mpl=m, throughput=t)
+                for m in (1, 2) for t in (90., 100., 110.)])).export_averages(
+                        fname, 'mpl', 'throughput', ci_field='throughput')
+            with open(fname + CsvExporter.FILE_EXT) as f:
+                header, row = f.read().splitlines()[:2]
+            self.assertEqual(header.split(','), ['mpl', 'throughput',
+                'throughput_ci', 'throughput_rel_ci', 'trials'])
+            # t(0.975, 2) * 10 / sqrt(3) = 24.84
+            self.assertAlmostEqual(float(row.split(',')[2]), 24.8413, places=3)
+            self.assertEqual(row.split(',')[-1], '3')
+
     def test_export_averages_plot(self):
         with tempfile.TemporaryDirectory() as tmpdirname:
             fname = os.path.join(tmpdirname, 'plot')
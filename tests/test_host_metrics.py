@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from .helpers import *
+
+import runner.constants as const
+from runner import host_metrics
+from runner.host_metrics import HostMetrics
+
+STAT = "cpu  %i 10 %i 1000 %i 5 5 0 0 0\ncpu0 1 2 3 4 5 6 7 8 0 0\n"
+
+DISKSTATS = """   8       0 sda %i 0 %i 0 %i 0 %i 0 0 0 0
+   8       1 sda1 100 0 800 0 100 0 800 0 0 0 0
+   7       0 loop0 50 0 400 0 0 0 0 0 0 0 0
+"""
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 9999 10 0 0 0 0 0 0 9999 10 0 0 0 0 0 0
+  eth0: %i 10 0 0 0 0 0 0 %i 10 0 0 0 0 0 0
+"""
+
+MEMINFO = "MemTotal:       1000 kB\nMemFree:         100 kB\nMemAvailable:    400 kB\n"
+
+class HostMetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.__real_proc = host_metrics.PROC
+        self.__real_sys_block = host_metrics.SYS_BLOCK
+        host_metrics.PROC = self.tempdir.name
+        host_metrics.SYS_BLOCK = os.path.join(self.tempdir.name, "block")
+        for path in ("net", "block", "block/sda", "block/loop0"):
+            os.mkdir(os.path.join(self.tempdir.name, path))
+        self.write("meminfo", MEMINFO)
+        self.write("loadavg", "1.50 1.00 0.50 2/100 1234\n")
+
+    def tearDown(self):
+        host_metrics.PROC = self.__real_proc
+        host_metrics.SYS_BLOCK = self.__real_sys_block
+        self.tempdir.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.tempdir.name, name), 'w') as f:
+            f.write(content)
+
+    def write_counters(self, user, system, iowait, reads, writes, rx, tx):
+        self.write("stat", STAT % (user, system, iowait))
+        self.write("diskstats", DISKSTATS % (reads, reads * 8, writes, writes * 8))
+        self.write(os.path.join("net", "dev"), NET_DEV % (rx, tx))
+
+    def test_deltas(self):
+        self.write_counters(100, 50, 10, 1000, 2000, 5000, 6000)
+        before = host_metrics.snapshot()
+        self.write_counters(400, 150, 110, 1500, 4000, 7000, 10000)
+        after = host_metrics.snapshot()
+        after['time'] = before['time'] + 2.
+        metrics = host_metrics.deltas(before, after)
+        self.assertEqual(sorted(metrics), sorted(const.HOST_METRICS))
+        # 500 ticks in total, 300 of them user time
+        self.assertEqual(metrics['cpu_user'], 60.)
+        self.assertEqual(metrics['cpu_sys'], 20.)
+        self.assertEqual(metrics['cpu_iowait'], 20.)
+        # Partitions and loop devices aren't counted
+        self.assertEqual(metrics['disk_read_iops'], 250.)
+        self.assertEqual(metrics['disk_write_iops'], 1000.)
+        self.assertEqual(metrics['disk_read_bytes'], 500 * 8 * 512.)
+        self.assertEqual(metrics['net_rx_bytes'], 2000.)
+        self.assertEqual(metrics['net_tx_bytes'], 4000.)
+        self.assertEqual(metrics['mem_used'], 600 * 1024.)
+        self.assertEqual(metrics['loadavg'], 1.5)
+
+    def test_host_metrics(self):
+        self.write_counters(100, 50, 10, 1000, 2000, 5000, 6000)
+        with HostMetrics() as host:
+            self.write_counters(100, 50, 10, 1000, 2000, 5000, 6000)
+        stats = host.stats('load_host_')
+        self.assertEqual(stats['load_host_cpu_user'], 0.)
+        self.assertTrue(all(k in const.TRACKED_STATS for k in stats))
+        with HostMetrics(enabled=False) as host:
+            pass
+        self.assertEqual(host.stats(), {})
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from .helpers import *
+
+from runner.journal import Journal, atomic_write
+from runner.stats   import Statistics
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'journal.json')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_atomic_write(self):
+        atomic_write(self.path, 'foo')
+        atomic_write(self.path, 'bar')
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'bar')
+        # No temporary files are left behind
+        self.assertEqual(os.listdir(self.tempdir.name), ['journal.json'])
+
+    def test_atomic_write_error(self):
+        atomic_write(self.path, 'foo')
+        with self.assertRaises(TypeError):
+            atomic_write(self.path, weirdtype())
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'foo')
+        self.assertEqual(os.listdir(self.tempdir.name), ['journal.json'])
+
+    def test_record(self):
+        journal = Journal(self.path)
+        self.assertEqual(len(journal), 0)
+        self.assertFalse(os.path.exists(self.path))
+        journal.record(1, 4, Statistics(mpl=4, trial=1, runtime=2.5,
+            read_p99_latency=10.))
+        journal.state['mpl_points'] = [1, 4]
+        journal.write()
+        # A new journal picks up the runs recorded so far
+        journal = Journal(self.path)
+        self.assertEqual(len(journal), 1)
+        self.assertFalse(journal.finished)
+        self.assertEqual(journal.state, {'mpl_points': [1, 4]})
+        self.assertIsNone(journal.completed(1, 1))
+        stats = journal.completed(1, 4)
+        self.assertEqual((stats.mpl, stats.runtime, stats.read_p99_latency),
+                (4, 2.5, 10.))
+        self.assertEqual(len(journal.statistics()), 1)
+        journal.finish()
+        self.assertTrue(Journal(self.path).finished)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import stat
+import tempfile
+import unittest
+
+from .helpers import *
+
+import runner.constants as const
+from runner.dbsystem import DbSystem
+from runner.loader   import YcsbLoader
+
+FOO_WORKLOAD = """
+recordcount=1000
+operationcount=100000
+workload=com.yahoo.ycsb.workloads.ClosedEconomyWorkload
+"""
+
+# Stands in for the ycsb command: reports inserting insertcount records, or
+# the workload's recordcount if insertcount isn't given (or 1 less if the
+# records should go missing)
+FAKE_YCSB = """#!%s
+import sys
+args = sys.argv[1:]
+count = 1000
+for i, arg in enumerate(args):
+    if arg.startswith('insertcount='):
+        count = int(arg.split('=')[1])
+print(' '.join(args))
+print("[INSERT], Operations, %%i" %% (count - %i))
+"""
+
+class YcsbLoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.__real_cwd = os.getcwd()
+        self.__real_path = os.environ['PATH']
+        self.__real_stdout = sys.stdout
+        os.chdir(self.tempdir.name)
+        with open('foo', 'w') as wf:
+            wf.write(FOO_WORKLOAD)
+        os.mkdir('bin')
+        os.environ['PATH'] = os.pathsep.join([os.path.abspath('bin'), self.__real_path])
+        self.fake_ycsb(0)
+        const.SUPPORTED_DBS['loaddb'] = None
+        self.db = DbSystem('loaddb', {
+            'trials'      : 1,
+            'min_mpl'     : 1,
+            'max_mpl'     : 5,
+            'inc_mpl'     : 1,
+            'workload'    : 'foo',
+            'output'      : 'csv',
+            'output_dir'  : 'output',
+            'avgkey'      : 'mpl',
+            'avgfields'   : ['runtime'],
+            'plotkey'     : 'mpl',
+            'plotfields'  : ['runtime'],
+            'load_threads': 4,
+            'load_processes': 3,
+        })
+        sys.stdout = open(os.devnull, 'w')
+
+    def tearDown(self):
+        self.db.cleanup()
+        sys.stdout.close()
+        sys.stdout = self.__real_stdout
+        os.environ['PATH'] = self.__real_path
+        os.chdir(self.__real_cwd)
+        self.tempdir.cleanup()
+        del const.SUPPORTED_DBS['loaddb']
+
+    def fake_ycsb(self, missing):
+        path = os.path.join('bin', 'ycsb')
+        with open(path, 'w') as f:
+            f.write(FAKE_YCSB % (sys.executable, missing))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+    def test_shards(self):
+        loader = YcsbLoader(self.db)
+        self.assertEqual(loader.shards(), [(0, 334), (334, 333), (667, 333)])
+        self.assertEqual(loader.expected(), 1000)
+        self.db.workload_config['insertstart'] = '500'
+        self.assertEqual(loader.shards(), [(500, 167), (667, 167), (834, 166)])
+        self.assertEqual(loader.expected(), 500)
+        self.db.load_processes = 1
+        self.assertEqual(loader.shards(), [(None, None)])
+
+    def test_cmd_ycsb_load(self):
+        cmd = self.db.cmd_ycsb_load(10, 20)
+        self.assertEqual(cmd[cmd.index('-threads') + 1], '4')
+        self.assertIn('insertstart=10', cmd)
+        self.assertIn('insertcount=20', cmd)
+        self.assertNotIn('-p', self.db.cmd_ycsb_load())
+
+    def test_run(self):
+        stats = YcsbLoader(self.db).run()
+        self.assertGreater(stats['load_runtime'], 0)
+        self.assertGreater(stats['load_throughput'], 0)
+        self.db.load_processes = 1
+        YcsbLoader(self.db).run()
+        # Each process reports inserting one record fewer than it should
+        self.fake_ycsb(1)
+        # A single process may have retried inserts, so only warns
+        YcsbLoader(self.db).run()
+        with open(self.db.makefpath("log-{}-{}.log")) as f:
+            self.assertIn("Warning: ycsb load inserted 999 of 1000", f.read())
+        self.db.load_processes = 3
+        with self.assertRaises(RuntimeError):
+            YcsbLoader(self.db).run()
+
+    def test_run_error(self):
+        # Errors in the load threads aren't lost
+        os.remove(os.path.join('bin', 'ycsb'))
+        os.environ['PATH'] = os.path.abspath('bin')
+        with self.assertRaises(FileNotFoundError):
+            YcsbLoader(self.db).run()
+
+    def test_run_exit_code(self):
+        # A load process which exits with an error fails the load, even if
+        # it reported inserting every record
+        with open(os.path.join('bin', 'ycsb'), 'a') as f:
+            f.write("sys.exit(1)\n")
+        self.db.load_processes = 1
+        with self.assertRaises(RuntimeError):
+            YcsbLoader(self.db).run()
+
+if __name__ == '__main__':
+    unittest.main()
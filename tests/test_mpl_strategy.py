@@ -0,0 +1,56 @@
+import math
+import unittest
+
+from .helpers import *
+
+from runner.mpl_strategy import (LinearMplStrategy, FixedMplStrategy,
+        AdaptiveMplStrategy)
+
+def knee(peak):
+    """knee
+    Returns a throughput curve over MPL which peaks at the given MPL
+    """
+    return lambda mpl: 1000. * math.exp(-(math.log(mpl / peak) ** 2) / 2)
+
+def explore(strategy, curve):
+    """explore
+    Runs the given strategy to completion against the given throughput curve,
+    and returns the MPLs it visited
+    """
+    for mpl in strategy:
+        strategy.record(mpl, curve(mpl))
+    return strategy.points
+
+class MplStrategyTestCase(unittest.TestCase):
+    def test_linear(self):
+        self.assertEqual(list(LinearMplStrategy(1, 25, 4)), [1, 5, 9, 13, 17, 21, 25])
+        self.assertEqual(list(LinearMplStrategy(2, 1, 1)), [])
+
+    def test_fixed(self):
+        strategy = FixedMplStrategy([1, 4, 2])
+        self.assertEqual(explore(strategy, float), [1, 4, 2])
+        self.assertEqual(strategy.visited, [(1, 1.), (4, 4.), (2, 2.)])
+
+    def test_adaptive_finds_knee(self):
+        for peak in (8, 32, 100):
+            points = explore(AdaptiveMplStrategy(1, 256), knee(peak))
+            # Far fewer runs than the 256 of a linear sweep
+            self.assertLessEqual(len(points), 16)
+            self.assertEqual(len(points), len(set(points)))
+            best = max(points, key=knee(peak))
+            self.assertLessEqual(abs(best - peak), max(1, 0.1 * peak))
+
+    def test_adaptive_respects_max_mpl(self):
+        # Throughput keeps rising, so the search should stop at max_mpl
+        points = explore(AdaptiveMplStrategy(1, 100), float)
+        self.assertIn(100, points)
+        self.assertLessEqual(max(points), 100)
+        self.assertEqual(max(explore(AdaptiveMplStrategy(3, 3), float)), 3)
+
+    def test_adaptive_drop_at_start(self):
+        # Throughput is highest at min_mpl
+        points = explore(AdaptiveMplStrategy(1, 256), lambda mpl: 1. / mpl)
+        self.assertEqual(points, [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from .helpers import *
+
+import runner.constants as const
+from runner.output_parser import OutputParser, op_stat_name
+from runner.stats         import Statistics
+
+YCSB_OUTPUT = """YCSB Client 0.1
+Command line: -db com.yahoo.ycsb.db.RedisClient -P workload -s -threads 4
+[TOTAL CASH], 10000000
+[COUNTED CASH], 9999000
+[ACTUAL OPERATIONS], 100000
+[OVERALL], RunTime(ms), 12345.0
+[OVERALL], Throughput(ops/sec), 8100.445524503847
+[READ], Operations, 90000
+[READ], AverageLatency(us), 401.5
+[TX-READMODIFYWRITE], Operations, 10000
+[TX-READMODIFYWRITE], AverageLatency(us), 812.25
+[OVERALL], RunTime(ms), 99999.0
+"""
+
+class OutputParserTestCase(unittest.TestCase):
+    def setUp(self):
+        self.parser = OutputParser()
+
+    def test_empty(self):
+        stats = self.parser.stats()
+        self.assertIsInstance(stats, Statistics)
+        for k, v in const.TRACKED_STATS.items():
+            self.assertEqual(stats[k], v())
+
+    def test_feed(self):
+        for line in YCSB_OUTPUT.splitlines():
+            self.parser.feed(line)
+        stats = self.parser.stats()
+        self.assertEqual(stats.totalcash, 10000000.)
+        self.assertEqual(stats.countcash, 9999000.)
+        self.assertEqual(stats.opcount, 100000.)
+        # Only the first value found is kept
+        self.assertEqual(stats.runtime, 12345.)
+        self.assertEqual(stats.throughput, 8100.445524503847)
+        self.assertEqual(stats.latency_tx_rmw, 812.25)
+
+    def test_partial(self):
+        # Stats seen before the output stops are still available
+        for line in YCSB_OUTPUT.splitlines()[:6]:
+            self.parser.feed(line)
+        stats = self.parser.stats()
+        self.assertEqual(stats.runtime, 12345.)
+        self.assertEqual(stats.throughput, 0.)
+
+    def test_values(self):
+        for line in YCSB_OUTPUT.splitlines():
+            self.parser.feed(line)
+        self.parser.feed("[READ], 0, 1234")
+        self.parser.feed("[READ], >1000, 3")
+        self.parser.feed("[UPDATE], Return=0, 5")
+        self.parser.feed("[BROKEN, Metric, 5")
+        self.parser.feed("[BROKEN], Metric, notanumber")
+        self.assertEqual(self.parser.get('TOTAL CASH'), 10000000.)
+        self.assertEqual(self.parser.get('READ', 'Operations'), 90000.)
+        self.assertEqual(self.parser.get('UPDATE', 'Return=0'), 5.)
+        self.assertIsNone(self.parser.get('READ', '0'))
+        self.assertIsNone(self.parser.get('READ', '>1000'))
+        self.assertIsNone(self.parser.get('BROKEN', 'Metric'))
+        self.assertEqual(len(self.parser.values), 10)
+
+    def test_op_stats(self):
+        for line in YCSB_OUTPUT.splitlines():
+            self.parser.feed(line)
+        self.parser.feed("[READ], 95thPercentileLatency(us), 600")
+        self.parser.feed("[READ], 99thPercentileLatency(us), 900")
+        self.parser.feed("[READ], 99.9PercentileLatency(us), 1500")
+        self.parser.feed("[READ], Return=OK, 89999")
+        self.parser.feed("[READ], Return=-1, 1")
+        self.parser.feed("[READ], NotAMetric, 1")
+        stats = self.parser.stats()
+        self.assertEqual(stats.read_operations, 90000.)
+        self.assertEqual(stats.read_avg_latency, 401.5)
+        self.assertEqual(stats.read_p95_latency, 600.)
+        self.assertEqual(stats.read_p99_latency, 900.)
+        self.assertEqual(stats.read_p99_9_latency, 1500.)
+        self.assertEqual(stats.read_return_ok, 89999.)
+        self.assertEqual(stats.read_return_neg1, 1.)
+        self.assertEqual(stats.tx_readmodifywrite_avg_latency, 812.25)
+        self.assertEqual(stats['tx_readmodifywrite_operations'], 10000.)
+        # Unreported per-operation stats take the default value
+        self.assertEqual(stats.scan_p99_latency, 0.)
+        self.assertEqual(stats.dict('read_p99_latency', 'scan_operations'),
+                {'read_p99_latency': 900., 'scan_operations': 0.})
+
+    def test_op_stat_name(self):
+        self.assertEqual(op_stat_name('READ', '99thPercentileLatency'), 'read_p99_latency')
+        self.assertEqual(op_stat_name('TX-READMODIFYWRITE', 'MinLatency'),
+                'tx_readmodifywrite_min_latency')
+        self.assertEqual(op_stat_name('UPDATE', 'Return=NOT_FOUND'), 'update_return_not_found')
+        self.assertIsNone(op_stat_name('OVERALL', 'RunTime'))
+        self.assertIsNone(op_stat_name('TOTAL CASH', None))
+        self.assertIsNone(op_stat_name('READ', 'Foo'))
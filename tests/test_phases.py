@@ -0,0 +1,85 @@
+import unittest
+from time import sleep
+
+from .helpers import *
+
+import runner.constants as const
+from runner.phases import PhaseTimer, FirstOutput
+from runner.stats import Statistics
+
+class PhaseTimerTestCase(unittest.TestCase):
+    def test_phase(self):
+        timer = PhaseTimer()
+        with timer.phase('clean'):
+            sleep(0.05)
+        timer.add('run', 2.)
+        timer.add('run', 1.)
+        self.assertGreaterEqual(timer.totals['clean'], 0.05)
+        self.assertEqual(timer.totals['run'], 3.)
+        self.assertEqual(timer.current['run'], 3.)
+
+    def test_phase_raises(self):
+        timer = PhaseTimer()
+        with self.assertRaises(RuntimeError):
+            with timer.phase('load'):
+                raise RuntimeError
+        self.assertIn('load', timer.totals)
+
+    def test_stats(self):
+        timer = PhaseTimer()
+        timer.add('run', 1.)
+        sleep(0.02)
+        stats = timer.stats()
+        self.assertEqual(set(stats.keys()),
+                {'phase_' + p for p in const.PHASES + ('total',)})
+        self.assertEqual(stats['phase_run'], 1.)
+        self.assertEqual(stats['phase_clean'], 0.)
+        self.assertGreaterEqual(stats['phase_total'], 0.02)
+        # Only the current run is cleared when it's recorded
+        timer.restart()
+        timer.add('export', 0.5)
+        stats = timer.stats()
+        self.assertEqual(stats['phase_run'], 0.)
+        self.assertEqual(stats['phase_export'], 0.5)
+        self.assertLess(stats['phase_total'], 0.02)
+        self.assertEqual(timer.totals, {'run': 1., 'export': 0.5})
+        # start() clears everything
+        timer.start()
+        self.assertEqual(timer.totals, {})
+        self.assertEqual(timer.stats()['phase_export'], 0.)
+
+    def test_stats_fields(self):
+        for name, t in const.TRACKED_STATS.items():
+            if name.startswith('phase_'):
+                self.assertIs(t, float)
+        stats = Statistics(**PhaseTimer().stats())
+        self.assertEqual(stats.phase_run, 0.)
+
+    def test_summary(self):
+        timer = PhaseTimer()
+        timer.add('clean', 0.01)
+        sleep(0.05)
+        lines = timer.summary(0.)
+        self.assertTrue(lines[0].startswith("Time breakdown over"))
+        self.assertTrue(lines[1].strip().startswith("clean"))
+        # Phases which never happened are left out
+        self.assertFalse(any(l.strip().startswith("load") for l in lines))
+        self.assertTrue(lines[-2].strip().startswith("other"))
+        self.assertIn("overhead ratio 1.00", lines[-1])
+
+class FirstOutputTestCase(unittest.TestCase):
+    def test_feed(self):
+        first = FirstOutput()
+        self.assertIsNone(first.time)
+        # The launcher's java command line isn't YCSB output
+        first.feed("/usr/bin/java -cp /opt/ycsb/lib/* com.yahoo.ycsb.Client -t")
+        first.feed("java -cp ycsb.jar com.yahoo.ycsb.Client -t")
+        self.assertIsNone(first.time)
+        first.feed("YCSB Client 0.1")
+        t = first.time
+        self.assertIsNotNone(t)
+        first.feed("Loading workload...")
+        self.assertEqual(first.time, t)
+
+if __name__ == '__main__':
+    unittest.main()
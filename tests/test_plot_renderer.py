@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from .helpers import *
+from time     import sleep
+
+from runner.plot_renderer import PlotRenderer
+
+def write_file(filename, contents, delay=0):
+    sleep(delay)
+    with open(filename, 'a') as f:
+        f.write(contents)
+
+def fail():
+    raise RuntimeError("render failed")
+
+class PlotRendererTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.renderer = PlotRenderer(max_workers=2, max_pending=2)
+
+    def tearDown(self):
+        self.renderer.shutdown()
+        self.tempdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tempdir.name, name)
+
+    def read(self, name):
+        with open(self.path(name)) as f:
+            return f.read()
+
+    def test_submit(self):
+        self.renderer.submit(self.path('a'), write_file, self.path('a'), 'a')
+        self.renderer.submit(self.path('b'), write_file, self.path('b'), 'b')
+        self.renderer.submit(self.path('c'), write_file, self.path('c'), 'c')
+        self.renderer.wait()
+        self.assertEqual(len(self.renderer), 0)
+        self.assertEqual(self.read('a'), 'a')
+        self.assertEqual(self.read('b'), 'b')
+        self.assertEqual(self.read('c'), 'c')
+
+    def test_coalesce(self):
+        a = self.path('a')
+        self.renderer.submit(a, write_file, a, '1', 0.5)
+        # Wait for the first render to start, so it can't be cancelled
+        sleep(0.2)
+        for i in range(2, 6):
+            self.renderer.submit(a, write_file, a, str(i))
+        self.assertEqual(len(self.renderer), 2)
+        self.renderer.wait()
+        # Superseded renders never ran
+        self.assertEqual(self.read('a'), '15')
+
+    def test_failure(self):
+        self.renderer.submit(self.path('a'), fail)
+        with self.assertRaises(RuntimeError):
+            self.renderer.wait()
+        self.assertEqual(len(self.renderer), 0)
@@ -0,0 +1,148 @@
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+import subprocess
+
+from .helpers import *
+
+import runner.constants as const
+from runner.dbsystem import DbSystem
+from runner.reset    import (ReloadReset, SnapshotReset, DatadirReset,
+        make_reset)
+
+FOO_WORKLOAD = """
+recordcount=10000
+operationcount=100000
+workload=com.yahoo.ycsb.workloads.ClosedEconomyWorkload
+"""
+
+def free_port():
+    """free_port
+    Returns a TCP port on localhost which nothing is listening on
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+class ResetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.__real_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        with open('foo', 'w') as wf:
+            wf.write(FOO_WORKLOAD)
+        self.dbname = 'resetdb'
+        const.SUPPORTED_DBS[self.dbname] = None
+        const.CLEAN_COMMANDS[self.dbname] = ['true']
+        const.SNAPSHOT_COMMANDS[self.dbname] = [['touch', '{SNAPSHOT_DIR}/snap']]
+        const.RESTORE_COMMANDS[self.dbname] = [['test', '-f', '{SNAPSHOT_DIR}/snap']]
+        self.config = {
+            'trials'      : 1,
+            'min_mpl'     : 1,
+            'max_mpl'     : 5,
+            'inc_mpl'     : 1,
+            'workload'    : 'foo',
+            'output'      : 'csv',
+            'output_dir'  : 'output',
+            'avgkey'      : 'mpl',
+            'avgfields'   : ['runtime'],
+            'plotkey'     : 'mpl',
+            'plotfields'  : ['runtime'],
+        }
+        self.loads = 0
+        self.dbs = []
+
+    def tearDown(self):
+        for db in self.dbs:
+            db.cleanup()
+        os.chdir(self.__real_cwd)
+        self.tempdir.cleanup()
+        for commands in (const.SUPPORTED_DBS, const.CLEAN_COMMANDS,
+                const.SNAPSHOT_COMMANDS, const.RESTORE_COMMANDS):
+            commands.pop(self.dbname, None)
+
+    def make_db(self, **config):
+        db = DbSystem(self.dbname, dict(self.config, **config))
+        self.dbs.append(db)
+        return db
+
+    def load(self):
+        self.loads += 1
+
+    def test_reload(self):
+        reset = make_reset(self.make_db(), self.load)
+        self.assertIsInstance(reset, ReloadReset)
+        reset.reset()
+        reset.reset()
+        self.assertEqual(self.loads, 2)
+
+    def test_snapshot(self):
+        db = self.make_db(reset_strategy='snapshot')
+        reset = make_reset(db, self.load)
+        self.assertIsInstance(reset, SnapshotReset)
+        for _ in range(3):
+            reset.reset()
+        # Loaded once, then restored from the snapshot
+        self.assertEqual(self.loads, 1)
+        self.assertTrue(os.path.exists(os.path.join(db.snapshot_path, 'snap')))
+        # A failed restore is an error
+        os.remove(os.path.join(db.snapshot_path, 'snap'))
+        with self.assertRaises(RuntimeError):
+            reset.reset()
+        snapshot_path = db.snapshot_path
+        db.cleanup()
+        self.assertFalse(os.path.exists(snapshot_path))
+
+    def test_snapshot_unsupported(self):
+        del const.SNAPSHOT_COMMANDS[self.dbname]
+        with self.assertRaises(ValueError):
+            self.make_db(reset_strategy='snapshot')
+
+    def test_datadir(self):
+        datadir = os.path.join(self.tempdir.name, 'data')
+        os.mkdir(datadir)
+        def load():
+            self.load()
+            with open(os.path.join(datadir, 'table'), 'w') as f:
+                f.write('loaded')
+        with self.assertRaises(AttributeError):
+            self.make_db(reset_strategy='datadir')
+        db = self.make_db(reset_strategy='datadir', datadir=datadir,
+                server_stop='true', server_start='true', snapshot_dir='snap')
+        reset = make_reset(db, load)
+        self.assertIsInstance(reset, DatadirReset)
+        reset.reset()
+        # The run changes the data, and the reset puts it back
+        with open(os.path.join(datadir, 'table'), 'w') as f:
+            f.write('changed')
+        reset.reset()
+        with open(os.path.join(datadir, 'table')) as f:
+            self.assertEqual(f.read(), 'loaded')
+        self.assertEqual(self.loads, 1)
+
+    @unittest.skipUnless(shutil.which('redis-server') and shutil.which('redis-cli'),
+            "requires a local Redis installation")
+    def test_datadir_redis(self):
+        port = str(free_port())
+        datadir = os.path.join(self.tempdir.name, 'redis')
+        os.mkdir(datadir)
+        cli = ['redis-cli', '-p', port]
+        start = ("sh -c 'redis-server --port %s --dir %s --daemonize yes && "
+                "until redis-cli -p %s ping; do sleep 0.1; done'" % (port, datadir, port))
+        subprocess.check_call(start, shell=True, stdout=subprocess.DEVNULL)
+        const.CLEAN_COMMANDS[self.dbname] = cli + ['FLUSHALL']
+        db = self.make_db(reset_strategy='datadir', datadir=datadir,
+                server_stop=' '.join(cli + ['SHUTDOWN', 'SAVE']), server_start=start)
+        try:
+            reset = make_reset(db, lambda: subprocess.check_call(cli + ['SET', 'k', 'loaded']))
+            reset.reset()
+            subprocess.check_call(cli + ['SET', 'k', 'changed'])
+            reset.reset()
+            self.assertEqual(subprocess.check_output(cli + ['GET', 'k']).strip(), b'loaded')
+        finally:
+            subprocess.call(cli + ['SHUTDOWN', 'NOSAVE'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+import subprocess
+
+from time import sleep, monotonic
+
+from .helpers import *
+
+from runner import resources
+from runner.resources import ResourceSampler
+
+# Burns CPU in a child process, holding some memory
+BUSY = """
+import subprocess, sys
+data = bytearray(32 * 1024 * 1024)
+subprocess.call([sys.executable, '-c', 'while True: pass'])
+"""
+
+def kill_tree(proc):
+    for pid in resources.process_tree([proc.pid]):
+        os.kill(pid, 9)
+    proc.wait()
+
+@unittest.skipUnless(resources.supported(), "requires /proc")
+class ResourcesTestCase(unittest.TestCase):
+    def test_read_counters(self):
+        cpu, rss, ctx, read, write = resources.read_counters(os.getpid())
+        self.assertGreater(cpu, 0)
+        self.assertGreater(rss, 0)
+        self.assertGreater(ctx, 0)
+        # Above the largest possible PID
+        self.assertIsNone(resources.read_counters(2 ** 22 + 1))
+
+    def test_process_tree(self):
+        proc = subprocess.Popen([sys.executable, '-c', BUSY])
+        try:
+            # Wait for the grandchild to start
+            for _ in range(100):
+                tree = resources.process_tree([proc.pid])
+                if len(tree) == 2:
+                    break
+                sleep(0.05)
+            self.assertEqual(len(tree), 2)
+            self.assertIn(proc.pid, tree)
+            self.assertIn(os.getpid(), resources.process_tree([os.getppid()]))
+            with open("/proc/%i/comm" % proc.pid) as f:
+                comm = f.read().strip()
+            self.assertIn(proc.pid, resources.find_pids([comm]))
+        finally:
+            kill_tree(proc)
+
+    def test_sampler(self):
+        sampler = ResourceSampler(0.2, server_pids=[os.getpid()])
+        with sampler:
+            proc = subprocess.Popen([sys.executable, '-c', BUSY])
+            sampler.add(proc.pid)
+            try:
+                sleep(1.5)
+            finally:
+                kill_tree(proc)
+        self.assertGreaterEqual(len(sampler), 5)
+        summary = sampler.summary()
+        self.assertGreater(summary['client_cpu_max'], 50.)
+        self.assertGreater(summary['client_rss_max'], 32 * 1024 * 1024)
+        self.assertIn('server_cpu_mean', summary)
+        samples = sampler.dict()
+        self.assertEqual(len(samples['elapsed']), len(sampler))
+        self.assertEqual(len(samples['client']['rss']), len(sampler))
+        self.assertLess(sampler.overhead / len(sampler), 0.05)
+
+    def test_sampler_short_run(self):
+        # A run shorter than the interval still gets a sample, on stop()
+        sampler = ResourceSampler(60, server_pids=[os.getpid()])
+        with sampler:
+            end = monotonic() + 0.2
+            while monotonic() < end:
+                pass
+        self.assertEqual(len(sampler), 1)
+        self.assertGreater(sampler.summary()['server_cpu_mean'], 50.)
+
+    def test_disabled(self):
+        sampler = ResourceSampler(0)
+        with sampler:
+            pass
+        self.assertEqual(len(sampler), 0)
+        self.assertEqual(sampler.summary(), {})
@@ -0,0 +1,130 @@
+import os
+import sys
+import tempfile
+import unittest
+import subprocess
+
+from .helpers import *
+
+import runner.constants as const
+from runner.dbsystem   import DbSystem
+from runner.results_db import ResultsDb, git_blob_sha
+from runner.stats      import Statistics
+
+FOO_WORKLOAD = """
+recordcount=1000
+operationcount=10000
+workload=com.yahoo.ycsb.workloads.ClosedEconomyWorkload
+"""
+
+class ResultsDbTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.__real_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        with open('foo', 'w') as wf:
+            wf.write(FOO_WORKLOAD)
+        const.SUPPORTED_DBS['resultsdb'] = None
+        self.db = DbSystem('resultsdb', {
+            'trials'      : 1,
+            'min_mpl'     : 1,
+            'max_mpl'     : 5,
+            'inc_mpl'     : 1,
+            'workload'    : 'foo',
+            'output'      : 'csv',
+            'output_dir'  : 'output',
+            'avgkey'      : 'mpl',
+            'avgfields'   : ['runtime'],
+            'plotkey'     : 'mpl',
+            'plotfields'  : ['runtime'],
+        })
+        self.results = ResultsDb('results.sqlite')
+
+    def tearDown(self):
+        self.results.close()
+        self.db.cleanup()
+        os.chdir(self.__real_cwd)
+        self.tempdir.cleanup()
+        del const.SUPPORTED_DBS['resultsdb']
+
+    def add_runs(self):
+        for throughput in (100., 200.):
+            run_id = self.results.add_run(self.db)
+            for mpl in (1, 2):
+                for trial in (1, 2):
+                    self.results.add_stats(run_id, Statistics(mpl=mpl,
+                        trial=trial, throughput=throughput * mpl + trial,
+                        read_p99_latency=5.))
+        return run_id
+
+    def test_git_blob_sha(self):
+        # As given by: printf 'hello\n' | git hash-object --stdin
+        self.assertEqual(git_blob_sha(b"hello\n"),
+                "ce013625030ba8dba906f756967f9e9ca394464a")
+
+    def test_add_run(self):
+        run_id = self.results.add_run(self.db)
+        db, workload, sha = self.results.conn.execute("SELECT db, workload, " +
+                "workload_sha FROM runs WHERE id = ?", (run_id,)).fetchone()
+        self.assertEqual((db, workload), ('resultsdb', 'foo'))
+        self.assertEqual(sha, git_blob_sha(FOO_WORKLOAD.encode('utf-8')))
+
+    def test_query(self):
+        self.add_runs()
+        names, rows = self.results.query('throughput', mpl=2)
+        self.assertEqual(names, ['id', 'datestr', 'db', 'workload', 'n',
+            'mean_throughput'])
+        self.assertEqual([(row[-2], row[-1]) for row in rows],
+                [(2, 201.5), (2, 401.5)])
+        _, rows = self.results.query('throughput', how='max', by='mpl', last=1)
+        self.assertEqual(rows, [('resultsdb', 'foo', 1, 2, 202.),
+            ('resultsdb', 'foo', 2, 2, 402.)])
+        _, rows = self.results.query('read_p99_latency', by='db', db='resultsdb')
+        self.assertEqual(rows, [('resultsdb', 'foo', 8, 5.)])
+        self.assertEqual(self.results.query('throughput', db='foo')[1], [])
+        with self.assertRaises(ValueError):
+            self.results.query('throughput', how='foo')
+        with self.assertRaises(ValueError):
+            self.results.query('throughput', by='foo')
+
+    def test_query_last_db(self):
+        self.add_runs()
+        # A newer run of another DBMS doesn't count towards the last runs of
+        # this one
+        run_id = self.results.add_run(self.db)
+        self.results.conn.execute("UPDATE runs SET db = 'other' WHERE id = ?",
+                (run_id,))
+        self.results.add_stats(run_id, Statistics(mpl=1, trial=1,
+            throughput=1.))
+        _, rows = self.results.query('throughput', db='resultsdb', last=1)
+        self.assertEqual([(row[2], row[-2], row[-1]) for row in rows],
+                [('resultsdb', 4, 301.5)])
+        _, rows = self.results.query('throughput', db='other', workload='foo',
+                last=2)
+        self.assertEqual([(row[2], row[-2], row[-1]) for row in rows],
+                [('other', 1, 1.)])
+        _, rows = self.results.query('throughput', last=1)
+        self.assertEqual([row[2] for row in rows], ['other'])
+
+    def test_statistics(self):
+        run_id = self.add_runs()
+        stats = self.results.statistics(run_id)
+        self.assertEqual(len(stats), 4)
+        self.assertEqual((stats[0].mpl, stats[0].trial, stats[0].throughput),
+                (1, 1, 201.))
+        self.assertEqual(stats[0].read_p99_latency, 5.)
+
+    def test_cli(self):
+        self.add_runs()
+        script = os.path.join(self.__real_cwd, 'src', 'ycsb_results.py')
+        out = subprocess.check_output([sys.executable, script, 'results.sqlite',
+            'throughput', '--by', 'mpl', '--how', 'min'],
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+        self.assertEqual(out.decode('utf-8').splitlines(), [
+            'db,workload,mpl,n,min_throughput',
+            'resultsdb,foo,1,4,101.0',
+            'resultsdb,foo,2,4,201.0',
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,33 +1,245 @@
+import os
+import sys
+import tempfile
 import unittest
 
 from .helpers import *
 
 import runner.constants as const
 from runner.runner import Runner
+from runner.stats  import Statistics
+
+FOO_WORKLOAD = """
+recordcount=10000
+operationcount=100000
+workload=com.yahoo.ycsb.workloads.ClosedEconomyWorkload
+totalcash=10000000
+redis.host=10.0.0.1
+mongodb.url=mongodb://10.0.0.2:27017
+"""
+
+FOO_CONFIG = """
+[DEFAULT]
+workload = foo
+output_plots = false
+
+[redis,mongodb:same]
+[mongodb:other]
+db.url = jdbc:postgresql://10.0.0.2:5432/ycsb
+
+[jdbc-postgres]
+db.url = jdbc:postgresql://10.0.0.3:5432/ycsb
+
+[jdbc-mysql:a,jdbc-mysql:b]
+parallel_group = mysql
+"""
+
+YCSB_OUTPUT = """
+[OVERALL], RunTime(ms), 1234.0
+[OVERALL], Throughput(ops/sec), 81.5
+"""
+
+BAR_CONFIG = """
+[DEFAULT]
+workload = foo
+output_plots = false
+trials = 2
+min_mpl = 1
+max_mpl = 2
+inc_mpl = 1
+retry_backoff = 0
+
+[redis]
+"""
+
+# Stands in for the ycsb and redis-cli commands, recording each call (the
+# command and its first argument) in calls.log. The command exits with code 1
+# instead if the number of the call (its line in calls.log) is in fail.log.
+FAKE_COMMAND = """#!%s
+import os, sys
+with open('calls.log', 'a+') as f:
+    f.write(' '.join([os.path.basename(sys.argv[0])] + sys.argv[1:2]) + '\\n')
+    f.seek(0)
+    call = len(f.readlines())
+if os.path.exists('fail.log'):
+    with open('fail.log') as f:
+        if str(call) in f.read().split():
+            sys.exit(1)
+if sys.argv[1:2] == ['load']:
+    print("[OVERALL], RunTime(ms), 100")
+    print("[INSERT], Operations, 10000")
+elif sys.argv[1:2] == ['run']:
+    threads = int(sys.argv[sys.argv.index('-threads') + 1])
+    print("10 sec: 100 operations; 10.0 current ops/sec;", file=sys.stderr)
+    print("[OVERALL], RunTime(ms), 1000")
+    print("[OVERALL], Throughput(ops/sec), %%.1f" %% (100. * threads))
+    print("[ACTUAL OPERATIONS], 100")
+"""
 
 class RunnerTestCase(unittest.TestCase):
     def setUp(self):
-        pass
+        # Set the working directory to some temp dir
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.__real_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        # Write fake workload and config
+        with open('foo', 'w') as wf:
+            wf.write(FOO_WORKLOAD)
+        with open('foo.ini', 'w') as cf:
+            cf.write(FOO_CONFIG)
+        # We don't want any stdout, so redirect to null device (/dev/null)
+        self.__real_stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        self.runner = Runner('foo.ini')
 
     def tearDown(self):
-        pass
+        for db in self.runner.dbs:
+            db.cleanup()
+        self.tempdir.cleanup()
+        # Close /dev/null and re-assign stdout back to the real stdout
+        sys.stdout.close()
+        sys.stdout = self.__real_stdout
+        # Change CWD back to real CWD
+        os.chdir(self.__real_cwd)
 
     def test_init(self):
-        pass
+        self.assertEqual([db.labelname for db in self.runner.dbs], [
+            'redis', 'mongodb:same', 'mongodb:other', 'jdbc-postgres',
+            'jdbc-mysql:a', 'jdbc-mysql:b'])
+        with self.assertRaises(IOError):
+            Runner(noattr(self))
+
+    def test_init_resume(self):
+        redis = self.runner.dbs[0]
+        redis.journal.record(1, 1, Statistics(mpl=1, trial=1))
+        runner = Runner('foo.ini', resume=redis.output_dir)
+        try:
+            # DBs which hadn't started yet start afresh
+            self.assertEqual(runner.dbs[0].outdirpath, redis.outdirpath)
+            self.assertIsNotNone(runner.dbs[0].journal.completed(1, 1))
+            self.assertEqual(len(runner.dbs[1].journal), 0)
+        finally:
+            for db in runner.dbs:
+                db.cleanup()
+        # Resuming from the wrong place doesn't silently start afresh
+        with self.assertRaises(IOError):
+            Runner('foo.ini', resume=noattr(self))
+
+    def test_lanes(self):
+        lanes = [[db.labelname for db in lane] for lane in self.runner.lanes()]
+        self.assertEqual(lanes, [
+            ['redis'],
+            ['mongodb:same', 'mongodb:other'],
+            ['jdbc-postgres'],
+            ['jdbc-mysql:a', 'jdbc-mysql:b'],
+        ])
+
+    def test_lanes_group_hosts(self):
+        # A group sharing a server with an ungrouped DB mustn't run against it
+        with open('bar.ini', 'w') as cf:
+            cf.write(FOO_CONFIG + """
+[jdbc-postgres:grouped]
+db.url = jdbc:postgresql://10.0.0.3:5432/ycsb
+parallel_group = pg
+""")
+        runner = Runner('bar.ini')
+        try:
+            lanes = [[db.labelname for db in lane] for lane in runner.lanes()]
+        finally:
+            for db in runner.dbs:
+                db.cleanup()
+        self.assertEqual(lanes, [
+            ['redis'],
+            ['mongodb:same', 'mongodb:other'],
+            ['jdbc-postgres', 'jdbc-postgres:grouped'],
+            ['jdbc-mysql:a', 'jdbc-mysql:b'],
+        ])
+
+    def fake_commands(self):
+        """fake_commands
+        Puts fake ycsb and redis-cli commands (see FAKE_COMMAND) first on the
+        PATH until the end of the test, and returns the Runner for BAR_CONFIG
+        """
+        os.mkdir('bin')
+        for name in ('ycsb', 'redis-cli'):
+            path = os.path.join('bin', name)
+            with open(path, 'w') as f:
+                f.write(FAKE_COMMAND % sys.executable)
+            os.chmod(path, 0o755)
+        real_path = os.environ['PATH']
+        os.environ['PATH'] = os.pathsep.join([os.path.abspath('bin'), real_path])
+        self.addCleanup(os.environ.__setitem__, 'PATH', real_path)
+        with open('bar.ini', 'w') as cf:
+            cf.write(BAR_CONFIG)
+        events = []
+        hook = lambda name: lambda *args: events.append((name,) + tuple(
+            a for a in args if type(a) is int))
+        runner = Runner('bar.ini', hooks={name: [hook(name)] for name in (
+            'PRE_RUN', 'PRE_DB', 'PRE_TRIAL', 'PRE_MPL', 'POST_MPL',
+            'POST_TRIAL', 'POST_DB', 'POST_RUN')})
+        runner.events = events
+        self.addCleanup(lambda: [db.cleanup() for db in runner.dbs])
+        return runner
+
+    def calls(self):
+        with open('calls.log') as f:
+            return f.read().splitlines()
 
     def test_run(self):
-        pass
+        runner = self.fake_commands()
+        runner.run()
+        db, = runner.dbs
+        self.assertEqual(runner.events, [('PRE_RUN',), ('PRE_DB',),
+            ('PRE_TRIAL', 1),
+            ('PRE_MPL', 1, 1), ('POST_MPL', 1, 1),
+            ('PRE_MPL', 2, 1), ('POST_MPL', 2, 1), ('POST_TRIAL', 1),
+            ('PRE_TRIAL', 2),
+            ('PRE_MPL', 1, 2), ('POST_MPL', 1, 2),
+            ('PRE_MPL', 2, 2), ('POST_MPL', 2, 2), ('POST_TRIAL', 2),
+            ('POST_DB',), ('POST_RUN',)])
+        # The data is cleaned and loaded before every run
+        self.assertEqual(self.calls(), ['redis-cli -r', 'ycsb load', 'ycsb run'] * 4)
+        self.assertEqual([(s.trial, s.mpl, s.throughput, s.failed)
+            for s in db.stats.items()],
+            [(1, 1, 100., 0), (1, 2, 200., 0), (2, 1, 100., 0), (2, 2, 200., 0)])
+        self.assertGreater(db.stats[0].load_throughput, 0.)
+        self.assertTrue(db.journal.finished)
+        with open(db.makefpath("output-{}-{}.csv")) as f:
+            self.assertEqual(f.read().splitlines(), ['mpl,runtime,throughput,trial',
+                '1,1000.0,100.0,1', '2,1000.0,200.0,1',
+                '1,1000.0,100.0,2', '2,1000.0,200.0,2'])
+        with open(db.makefpath("averages-{}-{}.csv")) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+
+    def test_run_retry(self):
+        runner = self.fake_commands()
+        db, = runner.dbs
+        db.max_retries = 1
+        # A failed clean, load or run is retried, and a run which fails more
+        # than max_retries times is recorded as failed, without aborting
+        with open('fail.log', 'w') as f:
+            f.write("2 8 11 12\n")
+        runner.run()
+        self.assertEqual(self.calls(), [
+            'redis-cli -r', 'ycsb load', # 2 fails
+            'redis-cli -r', 'ycsb load', 'ycsb run',
+            'redis-cli -r', 'ycsb load', 'ycsb run', # 8 fails
+            'redis-cli -r', 'ycsb load', 'ycsb run', # 11 fails
+            'redis-cli -r', # 12 fails
+            'redis-cli -r', 'ycsb load', 'ycsb run',
+            'redis-cli -r', 'ycsb load', 'ycsb run'])
+        self.assertEqual([(s.trial, s.mpl, s.throughput, s.failed, s.retries)
+            for s in db.stats.items()],
+            [(1, 1, 100., 0, 1), (1, 2, 0., 1, 1), (2, 1, 100., 0, 1),
+                (2, 2, 200., 0, 0)])
+        self.assertEqual(sum(s.timeouts for s in db.stats.items()), 0)
+        self.assertTrue(db.journal.finished)
 
     def test_extract_stats(self):
-        pass
+        stats = Runner.extract_stats(YCSB_OUTPUT)
+        self.assertEqual(stats.runtime, 1234.)
+        self.assertEqual(stats.throughput, 81.5)
+        self.assertEqual(stats.opcount, 0.)
 
     def test_get_re_match(self):
         pass
-
-    @classmethod
-    def setUpClass(cls):
-        pass
-
-    @classmethod
-    def tearDownClass(cls):
-        pass
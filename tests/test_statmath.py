@@ -0,0 +1,53 @@
+import math
+import unittest
+
+from .helpers import *
+
+from runner import statmath
+
+class StatMathTestCase(unittest.TestCase):
+    def test_betainc(self):
+        self.assertEqual(statmath.betainc(2., 3., 0.), 0.)
+        self.assertEqual(statmath.betainc(2., 3., 1.), 1.)
+        self.assertAlmostEqual(statmath.betainc(2., 3., 0.4), 0.5248)
+        self.assertAlmostEqual(statmath.betainc(1., 1., 0.3), 0.3)
+
+    def test_t_cdf(self):
+        self.assertAlmostEqual(statmath.t_cdf(0., 5), 0.5)
+        self.assertAlmostEqual(statmath.t_cdf(2., 5), 0.9490302605850709)
+        self.assertAlmostEqual(statmath.t_cdf(-2., 5), 1 - 0.9490302605850709)
+
+    def test_t_ppf(self):
+        # Values from published t tables
+        self.assertAlmostEqual(statmath.t_ppf(0.975, 1), 12.7062047, places=5)
+        self.assertAlmostEqual(statmath.t_ppf(0.975, 4), 2.7764451, places=6)
+        self.assertAlmostEqual(statmath.t_ppf(0.995, 10), 3.1692727, places=6)
+        self.assertAlmostEqual(statmath.t_ppf(0.025, 30), -2.0422725, places=6)
+        with self.assertRaises(ValueError):
+            statmath.t_ppf(1., 5)
+
+    def test_normal_cdf(self):
+        self.assertAlmostEqual(statmath.normal_cdf(0.), 0.5)
+        self.assertAlmostEqual(statmath.normal_cdf(1.959963985), 0.975)
+
+    def test_ci_halfwidth(self):
+        self.assertTrue(math.isnan(statmath.ci_halfwidth(1., 1)))
+        self.assertAlmostEqual(statmath.ci_halfwidth(10., 3), 24.8413, places=3)
+    def test_welch_t_test(self):
+        t, df, p = statmath.welch_t_test([1, 2, 3, 4, 5], [2, 4, 6, 8, 10])
+        self.assertAlmostEqual(t, -1.8973666, places=6)
+        self.assertAlmostEqual(df, 5.8823529, places=6)
+        self.assertAlmostEqual(p, 0.1075, places=4)
+        self.assertEqual(statmath.welch_t_test([1, 1], [1, 1])[2], 1.)
+        self.assertEqual(statmath.welch_t_test([1, 1], [2, 2])[2], 0.)
+        self.assertTrue(math.isnan(statmath.welch_t_test([1], [1, 2])[2]))
+
+    def test_mann_whitney_u(self):
+        u, p = statmath.mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+        self.assertEqual(u, 0.)
+        self.assertAlmostEqual(p, 0.0122, places=4)
+        self.assertEqual(statmath.mann_whitney_u([1, 2, 3], [1, 2, 3])[1], 1.)
+        self.assertTrue(math.isnan(statmath.mann_whitney_u([], [1])[1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from .helpers import *
@@ -62,6 +63,24 @@ class StatisticsTestCase(unittest.TestCase):
             self.statitem1[0]: self.statitem1[1]() + 5,
             self.statitem2[0]: self.statitem2[1]() + 10,
         })
+        # Every field by default
+        self.assertEqual(self.stats.dict(), self.stats.dict(*self.stats.fields()))
+
+    def test_slots(self):
+        self.assertFalse(hasattr(self.stats, '__dict__'))
+        with self.assertRaises(AttributeError):
+            setattr(self.stats, noattr(self.stats), 1)
+        self.assertEqual(set(self.stats.fields()), set(const.TRACKED_STATS.keys()))
+        self.stats.read_p99_latency = 2.
+        self.assertIn('read_p99_latency', self.stats.fields())
+        self.assertIn('read_p99_latency', dir(self.stats))
+
+    def test_pickle(self):
+        self.stats.read_p99_latency = 2.
+        stats = pickle.loads(pickle.dumps(self.stats))
+        self.assertEqual(stats.read_p99_latency, 2.)
+        self.assertEqual(stats.dict(*self.stats.fields()),
+                self.stats.dict(*self.stats.fields()))
 
 class StatisticsSetTestCase(unittest.TestCase):
     def setUp(self):
@@ -94,6 +113,22 @@ class StatisticsSetTestCase(unittest.TestCase):
         with self.assertRaises(TypeError):
             self.ss[object()]
 
+    def test_getitem_rebuilt(self):
+        stat = Statistics(mpl=4, opcount=10., read_p99_latency=3.)
+        ss = StatisticsSet(self.stat1, stat)
+        # Rows are rebuilt from the columns rather than stored
+        self.assertIsNot(ss[-1], stat)
+        self.assertEqual(ss[-1], stat)
+        self.assertEqual(ss[-1].dict(), stat.dict())
+        self.assertEqual(ss[0].fields(), self.stat1.fields())
+        # So modifying a fetched row doesn't change the set
+        row = ss[1]
+        row.opcount = 20.
+        self.assertEqual(ss[1].opcount, 10.)
+        self.assertEqual(ss.sum_opcount, 10.)
+        with self.assertRaises(IndexError):
+            ss[-3]
+
     def test_len(self):
         ss = StatisticsSet(self.stat1, self.stat2, self.stat1)
         self.assertEqual(len(self.ss), 2)
@@ -123,3 +158,54 @@ class StatisticsSetTestCase(unittest.TestCase):
     def test_getvalues(self):
         self.assertEqual(self.ss.getvalues(self.statitem1[0]),
              [const.TRACKED_STATS[self.statitem1[0]]() for x in range(len(self.ss))])
+
+    def test_op_stats(self):
+        stats = Statistics(read_p99_latency=12.5)
+        self.assertEqual(stats.read_p99_latency, 12.5)
+        self.assertEqual(stats['read_p99_latency'], 12.5)
+        self.assertEqual(stats.update_avg_latency, 0.)
+        stats.update_avg_latency = 3.
+        self.assertEqual(stats.update_avg_latency, 3.)
+        with self.assertRaises(TypeError):
+            stats.read_p99_latency = weirdtype()
+        with self.assertRaises(AttributeError):
+            Statistics(read_foo=1.)
+
+    def test_columns(self):
+        ss = StatisticsSet(*[Statistics(mpl=m, runtime=float(m)) for m in range(100)])
+        self.assertEqual(len(ss), 100)
+        self.assertEqual(ss.column('mpl').tolist(), list(range(100)))
+        self.assertEqual(ss.column('mpl').dtype.kind, 'i')
+        self.assertEqual(ss.column('runtime').dtype.kind, 'f')
+        self.assertEqual(set(ss.columns('mpl', 'runtime').keys()), {'mpl', 'runtime'})
+        # Per-operation stats first seen in later rows are backfilled
+        ss.addstats(Statistics(read_p99_latency=5.))
+        self.assertEqual(ss.column('read_p99_latency').tolist(), [0.] * 100 + [5.])
+        self.assertEqual(ss.getvalues('scan_operations'), [0.] * 101)
+
+    def test_column_anomaly_score(self):
+        ss = StatisticsSet(Statistics(totalcash=100., countcash=123., opcount=50.),
+                Statistics())
+        self.assertEqual(ss.getvalues('anomaly_score'),
+                [s.anomaly_score for s in ss.items()])
+
+    def test_aggregate(self):
+        ss = StatisticsSet(*[Statistics(mpl=m, runtime=float(m * t))
+            for t in range(1, 5) for m in (4, 1, 2)])
+        keys, means = ss.aggregate('mpl', 'runtime')
+        self.assertEqual(keys.tolist(), [1, 2, 4])
+        self.assertEqual(means.tolist(), [2.5, 5., 10.])
+        self.assertEqual(ss.aggregate('mpl', 'runtime', 'min')[1].tolist(), [1., 2., 4.])
+        self.assertEqual(ss.aggregate('mpl', 'runtime', 'max')[1].tolist(), [4., 8., 16.])
+        self.assertEqual(ss.aggregate('mpl', 'runtime', 'count')[1].tolist(), [4, 4, 4])
+        self.assertEqual(ss.aggregate('mpl', 'runtime', 'sum')[1].tolist(), [10., 20., 40.])
+        self.assertEqual(ss.aggregate('mpl', 'runtime', 'median')[1].tolist(), [2.5, 5., 10.])
+        self.assertAlmostEqual(ss.aggregate('mpl', 'runtime', 'std')[1][0], 1.2909944487)
+        self.assertAlmostEqual(ss.aggregate('mpl', 'runtime', 'p75')[1][2], 13.)
+        # t(0.975, 3) * std / sqrt(4)
+        self.assertAlmostEqual(ss.aggregate('mpl', 'runtime', 'ci95')[1][0], 2.0542603)
+        self.assertEqual(ss.groupby('mpl', 'runtime')['runtime'].tolist(), [2.5, 5., 10.])
+        with self.assertRaises(ValueError):
+            ss.aggregate('mpl', 'runtime', 'foo')
+        with self.assertRaises(ValueError):
+            ss.aggregate('mpl', 'runtime', 'ci100')
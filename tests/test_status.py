@@ -0,0 +1,47 @@
+import unittest
+
+from .helpers import *
+
+from runner.status import StatusSeries
+
+STATUS_OUTPUT = """Loading workload...
+Starting test.
+ 0 sec: 0 operations;
+ 10 sec: 97812 operations; 9781.2 current ops/sec; [UPDATE AverageLatency(us)=142.41] [READ AverageLatency(us)=96.98]
+ 20 sec: 190000 operations; 9218.8 current ops/sec; [READ AverageLatency(us)=101.5]
+2015-10-05 12:00:30:123 30 sec: 290000 operations; 10000 current ops/sec; est completion in 1 minute [READ: Count=48927, Max=3051, Min=48, Avg=97.32, 90=120, 99=300] [TX-READMODIFYWRITE: Count=10, Max=900, Min=100, Avg=450.5, 90=800, 99=900]
+[OVERALL], RunTime(ms), 30000.0
+"""
+
+class StatusSeriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.series = StatusSeries()
+        self.results = [self.series.feed(l) for l in STATUS_OUTPUT.splitlines()]
+
+    def test_feed(self):
+        self.assertEqual(self.results, [False, False, True, True, True, True, False])
+        self.assertEqual(len(self.series), 4)
+        self.assertEqual(self.series.elapsed, [0, 10, 20, 30])
+        self.assertEqual(self.series.operations, [0, 97812, 190000, 290000])
+        self.assertEqual(self.series.ops_per_sec, [None, 9781.2, 9218.8, 10000.])
+
+    def test_latencies(self):
+        self.assertEqual(self.series.latencies, {
+            'UPDATE': [None, 142.41, None, None],
+            'READ': [None, 96.98, 101.5, 97.32],
+            'TX-READMODIFYWRITE': [None, None, None, 450.5],
+        })
+
+    def test_counts(self):
+        self.assertEqual(self.series.counts, {
+            'READ': [None, None, None, 48927],
+            'TX-READMODIFYWRITE': [None, None, None, 10],
+        })
+
+    def test_dict(self):
+        series = StatusSeries.fromdict(self.series.dict())
+        self.assertEqual(series.dict(), self.series.dict())
+        # Series written before counts were recorded
+        d = self.series.dict()
+        del d['count']
+        self.assertEqual(StatusSeries.fromdict(d).counts, {})
@@ -0,0 +1,76 @@
+import unittest
+
+from .helpers import *
+
+from runner        import steady_state
+from runner.stats  import Statistics
+from runner.status import StatusSeries
+
+def make_series(rates, latency=None):
+    """make_series
+    Builds a StatusSeries with reports every 10 seconds, with the given
+    interval throughputs and READ latencies
+    """
+    series = StatusSeries()
+    ops = 0
+    series.feed("0 sec: 0 operations;")
+    for i, rate in enumerate(rates):
+        ops += int(rate * 10)
+        line = "%i sec: %i operations; %.1f current ops/sec;" % ((i + 1) * 10, ops, rate)
+        if latency is not None:
+            line += " [READ AverageLatency(us)=%.1f]" % latency[i]
+        series.feed(line)
+    return series
+
+class SteadyStateTestCase(unittest.TestCase):
+    def test_interval_throughputs(self):
+        series = make_series([100., 200., 300.])
+        self.assertEqual(steady_state.interval_throughputs(series), [100., 200., 300.])
+
+    def test_detect_warmup(self):
+        rates = [100., 400., 800., 1000., 1010., 990., 1000., 1005., 995., 1000.]
+        self.assertEqual(steady_state.detect_warmup(rates, window=2, tolerance=0.05), 3)
+        # Already steady
+        self.assertEqual(steady_state.detect_warmup([1000.] * 6, window=3), 0)
+        # Too short, or never steady
+        self.assertIsNone(steady_state.detect_warmup([1000.] * 5, window=3))
+        self.assertIsNone(steady_state.detect_warmup([1., 10., 100., 1000., 10000., 1e5],
+            window=2, tolerance=0.05))
+
+    def test_analyze(self):
+        rates = [100., 400., 800., 1000., 1000., 1000., 1000., 1000.]
+        latency = [900., 500., 300., 200., 200., 200., 200., 200.]
+        stats = steady_state.analyze(make_series(rates, latency), window=2,
+                tolerance=0.05)
+        self.assertEqual(stats['warmup_time'], 30.)
+        self.assertEqual(stats['steady_throughput'], 1000.)
+        self.assertEqual(stats['steady_latency'], 200.)
+        self.assertEqual(stats['read_steady_latency'], 200.)
+        # The result can be stored in a Statistics row
+        row = Statistics(**stats)
+        self.assertEqual(row.read_steady_latency, 200.)
+        self.assertIsNone(steady_state.analyze(StatusSeries()))
+
+    def test_analyze_weighted(self):
+        # A rare, slow operation mustn't count as much as the common one
+        series = StatusSeries()
+        series.feed("0 sec: 0 operations;")
+        for i in range(1, 7):
+            series.feed("%i sec: %i operations; 1000.0 current ops/sec; " % (i * 10, i * 10000) +
+                    "[READ: Count=9900, Avg=100] [SCAN: Count=100, Avg=10000]")
+        stats = steady_state.analyze(series, window=2, tolerance=0.05)
+        self.assertEqual(stats['read_steady_latency'], 100.)
+        self.assertEqual(stats['scan_steady_latency'], 10000.)
+        self.assertAlmostEqual(stats['steady_latency'], 199.)
+        # Without counts in the reports, the run's operation counts are used
+        series = StatusSeries()
+        series.feed("0 sec: 0 operations;")
+        for i in range(1, 7):
+            series.feed("%i sec: %i operations; 1000.0 current ops/sec; " % (i * 10, i * 10000) +
+                    "[READ AverageLatency(us)=100] [SCAN AverageLatency(us)=10000]")
+        row = Statistics(read_operations=9900., scan_operations=100.)
+        stats = steady_state.analyze(series, window=2, tolerance=0.05, stats=row)
+        self.assertAlmostEqual(stats['steady_latency'], 199.)
+        # Or equal weights without either
+        stats = steady_state.analyze(series, window=2, tolerance=0.05)
+        self.assertAlmostEqual(stats['steady_latency'], 5050.)
@@ -0,0 +1,96 @@
+import os
+import json
+import tempfile
+import unittest
+
+from .helpers import *
+
+from runner import trace
+from runner.phases import PhaseTimer
+from runner.trace import Tracer
+
+class TracerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        trace.disable()
+        self.tempdir.cleanup()
+
+    def test_span(self):
+        tracer = Tracer("runner")
+        with tracer.span("mpl 1", mpl=1) as args:
+            with tracer.span("clean", 'phase'):
+                pass
+            args['throughput'] = 10.
+        meta, clean, mpl = tracer.events
+        self.assertEqual(meta['ph'], 'M')
+        self.assertEqual(meta['args'], {'name': 'runner'})
+        self.assertEqual((mpl['name'], mpl['ph'], mpl['cat']), ("mpl 1", 'X', 'runner'))
+        self.assertEqual(mpl['args'], {'mpl': 1, 'throughput': 10.})
+        self.assertEqual(clean['cat'], 'phase')
+        self.assertNotIn('args', clean)
+        # The inner span lies within the outer one, on the same thread
+        self.assertLessEqual(mpl['ts'], clean['ts'])
+        self.assertLessEqual(clean['ts'] + clean['dur'], mpl['ts'] + mpl['dur'])
+        self.assertEqual(clean['tid'], mpl['tid'])
+        self.assertEqual(clean['pid'], os.getpid())
+
+    def test_span_raises(self):
+        tracer = Tracer()
+        with self.assertRaises(RuntimeError):
+            with tracer.span("load"):
+                raise RuntimeError
+        self.assertEqual([e['name'] for e in tracer.events], ["load"])
+
+    def test_counter(self):
+        tracer = Tracer()
+        tracer.counter("throughput", 2., ops_per_sec=100.)
+        event, = tracer.events
+        self.assertEqual(event['ph'], 'C')
+        self.assertEqual(event['ts'], 2e6)
+        self.assertEqual(event['args'], {'ops_per_sec': 100.})
+
+    def test_disabled(self):
+        self.assertIsNone(trace.tracer())
+        with trace.span("hook", x=1) as args:
+            args['y'] = 2
+        trace.counter("throughput", ops_per_sec=1.)
+        trace.instant("timeout")
+        # Phases are still timed without a tracer
+        timer = PhaseTimer()
+        with timer.phase('export'):
+            pass
+        self.assertIn('export', timer.totals)
+
+    def test_enabled(self):
+        tracer = trace.enable("runner")
+        self.assertIs(trace.tracer(), tracer)
+        with trace.span("drop caches"):
+            pass
+        trace.instant("timeout", 'runner', reason='stall')
+        PhaseTimer().add('run', 1., 5.)
+        names = [(e['name'], e.get('cat')) for e in tracer.events]
+        self.assertEqual(names, [('process_name', None), ("drop caches", 'hook'),
+            ("timeout", 'runner'), ('run', 'phase')])
+        self.assertEqual(tracer.events[-1]['ts'], 5e6)
+        self.assertEqual(tracer.events[-1]['dur'], 1e6)
+        # A new tracer replaces the old one (e.g. in a forked worker)
+        self.assertIsNot(trace.enable(), tracer)
+
+    def test_write_merge(self):
+        path = os.path.join(self.tempdir.name, "trace.json")
+        parts = [path + ".1", path + ".2", path + ".3"]
+        for i, p in enumerate([path] + parts[:2]):
+            tracer = Tracer()
+            with tracer.span("db %i" % i):
+                pass
+            tracer.write(p)
+        trace.merge(path, parts)
+        with open(path) as f:
+            events = json.load(f)['traceEvents']
+        self.assertEqual([e['name'] for e in events], ["db 0", "db 1", "db 2"])
+        self.assertFalse(os.path.exists(parts[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import sys
+import unittest
+
+from time import monotonic
+
+from .helpers import *
+
+from runner.output_parser import OutputParser
+from runner.status        import StatusSeries
+from runner.ycsb_process  import YcsbProcess, Watchdog, ProcessTimeout, call
+
+SCRIPT = """
+import sys
+for i in range(1, 2001):
+    print("%i sec: %i operations; 1.0 current ops/sec;" % (i, i), file=sys.stderr)
+print("[OVERALL], Throughput(ops/sec), 12.5")
+sys.exit(3)
+"""
+
+# Prints a status report, then hangs in a child process which holds the
+# output pipes open (like the JVM started by the ycsb script)
+HANG = """
+import sys, subprocess
+print("1 sec: 1 operations; 1.0 current ops/sec;", file=sys.stderr, flush=True)
+subprocess.call([sys.executable, '-c', 'import time; time.sleep(60)'])
+"""
+
+class YcsbProcessTestCase(unittest.TestCase):
+    def test_run(self):
+        lines = []
+        parser = OutputParser()
+        series = StatusSeries()
+        proc = YcsbProcess([sys.executable, '-c', SCRIPT], lines.append,
+                parser, series)
+        self.assertEqual(proc.run(), 3)
+        self.assertEqual(proc.returncode, 3)
+        # Both streams are logged and parsed in full
+        self.assertEqual(len(lines), 2001)
+        self.assertIn("[OVERALL], Throughput(ops/sec), 12.5", lines)
+        self.assertEqual(parser.stats().throughput, 12.5)
+        self.assertEqual(len(series), 2000)
+        self.assertEqual(series.elapsed[-1], 2000)
+
+    def test_run_stderr_error(self):
+        # Errors parsing stderr (read in a thread) aren't lost
+        class StatusError:
+            def feed(self, line):
+                if "current ops/sec" in line:
+                    raise ValueError(line)
+        proc = YcsbProcess([sys.executable, '-c', SCRIPT], lambda line: None,
+                StatusError())
+        with self.assertRaises(ValueError):
+            proc.run()
+
+class WatchdogTestCase(unittest.TestCase):
+    def run_hang(self, watchdog):
+        series = StatusSeries()
+        proc = YcsbProcess([sys.executable, '-c', HANG], lambda line: None,
+                series, watchdog=watchdog)
+        start = monotonic()
+        with self.assertRaises(ProcessTimeout) as cm:
+            with watchdog:
+                proc.run()
+        # The whole process group was killed, closing the pipes
+        self.assertLess(monotonic() - start, 30)
+        self.assertLess(proc.returncode, 0)
+        self.assertEqual(len(series), 1)
+        return cm.exception
+
+    def test_timeout(self):
+        e = self.run_hang(Watchdog("hang", timeout=1))
+        self.assertEqual(e.reason, 'timeout')
+
+    def test_stall(self):
+        e = self.run_hang(Watchdog("hang", stall_timeout=1))
+        self.assertEqual(e.reason, 'stall')
+
+    def test_no_timeout(self):
+        with Watchdog("script", timeout=60, stall_timeout=60) as watchdog:
+            proc = YcsbProcess([sys.executable, '-c', SCRIPT], lambda line: None,
+                    watchdog=watchdog)
+            self.assertEqual(proc.run(), 3)
+        self.assertIsNone(watchdog.reason)
+
+    def test_call(self):
+        self.assertEqual(call([sys.executable, '-c', 'import sys; sys.exit(2)']), 2)
+        with self.assertRaises(ProcessTimeout):
+            call([sys.executable, '-c', HANG], timeout=1)